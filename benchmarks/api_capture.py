@@ -0,0 +1,60 @@
+"""Compares the dom and api fetch modes of get_new_transactions against the local stand-in web app.
+
+    poetry run python benchmarks/api_capture.py [--months N] [--latency SECONDS]
+
+Unverified: it hasn't been run against the stand-in yet (no Chromium was available), there are no reference numbers.
+"""
+import argparse
+import asyncio
+import time
+
+from playwright.async_api import async_playwright
+
+from playwrighting.transactions import MovementsCapture, get_new_transactions
+from standin import StandIn
+
+
+async def fetch(browser, url: str, api: bool):
+    page = await browser.new_page()
+    start = time.perf_counter()
+    if api:
+        async with MovementsCapture(page) as capture:
+            await page.goto(url)
+            transactions = await get_new_transactions(page, None, capture=capture)
+    else:
+        await page.goto(url)
+        transactions = await get_new_transactions(page, None)
+    elapsed = time.perf_counter() - start
+    await page.close()
+    return transactions, elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--months", type=int, default=3)
+    parser.add_argument("--movements_per_month", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    # the validation notice would stop the comparison waiting for a phone
+    with StandIn(
+        latency=args.latency,
+        months=args.months,
+        movements_per_month=args.movements_per_month,
+        validation_days=args.months * 31 + 31,
+    ) as stand_in:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch()
+            url = f"{stand_in.base_url}/products/1"
+
+            dom, dom_elapsed = await fetch(browser, url, api=False)
+            api, api_elapsed = await fetch(browser, url, api=True)
+            await browser.close()
+
+    print(f"dom: {len(dom)} transactions in {dom_elapsed:.2f} s")
+    print(f"api: {len(api)} transactions in {api_elapsed:.2f} s")
+    print(f"same transactions: {dom.sort_index().equals(api.sort_index())}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
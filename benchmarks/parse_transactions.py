@@ -0,0 +1,43 @@
+"""Compares the selectolax movements table parser with the pd.read_html one using the saved fixtures.
+
+    poetry run python benchmarks/parse_transactions.py [--repeat N]
+"""
+import argparse
+import timeit
+from pathlib import Path
+
+from playwrighting.parsers import parse_transactions_table
+from playwrighting.transactions import read_transactions_table
+
+FIXTURES_PATH = Path(__file__).parent / "fixtures"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for fixture in sorted(FIXTURES_PATH.glob("movements_*.html")):
+        content = fixture.read_text()
+        rows = len(parse_transactions_table(content).dropna())
+
+        read_html = min(
+            timeit.repeat(
+                lambda: read_transactions_table(content), number=1, repeat=args.repeat
+            )
+        )
+        selectolax = min(
+            timeit.repeat(
+                lambda: parse_transactions_table(content),
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        print(
+            f"{fixture.name} ({rows} rows): pd.read_html {read_html * 1000:.2f} ms, "
+            f"selectolax {selectolax * 1000:.2f} ms, {read_html / selectolax:.1f}x faster"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""End-to-end scrape against the local stand-in web app: login, position, the first full update (as init does) and an
+incremental update after a new movement (as update does), reporting the wall time of every phase.
+
+    poetry run python benchmarks/scrape.py [--months N] [--latency SECONDS] [--jobs N] [--fetch_mode dom|api] [--profile]
+        [--browser_mode launch|persistent] [--no_blocking] [--runs N]
+
+With several runs in the same app folder, the browser start of the later ones shows what a persistent browser saves.
+
+Unverified: it hasn't been run against the stand-in yet (no Chromium was available), there are no reference numbers.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from contextlib import AsyncExitStack, contextmanager
+from pathlib import Path
+from typing import Dict, List
+
+from standin import StandIn
+
+phases: Dict[str, List[float]] = {}
+
+
+@contextmanager
+def phase(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases.setdefault(name, []).append(time.perf_counter() - start)
+
+
+def write_config(home: Path, stand_in: StandIn, browser_mode: str):
+    day, month, year = stand_in.birthday.split("/")
+    app_path = home / "playwrighting"
+    app_path.mkdir()
+    (app_path / ".env").write_text(
+        "\n".join(
+            [
+                f"pass_code={stand_in.pass_code}",
+                f"id_number={stand_in.id_number}",
+                f"birthday_day={day}",
+                f"birthday_month={month}",
+                f"birthday_year={year}",
+                f"download_path={home / 'downloads'}",
+                f"browser_mode={browser_mode}",
+            ]
+        )
+    )
+
+
+async def scrape(stand_in: StandIn, jobs: int, fetch_mode: str, no_blocking: bool):
+    # the app folder and the urls are resolved when playwrighting is imported
+    from playwright.async_api import async_playwright
+
+    from playwrighting.accounts import Position
+    from playwrighting.config import get_config
+    from playwrighting.navigation.routing import ResourceBlocker
+    from playwrighting.navigation.session import open_page, resume_or_login
+
+    async with async_playwright() as p, AsyncExitStack() as stack:
+        blocker = None if no_blocking else ResourceBlocker.from_config(get_config())
+        with phase("browser start"):
+            page = await stack.enter_async_context(open_page(p, blocker))
+
+        with phase("login"):
+            await resume_or_login(page)
+        with phase("position"):
+            position = await Position.create(page)
+        with phase("first update"):
+            position = await position.update(
+                page, jobs, fetch_mode=fetch_mode, blocker=blocker
+            )
+        with phase("save"):
+            position.save()
+
+        stand_in.add_movement("1", -42.0, "Pago en MERCADONA")
+        await page.reload()
+        with phase("incremental update"):
+            new_position = await Position.create(page)
+            new_position = await new_position.update(
+                page,
+                jobs,
+                previous=Position.load(),
+                fetch_mode=fetch_mode,
+                blocker=blocker,
+            )
+            new_position.save()
+
+    return position, new_position
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--months", type=int, default=6)
+    parser.add_argument("--movements_per_month", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--fetch_mode", choices=["dom", "api"], default="dom")
+    parser.add_argument(
+        "--profile", action="store_true", help="print the spans of playwrighting"
+    )
+    parser.add_argument(
+        "--browser_mode", choices=["launch", "persistent"], default="launch"
+    )
+    parser.add_argument(
+        "--no_blocking",
+        action="store_true",
+        help="let the browser use its HTTP cache, there isn't any with routes",
+    )
+    parser.add_argument(
+        "--runs", type=int, default=1, help="scrapes one after the other"
+    )
+    args = parser.parse_args()
+
+    # the validation notice would stop the scrape waiting for a phone
+    with StandIn(
+        latency=args.latency,
+        months=args.months,
+        movements_per_month=args.movements_per_month,
+        validation_days=args.months * 31 + 31,
+    ) as stand_in, tempfile.TemporaryDirectory() as home:
+        write_config(Path(home), stand_in, args.browser_mode)
+        os.environ["HOME"] = home
+        os.environ["PYING_BASE_URL"] = stand_in.base_url
+
+        from playwrighting.profiling import profiling
+
+        totals = []
+        with profiling(args.profile) as profiler:
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                position, new_position = asyncio.run(
+                    scrape(stand_in, args.jobs, args.fetch_mode, args.no_blocking)
+                )
+                totals.append(time.perf_counter() - start)
+
+    for name, elapsed in [*phases.items(), ("total", totals)]:
+        print(f"{name}: {', '.join(f'{run:.2f} s' for run in elapsed)}")
+
+    products = [
+        product
+        for account in position.accounts
+        for product in (account, *account.cards)
+    ]
+    print(
+        f"{len(products)} products, "
+        f"{sum(len(product.transactions) for product in products)} transactions"
+    )
+    if profiler:
+        from rich import print as rich_print
+
+        rich_print(profiler.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+from standin.server import StandIn, Product, DEFAULT_PRODUCTS
+
+__all__ = ["StandIn", "Product", "DEFAULT_PRODUCTS"]
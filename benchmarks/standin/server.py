@@ -0,0 +1,357 @@
+"""Local stand-in of the ING web app, serving generated products and movements from localhost.
+
+It reproduces the pages and the selectors of playwrighting.page_selectors that the scraper relies on (login with pin
+pad, overall position, My Products and the movements of every product with month navigation, "Ver más" and the 90
+days validation notice) and the movements json that the web app downloads, with configurable latency and history size.
+Point the scraper to it with the PYING_BASE_URL environment variable.
+"""
+import json
+import random
+import secrets
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from http import HTTPStatus
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+from uuid import UUID
+
+STATIC_PATH = Path(__file__).parent / "static"
+CATEGORIES = [
+    "Supermercados",
+    "Restaurantes",
+    "Nómina",
+    "Transferencias",
+    "Recibos",
+    "Gasolineras",
+    "Compras",
+]
+DESCRIPTIONS = [
+    "Pago en MERCADONA",
+    "Transferencia recibida de EMPRESA SL",
+    "Recibo IBERDROLA",
+    "Pago en REPSOL",
+    "Bizum enviado a Ana",
+    "Pago en AMAZON EU",
+    "Cajero retirada",
+    "Recibo MOVISTAR",
+]
+
+
+@dataclass
+class Product:
+    """``kind`` is account, savings, debit_card or credit_card, cards belong to the account with id ``account``."""
+
+    id: str
+    name: str
+    kind: str = "account"
+    account: Optional[str] = None
+    movements: List[dict] = field(default_factory=list)
+
+    @property
+    def balance(self) -> float:
+        return self.movements[0]["balance"] if self.movements else 0.0
+
+    def expense(self, month: str) -> float:
+        return -sum(
+            movement["amount"]
+            for movement in self.movements
+            if month_key(movement["day"]) == month and movement["amount"] < 0
+        )
+
+
+DEFAULT_PRODUCTS = [
+    Product("1", "Cuenta NÓMINA 1111"),
+    Product("2", "Tarjeta DÉBITO 2222", "debit_card", account="1"),
+    Product("3", "Tarjeta CRÉDITO 3333", "credit_card", account="1"),
+    Product("4", "Cuenta NARANJA 4444", "savings"),
+]
+
+
+def month_key(day: date) -> str:
+    return f"{day.year}-{day.month:02d}"
+
+
+def generate_movements(
+    rng: random.Random, today: date, months: int, movements_per_month: int
+) -> List[dict]:
+    movements = []
+    balance = round(rng.uniform(1_000, 10_000), 2)
+    first_day = today - timedelta(days=months * 30)
+    days = (today - first_day).days or 1
+
+    for _ in range(months * movements_per_month):
+        day = first_day + timedelta(days=rng.randrange(days + 1))
+        amount = (
+            round(rng.uniform(1_000, 2_500), 2)
+            if rng.random() < 0.1
+            else round(rng.uniform(-150, 60), 2)
+        )
+        movements.append(
+            {
+                "uuid": str(UUID(int=rng.getrandbits(128))),
+                "day": day,
+                "effectiveDate": day.strftime("%d/%m/%Y"),
+                "category": {"name": rng.choice(CATEGORIES)},
+                "description": rng.choice(DESCRIPTIONS),
+                "amount": amount,
+            }
+        )
+
+    movements.sort(key=lambda movement: movement["day"])
+    for movement in movements:
+        balance = round(balance + movement["amount"], 2)
+        movement["balance"] = balance
+    movements.reverse()
+    return movements
+
+
+class StandIn:
+    """Serves the stand-in web app in a background thread.
+
+    ``latency`` (seconds) is added to every response, ``months`` and ``movements_per_month`` set the history size of
+    each product and movements older than ``validation_days`` need the phone validation, which is approved after
+    ``validation_delay`` seconds.
+    """
+
+    def __init__(
+        self,
+        products: Optional[List[Product]] = None,
+        id_number: str = "11111111H",
+        birthday: str = "01/04/1987",
+        pass_code: str = "123456",
+        latency: float = 0.0,
+        months: int = 12,
+        movements_per_month: int = 30,
+        page_size: int = 25,
+        validation_days: int = 90,
+        validation_delay: float = 0.5,
+        today: Optional[date] = None,
+        seed: int = 0,
+    ):
+        self.id_number = id_number
+        self.birthday = birthday
+        self.pass_code = pass_code
+        self.sessions = set()
+        self.pin_positions = sorted(random.sample(range(len(pass_code)), 3))
+        self.latency = latency
+        self.page_size = page_size
+        self.validation_days = validation_days
+        self.validation_delay = validation_delay
+        self.today = today or date.today()
+        self.validated_at: Optional[float] = None
+
+        rng = random.Random(seed)
+        self.products: Dict[str, Product] = {}
+        for product in products or DEFAULT_PRODUCTS:
+            product.movements = generate_movements(
+                rng, self.today, months, movements_per_month
+            )
+            self.products[product.id] = product
+
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandIn":
+        stand_in = self
+
+        class Handler(StandInHandler):
+            app = stand_in
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StandIn":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def needs_validation(self, month: str) -> bool:
+        oldest_free_month = month_key(self.today - timedelta(days=self.validation_days))
+        return month < oldest_free_month and not self.is_validated()
+
+    def is_validated(self) -> bool:
+        return (
+            self.validated_at is not None
+            and time.monotonic() - self.validated_at >= self.validation_delay
+        )
+
+    def add_movement(self, product_id: str, amount: float, description: str):
+        """New movement of today, so the next update finds the product changed."""
+        product = self.products[product_id]
+        product.movements.insert(
+            0,
+            {
+                "uuid": secrets.token_hex(16),
+                "day": self.today,
+                "effectiveDate": self.today.strftime("%d/%m/%Y"),
+                "category": {"name": CATEGORIES[0]},
+                "description": description,
+                "amount": amount,
+                "balance": round(product.balance + amount, 2),
+            },
+        )
+
+    def login(self, credentials: dict) -> Optional[str]:
+        expected_digits = [self.pass_code[position] for position in self.pin_positions]
+        if (
+            credentials.get("id_number") == self.id_number
+            and credentials.get("birthday") == self.birthday
+            and credentials.get("digits") == expected_digits
+        ):
+            session = secrets.token_hex(16)
+            self.sessions.add(session)
+            return session
+
+    def position(self) -> dict:
+        this_month = month_key(self.today)
+        products = [
+            {
+                "id": product.id,
+                "name": product.name,
+                "kind": product.kind,
+                "account": product.account,
+                "balance": product.balance,
+                "expense": product.expense(this_month),
+            }
+            for product in self.products.values()
+        ]
+        return {
+            "balance": round(
+                sum(
+                    product["balance"]
+                    for product in products
+                    if product["kind"] in ("account", "savings")
+                ),
+                2,
+            ),
+            "products": products,
+        }
+
+    def movements(self, product_id: str, month: Optional[str], offset: int) -> dict:
+        product = self.products[product_id]
+        months = sorted({month_key(movement["day"]) for movement in product.movements})
+        month = month or month_key(self.today)
+
+        response = {
+            "month": month,
+            "has_previous": bool(months) and month > months[0],
+            "requires_validation": self.needs_validation(month),
+            "count": 0,
+            "elements": [],
+        }
+        if response["requires_validation"]:
+            return response
+
+        elements = [
+            {key: value for key, value in movement.items() if key != "day"}
+            for movement in product.movements
+            if month_key(movement["day"]) == month
+        ]
+        response["count"] = len(elements)
+        response["elements"] = elements[offset : offset + self.page_size]
+        return response
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    app: StandIn
+
+    def log_message(self, *args):
+        pass
+
+    def send(self, body: bytes, content_type: str, status=HTTPStatus.OK, headers=None):
+        time.sleep(self.app.latency)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, payload: dict, headers=None):
+        self.send(json.dumps(payload).encode(), "application/json", headers=headers)
+
+    def send_static(self, name: str):
+        content_type = "text/html" if name.endswith(".html") else "text/javascript"
+        self.send((STATIC_PATH / name).read_bytes(), f"{content_type}; charset=utf-8")
+
+    def redirect(self, location: str):
+        self.send(b"", "text/plain", HTTPStatus.FOUND, {"Location": location})
+
+    def not_found(self):
+        self.send(b"Not found", "text/plain", HTTPStatus.NOT_FOUND)
+
+    def is_logged_in(self) -> bool:
+        cookies = SimpleCookie(self.headers.get("Cookie", ""))
+        return "session" in cookies and cookies["session"].value in self.app.sessions
+
+    def read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+
+        if parts == ["app-login"]:
+            self.send_static("login.html")
+        elif parts == ["pfm"]:
+            if self.is_logged_in():
+                self.send_static("pfm.html")
+            else:
+                self.redirect("/app-login/")
+        elif parts[:1] == ["static"] and len(parts) == 2:
+            self.send_static(parts[1])
+        elif parts[:1] == ["products"] and len(parts) == 2:
+            self.send_static("product.html")
+        elif parts == ["api", "pinpad"]:
+            self.send_json(
+                {
+                    "length": len(self.app.pass_code),
+                    "positions": self.app.pin_positions,
+                }
+            )
+        elif parts == ["api", "position"]:
+            self.send_json(self.app.position())
+        elif parts[:2] == ["api", "products"] and parts[3:] == ["movements"]:
+            self.send_json(
+                self.app.movements(
+                    parts[2], query.get("month"), int(query.get("offset", 0))
+                )
+            )
+        else:
+            self.not_found()
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        if path == "/api/login":
+            session = self.app.login(self.read_json())
+            if session:
+                self.send_json(
+                    {"logged_in": True},
+                    {"Set-Cookie": f"session={session}; Path=/; HttpOnly"},
+                )
+            else:
+                self.send_json({"logged_in": False})
+        elif path == "/api/validation":
+            if self.app.validated_at is None:
+                self.app.validated_at = time.monotonic()
+            self.send_json({"validated": self.app.is_validated()})
+        else:
+            self.not_found()
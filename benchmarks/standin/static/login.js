@@ -0,0 +1,75 @@
+const POSITION_CLASS = "c-pinpad__secret-positions__position";
+const credentials = {id_number: null, birthday: null, digits: []};
+let pinpad = null;
+
+function shuffledDigits() {
+    const digits = [..."0123456789"];
+    for (let i = digits.length - 1; i > 0; i--) {
+        const j = Math.floor(Math.random() * (i + 1));
+        [digits[i], digits[j]] = [digits[j], digits[i]];
+    }
+    return digits;
+}
+
+// only flat divs inside the secret positions, the scraper splits its html by "<div" to find the selectable ones
+function renderPinpad() {
+    const current = pinpad.positions[credentials.digits.length];
+    const positions = [...Array(pinpad.length).keys()].map((position) => {
+        let className = POSITION_CLASS;
+        if (position === current) {
+            className += ` ${POSITION_CLASS}--selectable-current`;
+        } else if (pinpad.positions.indexOf(position) > credentials.digits.length) {
+            className += ` ${POSITION_CLASS}--selectable`;
+        }
+        return `<div class="${className}"></div>`;
+    });
+    const markers = pinpad.markers.map((digit) => `<li class="c-pinpad__marker__slot">${digit}</li>`);
+
+    document.querySelector("#pinpad-container").innerHTML = `
+        <div class="c-pinpad">
+            <div class="c-pinpad__secret-positions">${positions.join("")}</div>
+            <ul class="c-pinpad__marker">${markers.join("")}</ul>
+        </div>`;
+}
+
+async function submit() {
+    const response = await fetch("/api/login", {
+        method: "POST",
+        headers: {"Content-Type": "application/json"},
+        body: JSON.stringify(credentials),
+    });
+    if ((await response.json()).logged_in) {
+        location.href = "/pfm/#overall-position";
+    } else {
+        document.querySelector(".login-error").hidden = false;
+        credentials.digits = [];
+        renderPinpad();
+    }
+}
+
+document.addEventListener("click", async (event) => {
+    if (event.target.closest("#configurar")) {
+        document.querySelector(".cookies-settings").hidden = false;
+    } else if (event.target.closest(".close_btn_thick")) {
+        document.querySelector("#cookies-banner").remove();
+    } else if (event.target.closest(".c-pinpad__marker__slot")) {
+        credentials.digits.push(event.target.innerText.trim());
+        if (credentials.digits.length === pinpad.positions.length) {
+            await submit();
+        } else {
+            renderPinpad();
+        }
+    }
+});
+
+document.querySelector("#identification").addEventListener("submit", async (event) => {
+    event.preventDefault();
+    const value = (selector) => document.querySelector(selector).value;
+    credentials.id_number = value("#ing-uic-native-input_0");
+    credentials.birthday = `${value("#input_day")}/${value("#input_month")}/${value("#input_year")}`;
+
+    const response = await fetch("/api/pinpad");
+    pinpad = {...(await response.json()), markers: shuffledDigits()};
+    document.querySelector("#identification").hidden = true;
+    renderPinpad();
+});
@@ -0,0 +1,129 @@
+const MONTHS = ["Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio", "Julio", "Agosto", "Septiembre", "Octubre",
+    "Noviembre", "Diciembre"];
+const WEEKDAYS = ["Domingo", "Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado"];
+const VALID_OPERATION_TEXT = "Para consultar tus movimientos de más de 90 días, es necesario que valides esta " +
+    "operación. Si deseas continuar selecciona \"Ver más\".";
+const MOVEMENTS_TEMPLATE = `
+    <div id="movements-content">
+        <div class="date-navigator">
+            <button class="navigate-back">Anterior</button>
+            <span class="date-navigator-label"></span>
+            <div class="combo-box-options" hidden>
+                <ul>
+                    <li><a data-range="all">Todos</a></li>
+                    <li><a data-range="this-month">Este mes</a></li>
+                </ul>
+            </div>
+        </div>
+        <p class="validation-notice" hidden></p>
+        <div class="c-basic-grid"></div>
+    </div>`;
+
+function previousMonth(month) {
+    let [year, number] = month.split("-").map(Number);
+    number -= 1;
+    if (number === 0) {
+        number = 12;
+        year -= 1;
+    }
+    return `${year}-${String(number).padStart(2, "0")}`;
+}
+
+function formatAmount(amount) {
+    const [integer, decimals] = Math.abs(amount).toFixed(2).split(".");
+    const grouped = integer.replace(/\B(?=(\d{3})+(?!\d))/g, ".");
+    return `${amount < 0 ? "-" : ""}${grouped},${decimals} €`;
+}
+
+function weekday(effectiveDate) {
+    const [day, month, year] = effectiveDate.split("/").map(Number);
+    const movementDay = new Date(year, month - 1, day);
+    const today = new Date();
+    today.setHours(0, 0, 0, 0);
+    const days = Math.round((today - movementDay) / 86400000);
+    if (days === 0) return "Hoy";
+    if (days === 1) return "Ayer";
+    return WEEKDAYS[movementDay.getDay()];
+}
+
+// renders the movements of a product inside root, the grid is removed while a page is loading like the web app does
+function mountMovements(root, productId) {
+    root.innerHTML = MOVEMENTS_TEMPLATE;
+    const content = root.querySelector("#movements-content");
+    const state = {month: null, offset: 0, count: 0, rows: [], hasPrevious: false, requiresValidation: false};
+    const grid = root.querySelector(".c-basic-grid");
+
+    function render() {
+        const [year, number] = state.month.split("-").map(Number);
+        root.querySelector(".date-navigator-label").innerText = `${MONTHS[number - 1]} ${year}`;
+        root.querySelector(".navigate-back").classList.toggle("is-disabled", !state.hasPrevious);
+
+        const notice = root.querySelector(".validation-notice");
+        notice.hidden = !state.requiresValidation;
+        notice.innerText = state.requiresValidation ? VALID_OPERATION_TEXT : "";
+
+        const rows = state.rows.map((movement) => `
+            <tr>
+                <td><span>${weekday(movement.effectiveDate)}</span><span>${movement.effectiveDate}</span></td>
+                <td>${movement.category.name}</td>
+                <td>${movement.description}</td>
+                <td>${formatAmount(movement.amount)}</td>
+                <td>${formatAmount(movement.balance)}</td>
+            </tr>`);
+        if (state.requiresValidation || state.rows.length < state.count) {
+            rows.push(`<tr><td class="txt-c" colspan="5"><span>Ver más</span></td></tr>`);
+        }
+        grid.innerHTML = `
+            <div>
+                <table>
+                    <thead><tr><th>Fecha</th><th>Categoría</th><th>Descripción</th><th>Importe</th><th>Saldo</th></tr></thead>
+                    <tbody>${rows.join("")}</tbody>
+                </table>
+            </div>`;
+    }
+
+    async function load(month, offset) {
+        grid.innerHTML = "";
+        const query = new URLSearchParams({month: month || "", offset: offset});
+        const response = await fetch(`/api/products/${productId}/movements?${query}`);
+        const movements = await response.json();
+
+        state.month = movements.month;
+        state.offset = offset;
+        state.count = movements.count;
+        state.hasPrevious = movements.has_previous;
+        state.requiresValidation = movements.requires_validation;
+        state.rows = offset ? state.rows.concat(movements.elements) : movements.elements;
+        render();
+    }
+
+    async function validate() {
+        let validated = false;
+        while (!validated) {
+            const response = await fetch("/api/validation", {method: "POST"});
+            validated = (await response.json()).validated;
+            if (!validated) await new Promise((resolve) => setTimeout(resolve, 250));
+        }
+        await load(state.month, 0);
+    }
+
+    // on the content, not on root, so mounting another product in the same root drops the listener
+    content.addEventListener("click", async (event) => {
+        if (event.target.closest(".navigate-back") && state.hasPrevious) {
+            await load(previousMonth(state.month), 0);
+        } else if (event.target.closest("td.txt-c")) {
+            if (state.requiresValidation) {
+                await validate();
+            } else {
+                await load(state.month, state.rows.length);
+            }
+        } else if (event.target.closest(".date-navigator-label")) {
+            root.querySelector(".combo-box-options").hidden = false;
+        } else if (event.target.closest(".combo-box-options a")) {
+            root.querySelector(".combo-box-options").hidden = true;
+            await load(null, 0);
+        }
+    });
+
+    return load(null, 0);
+}
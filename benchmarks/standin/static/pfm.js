@@ -0,0 +1,79 @@
+const app = document.querySelector("#app");
+let position = null;
+
+function productAmount(product) {
+    if (product.kind === "debit_card") return "Encendida";
+    const amount = product.kind === "credit_card" ? product.expense : product.balance;
+    return formatAmount(amount).replace(" ", "");
+}
+
+function productLine(product) {
+    return `<div class="product"><a class="product-link" data-id="${product.id}">${product.name}</a>
+        <span>${productAmount(product)}</span></div>`;
+}
+
+function renderOverallPosition() {
+    app.innerHTML = `
+        <div class="grid-group-header-movements">
+            <p>Saldo total</p>
+            <p class="g-overall-position-amount">${formatAmount(position.balance)}</p>
+        </div>`;
+}
+
+// the product lists are nested like in the web app so NORMAL_ACCOUNTS and SAVINGS_ACCOUNTS select them
+function renderMyProducts() {
+    const accounts = position.products.filter((product) => product.kind === "account");
+    const savings = position.products.filter((product) => product.kind === "savings");
+    const cards = (account) => position.products.filter((product) => product.account === account.id);
+    const accountLines = accounts.map((account) => productLine(account) + cards(account).map(productLine).join(""));
+
+    app.innerHTML = `
+        <div id="my-products">
+            <div class="basic-one-half">
+                <div><div>
+                    <div class="products-title">Cuentas y tarjetas</div>
+                    <div class="products-list">${accountLines.join("")}</div>
+                </div></div>
+            </div>
+            <div class="basic-one-half"></div>
+            <div class="basic-one-hundred">
+                <div>
+                    <div class="products-title">Ahorro</div>
+                    <div><div><div><div class="products-list">${savings.map(productLine).join("")}</div></div></div></div>
+                </div>
+            </div>
+        </div>`;
+}
+
+// renders synchronously, a click on a menu or a product leaves the page ready without waiting for hashchange
+function route(hash) {
+    if (location.hash !== hash) history.pushState(null, "", hash);
+
+    const [name, id] = hash.slice(1).split("/");
+    if (name === "my-products") {
+        renderMyProducts();
+    } else if (name === "product") {
+        mountMovements(app, id);
+    } else {
+        renderOverallPosition();
+    }
+}
+
+document.addEventListener("click", (event) => {
+    const menu = event.target.closest("[data-route]");
+    const product = event.target.closest(".product-link");
+    if (menu) {
+        route(`#${menu.dataset.route}`);
+    } else if (product) {
+        route(`#product/${product.dataset.id}`);
+    }
+});
+
+window.addEventListener("popstate", () => route(location.hash || "#overall-position"));
+
+fetch("/api/position")
+    .then((response) => response.json())
+    .then((data) => {
+        position = data;
+        route(location.hash || "#overall-position");
+    });
@@ -0,0 +1,116 @@
+"""Startup budget of the CLI: fails when `pying --help` or `pying show --option position` take longer than their budget
+or when any of them imports the heavy dependencies.
+
+    poetry run python benchmarks/startup.py [--repeat N]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BUDGETS = {
+    ("--help",): 0.5,
+    ("show", "--option", "position"): 1.5,
+}
+HEAVY_MODULES = ("pandas", "playwright", "selectolax", "pyarrow")
+# the commands install the rich tracebacks when they run, --help exits before
+HELP_HEAVY_MODULES = (*HEAVY_MODULES, "rich.traceback")
+# the CLI is run in the same interpreter that reports the modules it imported
+IMPORTED_MODULES_SCRIPT = """
+import sys
+from playwrighting.pying import cli
+try:
+    cli(sys.argv[1:], _anyio_backend="asyncio")
+except SystemExit:
+    pass
+print(" ".join(module for module in {heavy_modules!r} if module in sys.modules))
+"""
+
+
+def create_state(home: Path):
+    # the app folder is resolved from HOME when playwrighting.config is imported
+    os.environ["HOME"] = str(home)
+    (home / "playwrighting").mkdir()
+
+    import pandas as pd
+
+    from playwrighting.accounts import Account, Position
+
+    transactions = pd.DataFrame(
+        {"Descripción": ["Pago en MERCADONA"] * 1_000, "Importe": [-12.5] * 1_000},
+        index=pd.DatetimeIndex(
+            pd.date_range(end=datetime.now(), periods=1_000), name="Fecha"
+        ),
+    )
+    account = Account("Cuenta NARANJA 1", 1_000.0, (), transactions, datetime.now())
+    Position(1_000.0, (account,), datetime.now()).save()
+
+
+def best_time(arguments, repeat: int, env: dict) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "playwrighting.pying", *arguments],
+            env=env,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def imported_heavy_modules(arguments, heavy_modules, env: dict):
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            IMPORTED_MODULES_SCRIPT.format(heavy_modules=heavy_modules),
+            *arguments,
+        ],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    # the last line, after the output of the command
+    return output.stdout.splitlines()[-1].split()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as home:
+        create_state(Path(home))
+        env = {**os.environ, "HOME": home}
+
+        for arguments, budget in BUDGETS.items():
+            heavy_modules = imported_heavy_modules(
+                arguments,
+                HELP_HEAVY_MODULES if arguments == ("--help",) else HEAVY_MODULES,
+                env,
+            )
+            if heavy_modules:
+                failed = True
+                print(f"pying {' '.join(arguments)} imports {', '.join(heavy_modules)}")
+
+            elapsed = best_time(arguments, args.repeat, env)
+            within_budget = elapsed <= budget
+            failed = failed or not within_budget
+            print(
+                f"pying {' '.join(arguments)}: {elapsed * 1000:.0f} ms "
+                f"(budget {budget * 1000:.0f} ms) {'OK' if within_budget else 'FAILED'}"
+            )
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +0,0 @@
-import pandas as pd
-
-pd.options.display.max_rows = None
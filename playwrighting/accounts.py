@@ -1,24 +1,39 @@
+import asyncio
 import dataclasses
 import pickle
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+from functools import partial
 from pathlib import Path
-from string import ascii_letters
-from typing import List, Union, Tuple, Optional
+from typing import (
+    List,
+    Union,
+    Tuple,
+    Optional,
+    Callable,
+    Awaitable,
+    TypeVar,
+    Iterator,
+)
 
 import pandas as pd
 from more_itertools import pairwise
 from playwright.async_api import Page
 from rich import print
-from selectolax.parser import HTMLParser
 
-from playwrighting.config import app_path
+from playwrighting.checkpoint import current_checkpoint
+from playwrighting.config import get_app_path
 from playwrighting.constants import (
     IS_ACTIVATED,
     ACCOUNT_DELIMITER,
     CARD_DELIMITER,
     STATE_FILE_NAME,
+    LEGACY_STATE_FILE_NAME,
+    ACCOUNT_KIND,
+    CREDIT_CARD_KIND,
+    DEBIT_CARD_KIND,
+    ExportFormat,
 )
 from playwrighting.page_selectors import (
     OVERALL_POSITION_AMOUNT,
@@ -26,7 +41,28 @@ from playwrighting.page_selectors import (
     SAVINGS_ACCOUNTS,
     MY_PRODUCTS,
 )
-from playwrighting.transactions import get_new_transactions
+from playwrighting.export import (
+    check_export_format,
+    export_path,
+    export_transactions,
+)
+from playwrighting.merge import merge_transactions, merged_since
+from playwrighting.parsers import normalize_legacy_transactions
+from playwrighting.pool import PagePool, gather_or_cancel
+from playwrighting.profiling import span
+from playwrighting.storage import ProductRecord, Store, open_store
+from playwrighting.summary import (
+    account_position,
+    account_transactions_menu,
+    general_position,
+)
+from playwrighting.navigation.routing import ResourceBlocker
+from playwrighting.navigation.transactions import open_product
+from playwrighting.transactions import (
+    get_newest_transactions,
+    get_product_transactions,
+    FetchMode,
+)
 from playwrighting.utils import (
     get_number_from_string_with_dot_and_comma,
     get_texts_within_css_selector,
@@ -38,6 +74,88 @@ class AccountType(Enum):
     savings = "savings"
 
 
+@dataclass(frozen=True)
+class Fingerprint:
+    amount: Optional[float]
+    newest_date: Optional[datetime]
+    newest_transactions: Tuple[str, ...]
+
+    @staticmethod
+    def of(
+        amount: Optional[float], transactions: Optional[pd.DataFrame]
+    ) -> "Fingerprint":
+        if transactions is None or transactions.empty:
+            return Fingerprint(amount, None, ())
+
+        # all the transactions of the newest day, their order inside the day is not reliable
+        newest_date = transactions.index.max()
+        newest_transactions = transactions[transactions.index == newest_date]
+        return Fingerprint(
+            amount,
+            newest_date,
+            tuple(sorted(repr(tuple(row)) for row in newest_transactions.values)),
+        )
+
+    def matches(self, stored: "Fingerprint") -> bool:
+        """Whether the fingerprint of the current month page is the one of the stored history. Without transactions
+        this month (e.g. at its beginning) the newest stored ones are from an older month, so only the amount tells
+        whether anything changed."""
+        if self.newest_date is None:
+            return self.amount == stored.amount
+        return self == stored
+
+
+Product = TypeVar("Product", "Card", "Account")
+
+
+async def update_if_changed(
+    product: Product,
+    previous: Optional[Product],
+    pages: PagePool,
+    update: Callable[..., Awaitable[Product]],
+    force: bool = False,
+) -> Product:
+    """Updates the product from the previous one transactions, skipping the scraping when its fingerprint is the same
+    or when a resumed run has it checkpointed.
+
+    A different amount in My Products is a change without visiting the product. Otherwise its current month is read
+    on the page that then scrapes the product if it changed, without opening it again.
+    """
+    checkpoint = current_checkpoint()
+    checkpointed = checkpoint.load_product(product.name) if checkpoint else None
+    if checkpointed is not None:
+        print(f"{product.name} has been taken from the checkpoint")
+        return dataclasses.replace(
+            product, transactions=checkpointed, last_update=datetime.now()
+        )
+
+    if previous is not None:
+        product = dataclasses.replace(
+            product,
+            transactions=previous.transactions,
+            last_update=previous.last_update,
+        )
+
+    async def scrape(page: Page) -> Optional[Product]:
+        is_open = False
+        if previous is not None and not force and product.amount == previous.amount:
+            fingerprint = await product.get_fingerprint(page)
+            if fingerprint.matches(previous.fingerprint()):
+                return None
+            is_open = True
+        return await update(product, page, is_open=is_open)
+
+    updated = await pages.run(scrape)
+    if updated is None:
+        print(f"{product.name} has not changed")
+        return dataclasses.replace(product, last_update=datetime.now())
+
+    product = updated
+    if checkpoint:
+        checkpoint.save_product(product.name, product.transactions)
+    return product
+
+
 @dataclass(frozen=True)
 class Card:
     name: str
@@ -68,31 +186,90 @@ class Card:
             last_update=None,
         )
 
+    def to_record(self, account: "Account") -> ProductRecord:
+        return ProductRecord(
+            self.name,
+            CREDIT_CARD_KIND if isinstance(self, CreditCard) else DEBIT_CARD_KIND,
+            account=account.name,
+            expense=getattr(self, "expense", None),
+            is_activated=getattr(self, "is_activated", None),
+            last_update=self.last_update,
+        )
+
+    @staticmethod
+    def from_record(
+        record: ProductRecord, transactions: Optional[pd.DataFrame]
+    ) -> "Card":
+        if record.kind == CREDIT_CARD_KIND:
+            return CreditCard(
+                record.name,
+                transactions=transactions,
+                expense=record.expense,
+                last_update=record.last_update,
+            )
+        return DebitCard(
+            record.name,
+            transactions=transactions,
+            is_activated=record.is_activated,
+            last_update=record.last_update,
+        )
+
     def touch(self) -> "Card":
         return dataclasses.replace(self, last_update=datetime.now())
 
-    async def update(self, page: Page) -> "Card":
+    @property
+    def amount(self) -> Optional[float]:
+        return getattr(self, "expense", None)
+
+    def fingerprint(self) -> Fingerprint:
+        return Fingerprint.of(self.amount, self.transactions)
+
+    async def get_fingerprint(self, page: Page) -> Fingerprint:
+        with span("fingerprint", product=self.name):
+            await open_product(page, self.name)
+            newest_transactions = await get_newest_transactions(
+                page, is_credit_card=isinstance(self, CreditCard)
+            )
+            return Fingerprint.of(self.amount, newest_transactions)
+
+    async def update(
+        self, page: Page, fetch_mode: FetchMode = FetchMode.dom, is_open: bool = False
+    ) -> "Card":
         print(f"Obtaining transactions of {self.name}")
-        await page.click(MY_PRODUCTS)
-        await page.click(f"text={self.name}")
-        transactions = await get_new_transactions(
-            page, self.last_update, is_credit_card=isinstance(self, CreditCard)
-        )
-        transactions = (
-            pd.concat([self.transactions, transactions])
-            .drop_duplicates()
-            .sort_index(ascending=False)
-        )
+        with span("card update", product=self.name):
+            transactions = await get_product_transactions(
+                page,
+                self.name,
+                self.last_update,
+                is_credit_card=isinstance(self, CreditCard),
+                fetch_mode=fetch_mode,
+                is_open=is_open,
+            )
+        with span("merge", product=self.name):
+            transactions = merge_transactions(self.transactions, transactions)
 
         return dataclasses.replace(
             self, transactions=transactions, last_update=datetime.now()
         )
 
-    async def download(self, download_path: Path):
-        file_path = download_path / f"{self.name}.csv"
+    async def download(
+        self,
+        download_path: Path,
+        export_format: ExportFormat = ExportFormat.csv,
+        incremental: bool = False,
+    ):
+        file_path = export_path(download_path, self.name, export_format)
 
         if self.transactions is not None and not self.transactions.empty:
-            self.transactions.to_csv(file_path)
+            # pandas writers block, the other products are written meanwhile
+            file_path = await asyncio.to_thread(
+                export_transactions,
+                self.transactions,
+                download_path,
+                self.name,
+                export_format,
+                incremental,
+            )
 
         print(f"The card transactions have been downloaded as {file_path.resolve()}")
 
@@ -124,23 +301,12 @@ class Account:
         """
 
     def transactions_menu(self, position: int) -> str:
-        cards_lines = "\t".join(
-            [
-                f"{position}.{ascii_letters[i]}) {card.name}"
-                for i, card in enumerate(self.cards)
-            ]
+        return account_transactions_menu(
+            self.name, [card.name for card in self.cards], position
         )
-        message = f"""{self.name}
-        {f"Cards: {cards_lines}" if self.cards else ""}
-        """
-        return message
 
     def position(self) -> str:
-        message = f"""Account {self.name}
-        Balance: {self.balance}
-        Last update on {self.last_update}
-        """
-        return message
+        return account_position(self.name, self.balance, self.last_update)
 
     @classmethod
     def create(cls, name: str, raw_balance: str, cards: Tuple[Card, ...]):
@@ -219,36 +385,114 @@ class Account:
         )
         return Account.get_account_info(accounts, account_type)
 
+    def to_record(self, account: "Account" = None) -> ProductRecord:
+        return ProductRecord(
+            self.name,
+            ACCOUNT_KIND,
+            account=None,
+            balance=self.balance,
+            last_update=self.last_update,
+        )
+
+    @classmethod
+    def from_record(
+        cls,
+        record: ProductRecord,
+        cards: Tuple[Card, ...],
+        transactions: Optional[pd.DataFrame],
+    ) -> "Account":
+        return cls(
+            record.name,
+            balance=record.balance,
+            cards=cards,
+            transactions=transactions,
+            last_update=record.last_update,
+        )
+
     def touch(self) -> "Account":
         cards = tuple([card.touch() for card in self.cards])
         return dataclasses.replace(self, last_update=datetime.now(), cards=cards)
 
-    async def update(self, page: Page) -> "Account":
-        print(f"Obtaining transactions of {self.name}")
+    @property
+    def amount(self) -> float:
+        return self.balance
+
+    def fingerprint(self) -> Fingerprint:
+        return Fingerprint.of(self.amount, self.transactions)
+
+    async def get_fingerprint(self, page: Page) -> Fingerprint:
+        with span("fingerprint", product=self.name):
+            await open_product(page, self.name)
+            return Fingerprint.of(self.amount, await get_newest_transactions(page))
+
+    async def update(
+        self,
+        pages: PagePool,
+        previous: Optional["Account"] = None,
+        force: bool = False,
+        fetch_mode: FetchMode = FetchMode.dom,
+    ) -> "Account":
+        previous_cards = {card.name: card for card in previous.cards} if previous else {}
+        account, cards = await gather_or_cancel(
+            update_if_changed(
+                self,
+                previous,
+                pages,
+                partial(Account.update_transactions, fetch_mode=fetch_mode),
+                force,
+            ),
+            gather_or_cancel(
+                *[
+                    update_if_changed(
+                        card,
+                        previous_cards.get(card.name),
+                        pages,
+                        partial(Card.update, fetch_mode=fetch_mode),
+                        force,
+                    )
+                    for card in self.cards
+                ]
+            ),
+        )
 
-        cards = tuple([await card.update(page) for card in self.cards])
+        return dataclasses.replace(account, cards=tuple(cards))
 
-        await page.click(MY_PRODUCTS)
-        await page.click(f"text={self.name}")
-        transactions = await get_new_transactions(page, self.last_update)
-        transactions = (
-            pd.concat([self.transactions, transactions])
-            .drop_duplicates()
-            .sort_index(ascending=False)
-        )
+    async def update_transactions(
+        self, page: Page, fetch_mode: FetchMode = FetchMode.dom, is_open: bool = False
+    ) -> "Account":
+        print(f"Obtaining transactions of {self.name}")
+        with span("account update", product=self.name):
+            transactions = await get_product_transactions(
+                page,
+                self.name,
+                self.last_update,
+                fetch_mode=fetch_mode,
+                is_open=is_open,
+            )
+        with span("merge", product=self.name):
+            transactions = merge_transactions(self.transactions, transactions)
 
         return dataclasses.replace(
-            self, transactions=transactions, cards=cards, last_update=datetime.now()
+            self, transactions=transactions, last_update=datetime.now()
         )
 
-    async def download(self, download_path: Path):
-        file_path = download_path / f"{self.name}.csv"
+    async def download(
+        self,
+        download_path: Path,
+        export_format: ExportFormat = ExportFormat.csv,
+        incremental: bool = False,
+    ):
+        file_path = export_path(download_path, self.name, export_format)
 
         if self.transactions is not None:
-            self.transactions.to_csv(file_path)
-
-        for card in self.cards:
-            await card.download(download_path)
+            file_path = await asyncio.to_thread(
+                export_transactions,
+                self.transactions,
+                download_path,
+                self.name,
+                export_format,
+                incremental,
+            )
 
         print(f"The account transactions have been downloaded as {file_path.resolve()}")
 
@@ -260,42 +504,31 @@ class Position:
     last_update: datetime
 
     def __str__(self):
-        message = f"""
-        General Position
-        -----------------
-        
-        Balance: {self.balance}
-        Last update on {self.last_update}
-        
-        Accounts:
-        {"".join([f"{i + 1}) {account.position()}" for i, account in enumerate(self.accounts)])}
-        """
-
-        return message
+        return general_position(
+            self.balance,
+            self.last_update,
+            [account.position() for account in self.accounts],
+        )
 
     @staticmethod
     async def parse_balance(page: Page) -> Tuple[float, str]:
-        page_content = await page.content()
-        tree = HTMLParser(page_content)
-
-        if tree.body:
-            amount, currency = (
-                tree.body.css(OVERALL_POSITION_AMOUNT)[0]
-                .text(separator="\n", strip=True)
-                .split()
-            )
+        balance = await get_texts_within_css_selector(page, OVERALL_POSITION_AMOUNT)
+
+        if balance:
+            amount, currency = balance
             return get_number_from_string_with_dot_and_comma(amount), currency
 
     @staticmethod
     async def create(page: Page):
-        total_balance, currency = await Position.parse_balance(page)
-        await page.click(MY_PRODUCTS)
-        normal_accounts = await Account.parse_account(
-            page, NORMAL_ACCOUNTS, AccountType.normal
-        )
-        savings_accounts = await Account.parse_account(
-            page, SAVINGS_ACCOUNTS, AccountType.savings
-        )
+        with span("position"):
+            total_balance, currency = await Position.parse_balance(page)
+            await page.click(MY_PRODUCTS)
+            normal_accounts = await Account.parse_account(
+                page, NORMAL_ACCOUNTS, AccountType.normal
+            )
+            savings_accounts = await Account.parse_account(
+                page, SAVINGS_ACCOUNTS, AccountType.savings
+            )
         overall_position = Position(
             total_balance,
             (*normal_accounts, *savings_accounts),
@@ -303,8 +536,36 @@ class Position:
         )
         return overall_position
 
-    async def update(self, page: Page) -> "Position":
-        accounts = tuple([await account.update(page) for account in self.accounts])
+    async def update(
+        self,
+        page: Page,
+        jobs: int = 1,
+        previous: Optional["Position"] = None,
+        force: bool = False,
+        fetch_mode: FetchMode = FetchMode.dom,
+        blocker: Optional[ResourceBlocker] = None,
+    ) -> "Position":
+        """Updates every account and card. With a previous position only the products whose fingerprint changed are
+        scraped (all of them with force), starting from their previous transactions."""
+        previous_accounts = (
+            {account.name: account for account in previous.accounts}
+            if previous
+            else {}
+        )
+        async with PagePool(page, jobs, blocker) as pages:
+            accounts = tuple(
+                await gather_or_cancel(
+                    *[
+                        account.update(
+                            pages,
+                            previous_accounts.get(account.name),
+                            force,
+                            fetch_mode,
+                        )
+                        for account in self.accounts
+                    ]
+                )
+            )
 
         return dataclasses.replace(self, accounts=accounts, last_update=datetime.now())
 
@@ -312,9 +573,19 @@ class Position:
         accounts = tuple([account.touch() for account in self.accounts])
         return dataclasses.replace(self, last_update=datetime.now(), accounts=accounts)
 
-    async def download(self, download_path: Path):
-        for account in self.accounts:
-            await account.download(download_path)
+    async def download(
+        self,
+        download_path: Path,
+        export_format: ExportFormat = ExportFormat.csv,
+        incremental: bool = False,
+    ):
+        check_export_format(export_format)
+        await asyncio.gather(
+            *[
+                product.download(download_path, export_format, incremental)
+                for _, product in self.products()
+            ]
+        )
 
     def __eq__(self, other):
         # simplicity works
@@ -324,15 +595,92 @@ class Position:
         if other:
             return self.balance == other.balance
 
+    def products(self) -> Iterator[Tuple[Account, Union[Account, Card]]]:
+        """Every account followed by its cards, with the account they belong to."""
+        for account in self.accounts:
+            for product in (account, *account.cards):
+                yield account, product
+
+    def records(self) -> List[ProductRecord]:
+        return [product.to_record(account) for account, product in self.products()]
+
     def save(self):
-        with open(app_path / STATE_FILE_NAME, "wb") as state_file:
-            pickle.dump(self, state_file)
+        with span("save"), open_store() as store:
+            store.save_position(self.balance, self.last_update)
+            store.save_products(self.records())
+            for _, product in self.products():
+                store.append_transactions(
+                    product.name,
+                    product.transactions,
+                    merged_since(product.transactions),
+                )
+
+    @staticmethod
+    def from_store(
+        store: Store, with_transactions: bool = True
+    ) -> Optional["Position"]:
+        """Without transactions only the position and products tables are read, the transactions of the products are
+        left as None to be loaded on demand with ``store.load_transactions``."""
+        position = store.load_position()
+        if not position:
+            return None
+        balance, last_update = position
+
+        def load_transactions(name: str) -> Optional[pd.DataFrame]:
+            return store.load_transactions(name) if with_transactions else None
+
+        products = store.load_products()
+        accounts = [
+            Account.from_record(
+                record,
+                cards=tuple(
+                    Card.from_record(card, load_transactions(card.name))
+                    for card in products
+                    if card.account == record.name
+                ),
+                transactions=load_transactions(record.name),
+            )
+            for record in products
+            if record.kind == ACCOUNT_KIND
+        ]
+        return Position(balance, tuple(accounts), last_update)
 
     @staticmethod
-    def load() -> Optional["Position"]:
-        try:
-            with open(app_path / STATE_FILE_NAME, "rb") as state_file:
-                pickle_data = pickle.load(state_file)
-                return pickle_data
-        except FileNotFoundError:
-            pass
+    def load(with_transactions: bool = True) -> Optional["Position"]:
+        app_path = get_app_path()
+        if (app_path / LEGACY_STATE_FILE_NAME).exists():
+            Position.migrate_legacy_state()
+
+        if (app_path / STATE_FILE_NAME).exists():
+            with span("load"), open_store() as store:
+                return Position.from_store(store, with_transactions)
+
+    @staticmethod
+    def migrate_legacy_state():
+        app_path = get_app_path()
+        legacy_state_path = app_path / LEGACY_STATE_FILE_NAME
+        with open(legacy_state_path, "rb") as state_file:
+            position = pickle.load(state_file)
+
+        position = dataclasses.replace(
+            position,
+            accounts=tuple(
+                dataclasses.replace(
+                    account,
+                    transactions=normalize_legacy_transactions(account.transactions),
+                    cards=tuple(
+                        dataclasses.replace(
+                            card,
+                            transactions=normalize_legacy_transactions(
+                                card.transactions
+                            ),
+                        )
+                        for card in account.cards
+                    ),
+                )
+                for account in position.accounts
+            ),
+        )
+        position.save()
+        legacy_state_path.rename(legacy_state_path.with_suffix(".pkl.migrated"))
+        print(f"{legacy_state_path} has been migrated to {app_path / STATE_FILE_NAME}")
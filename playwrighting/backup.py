@@ -0,0 +1,184 @@
+import json
+import os
+import sqlite3
+import zlib
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from hashlib import sha256
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+
+from playwrighting.constants import SNAPSHOT_CHUNK_SIZE
+from playwrighting.exceptions import SnapshotDoesNotExist
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    id: str
+    created: datetime
+    size: int
+    # sha256 of every chunk of the state file, in order
+    chunks: List[str] = field(repr=False)
+    # bytes of the chunks that no previous snapshot had stored
+    written: int = 0
+
+    def to_json(self) -> str:
+        return json.dumps({**asdict(self), "created": self.created.isoformat()})
+
+    @staticmethod
+    def from_json(text: str) -> "Snapshot":
+        values = json.loads(text)
+        return Snapshot(
+            **{**values, "created": datetime.fromisoformat(values["created"])}
+        )
+
+
+def copy_state(state_path: Path, destiny_path: Path):
+    """Consistent copy of the state even if a daemon is writing it."""
+    origin = sqlite3.connect(state_path)
+    destiny = sqlite3.connect(destiny_path)
+    try:
+        origin.backup(destiny)
+    finally:
+        destiny.close()
+        origin.close()
+
+
+def retained(
+    snapshots: List[Snapshot], keep_last: int, keep_daily: int, keep_monthly: int
+) -> Set[str]:
+    """Ids of the latest ``keep_last`` snapshots and of the latest snapshot of each of the latest ``keep_daily`` days
+    and ``keep_monthly`` months."""
+    newest_first = sorted(
+        snapshots, key=lambda snapshot: snapshot.created, reverse=True
+    )
+    keep = {snapshot.id for snapshot in newest_first[:keep_last]}
+    for period_format, periods_to_keep in (
+        ("%Y-%m-%d", keep_daily),
+        ("%Y-%m", keep_monthly),
+    ):
+        periods = set()
+        for snapshot in newest_first:
+            period = snapshot.created.strftime(period_format)
+            if period in periods:
+                continue
+            if len(periods) == periods_to_keep:
+                break
+            periods.add(period)
+            keep.add(snapshot.id)
+    return keep
+
+
+class SnapshotStore:
+    """Snapshots of the state under ``snapshots`` in the app folder.
+
+    The state is split in fixed size chunks, SQLite changes the pages in place so most chunks are equal to the ones of
+    the previous snapshot. Every chunk is stored once, compressed, as ``objects/<sha256>`` and every snapshot is a
+    manifest listing its chunks, so a backup only writes the chunks that changed and a restore only reads the manifest
+    and the chunks of its snapshot.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.objects_path = path / "objects"
+        self.manifests_path = path / "manifests"
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects_path / digest[:2] / digest[2:]
+
+    def manifest_path(self, snapshot_id: str) -> Path:
+        # an id with separators would read or write outside the manifests
+        if snapshot_id in ("", ".", "..") or Path(snapshot_id).name != snapshot_id:
+            raise SnapshotDoesNotExist(f"Snapshot {snapshot_id} doesn't exist")
+        return self.manifests_path / f"{snapshot_id}.json"
+
+    def put(self, chunk: bytes) -> Tuple[str, int]:
+        """Digest of the chunk and the bytes written, none if it was already stored."""
+        digest = sha256(chunk).hexdigest()
+        path = self.object_path(digest)
+        if path.exists():
+            return digest, 0
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = path.with_suffix(".tmp")
+        temporary_path.write_bytes(zlib.compress(chunk))
+        os.replace(temporary_path, path)
+        return digest, len(chunk)
+
+    def get(self, digest: str) -> bytes:
+        return zlib.decompress(self.object_path(digest).read_bytes())
+
+    def new_id(self, name: Optional[str]) -> str:
+        snapshot_id = Path(name).name if name else f"{datetime.now():%Y%m%d-%H%M%S}"
+        candidate, suffix = snapshot_id, 1
+        while self.manifest_path(candidate).exists():
+            candidate = f"{snapshot_id}-{suffix}"
+            suffix += 1
+        return candidate
+
+    def create(self, state_path: Path, name: Optional[str] = None) -> Snapshot:
+        self.manifests_path.mkdir(parents=True, exist_ok=True)
+        copy_path = self.path / "state.copy"
+        copy_state(state_path, copy_path)
+
+        chunks, written, size = [], 0, 0
+        try:
+            with open(copy_path, "rb") as state_file:
+                while chunk := state_file.read(SNAPSHOT_CHUNK_SIZE):
+                    digest, chunk_written = self.put(chunk)
+                    chunks.append(digest)
+                    written += chunk_written
+                    size += len(chunk)
+        finally:
+            copy_path.unlink()
+
+        snapshot = Snapshot(self.new_id(name), datetime.now(), size, chunks, written)
+        # written last, a snapshot interrupted before its manifest leaves only objects that prune collects
+        self.manifest_path(snapshot.id).write_text(snapshot.to_json())
+        return snapshot
+
+    def list(self) -> List[Snapshot]:
+        if not self.manifests_path.exists():
+            return []
+        snapshots = [
+            Snapshot.from_json(path.read_text())
+            for path in self.manifests_path.glob("*.json")
+        ]
+        return sorted(snapshots, key=lambda snapshot: snapshot.created)
+
+    def load(self, snapshot_id: str) -> Snapshot:
+        try:
+            return Snapshot.from_json(self.manifest_path(snapshot_id).read_text())
+        except FileNotFoundError:
+            raise SnapshotDoesNotExist(f"Snapshot {snapshot_id} doesn't exist")
+
+    def restore(self, snapshot_id: str, state_path: Path) -> Snapshot:
+        snapshot = self.load(snapshot_id)
+        temporary_path = state_path.with_suffix(".restoring")
+        with open(temporary_path, "wb") as state_file:
+            for digest in snapshot.chunks:
+                state_file.write(self.get(digest))
+        os.replace(temporary_path, state_path)
+        return snapshot
+
+    def prune(
+        self, keep_last: int = 7, keep_daily: int = 30, keep_monthly: int = 12
+    ) -> List[Snapshot]:
+        """Removes the snapshots out of the retention policy and then the chunks no snapshot uses anymore."""
+        snapshots = self.list()
+        keep = retained(snapshots, keep_last, keep_daily, keep_monthly)
+        removed = [snapshot for snapshot in snapshots if snapshot.id not in keep]
+        for snapshot in removed:
+            self.manifest_path(snapshot.id).unlink()
+
+        used = {
+            digest
+            for snapshot in snapshots
+            if snapshot.id in keep
+            for digest in snapshot.chunks
+        }
+        if self.objects_path.exists():
+            for path in self.objects_path.glob("*/*"):
+                if f"{path.parent.name}{path.name}" not in used:
+                    path.unlink()
+        return removed
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import time
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import List, Optional
+
+from playwright.async_api import Browser, Error
+
+from playwrighting.accounts import Position
+from playwrighting.config import Profile, get_app_path, get_config, use_profile
+from playwrighting.constants import FetchMode
+from playwrighting.navigation.routing import ResourceBlocker
+from playwrighting.navigation.session import new_page, resume_or_login, save_session
+
+
+@dataclass(frozen=True)
+class ProfileResult:
+    profile: str
+    success: bool
+    duration: float
+    error: Optional[str] = None
+
+
+async def update_profile(
+    browser: Browser,
+    jobs: int = 1,
+    force: bool = False,
+    fetch_mode: FetchMode = FetchMode.dom,
+    no_blocking: bool = False,
+):
+    """Updates the position of the current profile in its own browser context."""
+    blocker = None if no_blocking else ResourceBlocker.from_config(get_config())
+    page = await new_page(browser, blocker)
+
+    try:
+        await resume_or_login(page)
+        position = await Position.create(page)
+        position = await position.update(
+            page,
+            jobs,
+            previous=Position.load(),
+            force=force,
+            fetch_mode=fetch_mode,
+            blocker=blocker,
+        )
+        position.save()
+        await save_session(page)
+    except Exception:
+        screenshots_path = get_app_path() / "screenshots"
+        screenshots_path.mkdir(exist_ok=True)
+        with suppress(Error):
+            await page.screenshot(path=screenshots_path / "before_error.png")
+        raise
+    finally:
+        await page.context.close()
+
+
+async def run_profile(
+    browser: Browser,
+    profile: Profile,
+    semaphore: asyncio.Semaphore,
+    timeout: Optional[float],
+    **options,
+) -> ProfileResult:
+    async with semaphore:
+        start = time.perf_counter()
+        # set in the task of this profile, the other profiles keep theirs
+        with use_profile(profile):
+            try:
+                await asyncio.wait_for(update_profile(browser, **options), timeout)
+            except asyncio.TimeoutError:
+                return ProfileResult(
+                    profile.name,
+                    False,
+                    time.perf_counter() - start,
+                    f"Timeout after {timeout} seconds",
+                )
+            except Exception as e:
+                logging.exception(e)
+                return ProfileResult(
+                    profile.name,
+                    False,
+                    time.perf_counter() - start,
+                    f"{type(e).__name__}: {e}",
+                )
+        return ProfileResult(profile.name, True, time.perf_counter() - start)
+
+
+async def run_batch(
+    browser: Browser,
+    profiles: List[Profile],
+    concurrency: int = 2,
+    timeout: Optional[float] = None,
+    **options,
+) -> List[ProfileResult]:
+    """Updates every profile in its own context of the shared browser, at most ``concurrency`` at the same time.
+
+    A failure or a timeout of a profile is reported in its result, the other profiles go on.
+    """
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    return list(
+        await asyncio.gather(
+            *[
+                run_profile(browser, profile, semaphore, timeout, **options)
+                for profile in profiles
+            ]
+        )
+    )
+
+
+def results_table(results: List[ProfileResult]):
+    from rich.table import Table
+
+    table = Table(title="Batch")
+    for column in ("profile", "result", "duration (s)", "error"):
+        table.add_column(column)
+    for result in results:
+        table.add_row(
+            result.profile,
+            "OK" if result.success else "FAILED",
+            f"{result.duration:.1f}",
+            result.error or "",
+        )
+    return table
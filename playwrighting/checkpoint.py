@@ -0,0 +1,123 @@
+import sqlite3
+from contextlib import contextmanager
+from contextvars import ContextVar
+from io import StringIO
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import pandas as pd
+
+from playwrighting.config import get_app_path
+from playwrighting.constants import CHECKPOINT_FILE_NAME
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS months (
+    product TEXT NOT NULL,
+    month TEXT NOT NULL,
+    transactions TEXT NOT NULL,
+    PRIMARY KEY (product, month)
+);
+CREATE TABLE IF NOT EXISTS products (
+    product TEXT PRIMARY KEY,
+    transactions TEXT NOT NULL
+);
+"""
+
+_checkpoint: ContextVar[Optional["Checkpoint"]] = ContextVar("checkpoint", default=None)
+
+
+def to_json(transactions: pd.DataFrame) -> str:
+    return transactions.to_json(orient="split", date_format="iso", index=False)
+
+
+def from_json(text: str) -> pd.DataFrame:
+    transactions = pd.read_json(
+        StringIO(text), orient="split", convert_dates=False, dtype=False
+    )
+    if "Fecha" in transactions:
+        transactions["Fecha"] = pd.to_datetime(transactions["Fecha"])
+    return transactions
+
+
+class Checkpoint:
+    """Transactions scraped by an init or update, saved as every month page and every product is done, in a file of
+    their own so an interrupted run leaves no state behind. The run that ends saving the position removes it, a run
+    with --resume takes the products and months it has instead of scraping them again.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self.path)
+        try:
+            with connection:
+                connection.executescript(SCHEMA)
+                yield connection
+        finally:
+            connection.close()
+
+    def clear(self):
+        self.path.unlink(missing_ok=True)
+
+    def save_month(self, product: str, month: str, transactions: pd.DataFrame):
+        """Table of a month page as it was read, before being cleaned."""
+        with self.connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO months VALUES (?, ?, ?)",
+                (product, month, to_json(transactions)),
+            )
+
+    def load_months(self, product: str) -> Dict[str, pd.DataFrame]:
+        if not self.path.exists():
+            return {}
+        with self.connect() as connection:
+            rows = connection.execute(
+                "SELECT month, transactions FROM months WHERE product = ?", (product,)
+            ).fetchall()
+        return {month: from_json(transactions) for month, transactions in rows}
+
+    def save_product(self, product: str, transactions: Optional[pd.DataFrame]):
+        """Transactions of a product once it's updated, its months aren't needed anymore."""
+        if transactions is None:
+            return
+        with self.connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO products VALUES (?, ?)",
+                (product, to_json(transactions.reset_index())),
+            )
+            connection.execute("DELETE FROM months WHERE product = ?", (product,))
+
+    def load_product(self, product: str) -> Optional[pd.DataFrame]:
+        if not self.path.exists():
+            return None
+        with self.connect() as connection:
+            row = connection.execute(
+                "SELECT transactions FROM products WHERE product = ?", (product,)
+            ).fetchone()
+        if not row:
+            return None
+        transactions = from_json(row[0])
+        if "Fecha" not in transactions:
+            return pd.DataFrame()
+        return transactions.set_index("Fecha")
+
+
+@contextmanager
+def checkpointing(resume: bool = False) -> Iterator[Checkpoint]:
+    """Checkpoints the products and months scraped inside, including by the tasks it creates. Without resume the
+    checkpoint of a previous run is discarded."""
+    checkpoint = Checkpoint(get_app_path() / CHECKPOINT_FILE_NAME)
+    if not resume:
+        checkpoint.clear()
+
+    token = _checkpoint.set(checkpoint)
+    try:
+        yield checkpoint
+    finally:
+        _checkpoint.reset(token)
+
+
+def current_checkpoint() -> Optional[Checkpoint]:
+    return _checkpoint.get()
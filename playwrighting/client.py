@@ -0,0 +1,103 @@
+import json
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, TYPE_CHECKING
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import urlopen, Request
+
+from playwrighting.config import get_app_path
+from playwrighting.constants import DAEMON_TOKEN_FILE_NAME
+from playwrighting.exceptions import DaemonNotAvailable
+from playwrighting.storage import ProductRecord, TransactionsQuery, from_iso
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DAEMON_TIMEOUT = 30
+
+
+def daemon_url(address: str) -> str:
+    return address if address.startswith("http") else f"http://{address}"
+
+
+def daemon_token_path() -> Path:
+    return get_app_path() / DAEMON_TOKEN_FILE_NAME
+
+
+def read_daemon_token() -> Optional[str]:
+    path = daemon_token_path()
+    return path.read_text().strip() if path.exists() else None
+
+
+class DaemonClient:
+    """Reads the position served by ``pying serve`` with the same methods as :class:`playwrighting.storage.Store`, so
+    ``Position.from_store`` builds the position from the daemon instead of the local state."""
+
+    def __init__(self, address: str, token: Optional[str] = None):
+        self.url = daemon_url(address).rstrip("/")
+        # the daemon runs as the same user, its token is in the same app folder
+        self.token = token or read_daemon_token()
+
+    def request(self, path: str, method: str = "GET", **query):
+        url = f"{self.url}{path}"
+        if query:
+            url = f"{url}?{urlencode(query)}"
+        try:
+            headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+            with urlopen(
+                Request(url, method=method, headers=headers), timeout=DAEMON_TIMEOUT
+            ) as response:
+                return json.load(response)
+        except HTTPError as e:
+            # a proxy in between can answer with an html page
+            try:
+                error = json.load(e).get("error")
+            except (AttributeError, ValueError):
+                error = e.reason
+            raise DaemonNotAvailable(
+                f"The daemon at {self.url} answered {e.code}: {error}"
+            )
+        except URLError as e:
+            raise DaemonNotAvailable(f"Cannot connect to the daemon at {self.url}: {e}")
+
+    def load_position(self) -> Optional[Tuple[float, datetime]]:
+        position = self.request("/position")
+        if position:
+            return position["balance"], from_iso(position["last_update"])
+
+    def load_products(self) -> List[ProductRecord]:
+        return [
+            ProductRecord(**{**record, "last_update": from_iso(record["last_update"])})
+            for record in self.request("/products")
+        ]
+
+    def load_transactions(self, product: str) -> "pd.DataFrame":
+        import pandas as pd
+
+        records = self.request("/transactions", product=product)
+        if not records:
+            return pd.DataFrame()
+
+        transactions = pd.DataFrame.from_records(records)
+        transactions.index = pd.DatetimeIndex(
+            pd.to_datetime(transactions.pop("Fecha")), name="Fecha"
+        )
+        return transactions
+
+    def query_transactions(
+        self, product: str, query: TransactionsQuery
+    ) -> Iterator[Tuple[str, dict]]:
+        """Like Store.query_transactions, the daemon sends every transaction of the product and they're filtered
+        here."""
+        rows = (
+            (record.pop("Fecha")[:10], record)
+            for record in self.request("/transactions", product=product)
+        )
+        matching = (row for row in rows if query.matches(*row))
+        stop = None if query.limit is None else query.offset + query.limit
+        return islice(matching, query.offset, stop)
+
+    def refresh(self, force: bool = False) -> dict:
+        return self.request("/refresh", method="POST", force=int(force))
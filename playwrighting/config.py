@@ -1,11 +1,16 @@
+import dataclasses
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+from typing import Iterator, List, Optional
 
 from configclasses import configclass
 from configclasses.configclasses import dump
 from configclasses.exceptions import ConfigFilePathDoesNotExist
 from rich import print
-from rich.prompt import Prompt
 
 
 @configclass
@@ -16,9 +21,23 @@ class Config:
     birthday_month: str
     birthday_year: str
     download_path: str
+    blocked_resource_types: str = "image,media"
+    blocked_url_patterns: str = "google-analytics|googletagmanager|doubleclick|facebook|hotjar|omtrdc|demdex|adobedtm"
+    # host:port of a running `pying serve`, show and download read from it instead of the local state
+    daemon_address: str = ""
+    # minutes a saved session is reused at most, empty to reuse it while its cookies last and the bank keeps it open
+    session_max_age_minutes: str = ""
+    # launch a new browser every time (launch), keep the profile of the browser with its HTTP cache and service workers
+    # in browser_profile_path between runs (persistent) or connect to a running one (cdp), e.g. started with
+    # chromium --remote-debugging-port=9222
+    browser_mode: str = "launch"
+    browser_profile_path: str = ""
+    cdp_endpoint: str = "http://localhost:9222"
 
     @classmethod
     def ask_for_config_parameters(cls, root_path: Path) -> "Config":
+        from rich.prompt import Prompt
+
         print(
             f"Configuration file doesn't exist in the expected path {root_path / '.env'}"
         )
@@ -40,17 +59,91 @@ class Config:
 
 
 app_path = Path("~/playwrighting").expanduser()
-app_path.mkdir(exist_ok=True)
 config_path = app_path / ".env"
-
-try:
-    config = Config.from_path(config_path)
-except ConfigFilePathDoesNotExist:
-    config = Config.ask_for_config_parameters(app_path)
-    dump(config, config_path)
-
 screenshots_path = app_path / "screenshots"
-screenshots_path.mkdir(exist_ok=True)
 account_page_screenshot_path = screenshots_path / "account_page.png"
 before_timeout_screenshot_path = screenshots_path / "before_timeout.png"
 before_error_screenshot_path = screenshots_path / "before_error.png"
+profiles_path = app_path / "profiles"
+
+
+@dataclass(frozen=True)
+class Profile:
+    """Customer with its own configuration and state under ``profiles/<name>`` in the app folder."""
+
+    name: str
+
+    @property
+    def path(self) -> Path:
+        return profiles_path / self.name
+
+    @property
+    def config_path(self) -> Path:
+        return self.path / ".env"
+
+    @staticmethod
+    def all() -> List["Profile"]:
+        if not profiles_path.exists():
+            return []
+        return [
+            Profile(path.name)
+            for path in sorted(profiles_path.iterdir())
+            if (path / ".env").exists()
+        ]
+
+
+# the profile of the running task, concurrent tasks of a batch use different profiles
+_profile: ContextVar[Optional[Profile]] = ContextVar("profile", default=None)
+
+
+@contextmanager
+def use_profile(profile: Profile) -> Iterator[Profile]:
+    token = _profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _profile.reset(token)
+
+
+def get_app_path() -> Path:
+    """Folder of the state and the session, the app folder or the one of the current profile."""
+    profile = _profile.get()
+    return profile.path if profile else app_path
+
+
+def get_config() -> Config:
+    profile = _profile.get()
+    if profile:
+        return load_profile_config(profile.config_path)
+    return load_config()
+
+
+@lru_cache()
+def load_config() -> Config:
+    """Loads the configuration the first time it is needed, asking for it if the file doesn't exist yet."""
+    app_path.mkdir(exist_ok=True)
+    screenshots_path.mkdir(exist_ok=True)
+
+    try:
+        return Config.from_path(config_path)
+    except ConfigFilePathDoesNotExist:
+        config = Config.ask_for_config_parameters(app_path)
+        dump(config, config_path)
+        return config
+
+
+@lru_cache()
+def load_profile_config(path: Path) -> Config:
+    # Config.from_path sets the values as environment variables, which are shared by every profile
+    from dotenv import dotenv_values
+
+    if not path.exists():
+        raise ConfigFilePathDoesNotExist(f"Profile configuration {path} doesn't exist")
+
+    fields = {field.name for field in dataclasses.fields(Config)}
+    values = {
+        key: value
+        for key, value in dotenv_values(path).items()
+        if key in fields and value is not None
+    }
+    return Config(**values)
@@ -1,7 +1,103 @@
-STATE_FILE_NAME = "state.pkl"
+import os
+from enum import Enum
 
-LOGIN_URL = "https://ing.ingdirect.es/app-login/"
-MAIN_URL = "https://ing.ingdirect.es/pfm/#overall-position"
+STATE_FILE_NAME = "state.db"
+LEGACY_STATE_FILE_NAME = "state.pkl"
+# progress of an interrupted init/update, see playwrighting.checkpoint
+CHECKPOINT_FILE_NAME = "checkpoint.db"
+STATE_MMAP_SIZE = 256 * 1024 * 1024
+# content addressed backups of the state, see playwrighting.backup
+SNAPSHOTS_FOLDER_NAME = "snapshots"
+SNAPSHOT_CHUNK_SIZE = 64 * 1024
+# the 90 days phone validation of a product is confirmed by writing its name to this file in the app folder or by
+# pressing enter
+PHONE_VALIDATION_FILE_NAME = "phone_validated"
+PHONE_VALIDATION_TIMEOUT = 300
+PHONE_VALIDATION_POLL_INTERVAL = 1
+SESSION_FILE_NAME = "session.json"
+# written by pying serve, the clients send it with every request
+DAEMON_TOKEN_FILE_NAME = "daemon_token"
+SESSION_PROBE_TIMEOUT = 10_000
+# wait for the movements page to change after previous month or Ver más, its state is read anyway after it
+PAGE_CHANGE_TIMEOUT = 5_000
+
+# overridable to scrape a local stand-in of the web app (see benchmarks/standin)
+BASE_URL = os.environ.get("PYING_BASE_URL", "https://ing.ingdirect.es").rstrip("/")
+LOGIN_URL = f"{BASE_URL}/app-login/"
+MAIN_URL = f"{BASE_URL}/pfm/#overall-position"
 IS_ACTIVATED = "Encendida"
 ACCOUNT_DELIMITER = "Cuenta"
 CARD_DELIMITER = "Tarjeta"
+
+# month names of the date navigator labels, e.g. "Marzo 2021" or "Enero-Marzo 2021" in savings accounts
+SPANISH_MONTHS = {
+    "enero": 1,
+    "febrero": 2,
+    "marzo": 3,
+    "abril": 4,
+    "mayo": 5,
+    "junio": 6,
+    "julio": 7,
+    "agosto": 8,
+    "septiembre": 9,
+    "setiembre": 9,
+    "octubre": 10,
+    "noviembre": 11,
+    "diciembre": 12,
+}
+
+ACCOUNT_KIND = "account"
+CREDIT_CARD_KIND = "credit_card"
+DEBIT_CARD_KIND = "debit_card"
+
+# movements json downloaded by the web app, used by the api fetch mode
+# assumed schema of the movements api of the web app, the api fetch mode falls back to the dom when no response
+# matches it: GET .../movements responding {"elements": [{"uuid", "effectiveDate", "description", "amount", ...}]}
+MOVEMENTS_API_URL_PATTERN = r"/movements(\?|$)"
+MOVEMENTS_API_ELEMENTS = "elements"
+MOVEMENTS_API_ID = "uuid"
+MOVEMENTS_API_COLUMNS = {
+    "effectiveDate": "Fecha",
+    "category.name": "Categoría",
+    "description": "Descripción",
+    "amount": "Importe",
+    "balance": "Saldo",
+}
+
+
+class BrowserMode(str, Enum):
+    launch: str = "launch"
+    persistent: str = "persistent"
+    cdp: str = "cdp"
+
+
+# profile of the persistent browser in the app folder, if the configuration doesn't give another one
+BROWSER_PROFILE_FOLDER_NAME = "browser"
+
+
+class FetchMode(str, Enum):
+    dom: str = "dom"
+    api: str = "api"
+
+
+class ExportFormat(str, Enum):
+    csv: str = "csv"
+    csv_gz: str = "csv.gz"
+    parquet: str = "parquet"
+    feather: str = "feather"
+    ndjson: str = "ndjson"
+
+
+# formats that can't be appended to, incremental exports write a new part file in a folder instead
+COLUMNAR_EXPORT_FORMATS = (ExportFormat.parquet, ExportFormat.feather)
+EXPORT_WATERMARK_SUFFIX = ".watermark.json"
+
+
+class ShowOutput(str, Enum):
+    pager: str = "pager"
+    json: str = "json"
+    csv: str = "csv"
+
+
+# transactions rendered at a time into the pager
+SHOW_PAGE_SIZE = 50
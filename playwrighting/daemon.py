@@ -0,0 +1,221 @@
+import asyncio
+import dataclasses
+import hmac
+import json
+import logging
+import os
+import secrets
+from datetime import datetime
+from http import HTTPStatus
+from typing import Dict, Optional, Set, Tuple
+from urllib.parse import urlparse, parse_qs
+
+from playwright.async_api import Page, Error, TimeoutError as PlayWrightTimeout
+from rich import print
+
+from playwrighting.accounts import Position
+from playwrighting.client import daemon_token_path
+from playwrighting.config import before_error_screenshot_path
+from playwrighting.constants import FetchMode
+from playwrighting.exceptions import PhoneNotValidated
+from playwrighting.navigation.login import login
+from playwrighting.navigation.routing import ResourceBlocker
+from playwrighting.navigation.session import is_logged_in, save_session
+from playwrighting.storage import to_iso
+
+MAX_REQUEST_HEADERS = 100
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+WILDCARD_HOSTS = ("", "0.0.0.0", "::")
+
+
+def allowed_hosts(host: str, port: int) -> Set[str]:
+    """Host headers of the requests sent to the bound address, any of the loopback names when it is a loopback one."""
+    hosts = LOOPBACK_HOSTS if host in LOOPBACK_HOSTS else (host,)
+    return {f"[{name}]:{port}" if ":" in name else f"{name}:{port}" for name in hosts}
+
+
+class Daemon:
+    """Keeps a logged in page and the position in memory.
+
+    Every ``interval`` seconds only the overall position balance is read, the accounts and cards are scraped (like
+    update does) when it has changed. The position is served as json over localhost HTTP:
+
+    - GET /position, /products and /transactions?product=NAME, readable by :class:`playwrighting.client.DaemonClient`
+    - GET /health
+    - POST /refresh[?force=1] to check the balance now
+
+    Every request must carry the token written in the app folder (``Authorization: Bearer TOKEN``) and, unless the
+    daemon listens on every interface, a Host header of the bound address, so a web page can't read it through DNS
+    rebinding.
+    """
+
+    def __init__(
+        self,
+        page: Page,
+        position: Optional[Position],
+        interval: float = 300,
+        jobs: int = 1,
+        fetch_mode: FetchMode = FetchMode.dom,
+        blocker: Optional[ResourceBlocker] = None,
+    ):
+        self.page = page
+        self.position = position
+        self.interval = interval
+        self.jobs = jobs
+        self.fetch_mode = fetch_mode
+        self.blocker = blocker
+        self.last_check: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.token = secrets.token_urlsafe(32)
+        # None accepts any Host header
+        self.hosts: Optional[Set[str]] = set()
+        self._lock = asyncio.Lock()
+
+    def save_token(self):
+        path = daemon_token_path()
+        descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descriptor, "w") as token_file:
+            token_file.write(self.token)
+        path.chmod(0o600)
+
+    def reject(self, headers: Dict[str, str]) -> Optional[Tuple[HTTPStatus, dict]]:
+        """Error response of a request with an unknown Host header or without the token."""
+        if self.hosts is not None and headers.get("host") not in self.hosts:
+            return HTTPStatus.FORBIDDEN, {"error": "Unknown host"}
+        if not hmac.compare_digest(
+            headers.get("authorization", "").encode(),
+            f"Bearer {self.token}".encode(),
+        ):
+            return HTTPStatus.UNAUTHORIZED, {"error": "Missing or wrong token"}
+        return None
+
+    async def refresh(self, force: bool = False) -> bool:
+        """Scrapes the products if the balance has changed (always with force), returns whether it did."""
+        async with self._lock:
+            if not await is_logged_in(self.page):
+                await login(self.page)
+                await save_session(self.page)
+
+            balance, _ = await Position.parse_balance(self.page)
+            self.last_check = datetime.now()
+            if not force and self.position and balance == self.position.balance:
+                return False
+
+            print(f"Balance changed to {balance}, updating the position")
+            position = await Position.create(self.page)
+            self.position = await position.update(
+                self.page,
+                self.jobs,
+                previous=self.position,
+                force=force,
+                fetch_mode=self.fetch_mode,
+                blocker=self.blocker,
+            )
+            self.position.save()
+            await save_session(self.page)
+            return True
+
+    async def watch(self):
+        while True:
+            try:
+                await self.refresh()
+                self.last_error = None
+            except (PlayWrightTimeout, Error, PhoneNotValidated) as e:
+                # the next check starts from the overall position again
+                self.last_error = str(e)
+                await self.page.screenshot(path=before_error_screenshot_path)
+                logging.exception(e)
+            except Exception as e:
+                # a bug in a single check must not stop the daemon
+                self.last_error = str(e)
+                logging.exception(e)
+            await asyncio.sleep(self.interval)
+
+    async def respond(self, method: str, target: str) -> Tuple[HTTPStatus, object]:
+        url = urlparse(target)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        position = self.position
+
+        if method == "GET" and url.path == "/health":
+            return HTTPStatus.OK, {
+                "last_check": to_iso(self.last_check),
+                "last_update": to_iso(position.last_update if position else None),
+                "last_error": self.last_error,
+            }
+        if method == "POST" and url.path == "/refresh":
+            updated = await self.refresh(force=query.get("force") == "1")
+            return HTTPStatus.OK, {"updated": updated}
+        if method != "GET":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"{method} not allowed"}
+
+        if url.path == "/position":
+            if not position:
+                return HTTPStatus.OK, None
+            return HTTPStatus.OK, {
+                "balance": position.balance,
+                "last_update": to_iso(position.last_update),
+            }
+        if url.path == "/products":
+            return HTTPStatus.OK, [
+                {
+                    **dataclasses.asdict(record),
+                    "last_update": to_iso(record.last_update),
+                }
+                for record in (position.records() if position else [])
+            ]
+        if url.path == "/transactions":
+            products = {
+                product.name: product
+                for _, product in (position.products() if position else [])
+            }
+            product = products.get(query.get("product"))
+            if not product:
+                return HTTPStatus.NOT_FOUND, {"error": "Unknown product"}
+            if product.transactions is None or product.transactions.empty:
+                return HTTPStatus.OK, []
+            return HTTPStatus.OK, json.loads(
+                product.transactions.reset_index().to_json(
+                    orient="records", date_format="iso"
+                )
+            )
+        return HTTPStatus.NOT_FOUND, {"error": f"{url.path} not found"}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            method, target, _ = (await reader.readline()).decode().split(" ", 2)
+            # the body is not needed by any endpoint
+            headers = {}
+            for _ in range(MAX_REQUEST_HEADERS):
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode().partition(":")
+                headers[name.strip().lower()] = value.strip()
+            status, payload = self.reject(headers) or await self.respond(method, target)
+        except ValueError:
+            status, payload = HTTPStatus.BAD_REQUEST, {"error": "Bad request"}
+        except (PlayWrightTimeout, Error, PhoneNotValidated) as e:
+            status, payload = HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)}
+        except Exception as e:
+            logging.exception(e)
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {
+                "error": "Internal error"
+            }
+
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        writer.write(
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+        writer.close()
+
+    async def serve(self, host: str, port: int):
+        server = await asyncio.start_server(self.handle, host, port)
+        self.hosts = None if host in WILDCARD_HOSTS else allowed_hosts(host, port)
+        self.save_token()
+        print(f"Serving the position on http://{host}:{port}")
+        async with server:
+            await asyncio.gather(server.serve_forever(), self.watch())
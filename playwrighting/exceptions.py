@@ -16,3 +16,35 @@ class NotAValidChoice(Exception):
 
 class ParentDirectoryDoesNotExist(Exception):
     pass
+
+
+class TransactionsTableNotParsed(Exception):
+    pass
+
+
+class MonthNotParsed(Exception):
+    pass
+
+
+class DaemonNotAvailable(Exception):
+    pass
+
+
+class ProfileDoesNotExist(Exception):
+    pass
+
+
+class ExportFormatNotAvailable(Exception):
+    pass
+
+
+class SnapshotDoesNotExist(Exception):
+    pass
+
+
+class PhoneNotValidated(Exception):
+    pass
+
+
+class MovementsNotCaptured(Exception):
+    pass
@@ -0,0 +1,177 @@
+import json
+import shutil
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from importlib.util import find_spec
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+
+from playwrighting.constants import (
+    ExportFormat,
+    COLUMNAR_EXPORT_FORMATS,
+    EXPORT_WATERMARK_SUFFIX,
+)
+from playwrighting.exceptions import ExportFormatNotAvailable
+from playwrighting.merge import transaction_keys
+from playwrighting.storage import (
+    Store,
+    MONTHLY_TOTALS_COLUMNS,
+    DESCRIPTION_TOTALS_COLUMNS,
+)
+
+
+@dataclass(frozen=True)
+class Watermark:
+    """Newest day already exported to a file and the keys of every transaction exported since the first day of its
+    month. An update scrapes again from the month of the previous one, so transactions back-dated up to there can be
+    added after they have been exported."""
+
+    last_day: str
+    keys: List[str]
+    since: str
+
+    @staticmethod
+    def of(transactions: pd.DataFrame) -> Optional["Watermark"]:
+        if transactions.empty:
+            return None
+        last_day = transactions.index.max()
+        since = last_day.replace(day=1)
+        exported = transactions[transactions.index >= since]
+        return Watermark(
+            last_day.strftime("%Y-%m-%d"),
+            transaction_keys(exported),
+            since.strftime("%Y-%m-%d"),
+        )
+
+    @staticmethod
+    def load(path: Path) -> Optional["Watermark"]:
+        try:
+            watermark = json.loads(path.read_text())
+            # watermarks written before since only kept the keys of the last day
+            watermark.setdefault("since", watermark.get("last_day"))
+            return Watermark(**watermark)
+        except (FileNotFoundError, AttributeError, TypeError, ValueError):
+            return None
+
+    def save(self, path: Path):
+        path.write_text(json.dumps(asdict(self), ensure_ascii=False))
+
+    def newer(self, transactions: pd.DataFrame) -> pd.DataFrame:
+        """The transactions that haven't been exported yet."""
+        window = transactions[transactions.index >= pd.Timestamp(self.since)]
+        exported = set(self.keys)
+        return window[[key not in exported for key in transaction_keys(window)]]
+
+    def back_dated(self, transactions: pd.DataFrame) -> bool:
+        """Whether any of the transactions is older than the newest day exported."""
+        return not transactions.empty and transactions.index.min() < pd.Timestamp(
+            self.last_day
+        )
+
+
+def check_export_format(export_format: ExportFormat):
+    if export_format in COLUMNAR_EXPORT_FORMATS and not find_spec("pyarrow"):
+        raise ExportFormatNotAvailable(
+            f"{export_format.value} export needs pyarrow, install it with pip install playwrighting[columnar]"
+        )
+
+
+def export_path(download_path: Path, name: str, export_format: ExportFormat) -> Path:
+    return download_path / f"{name}.{export_format.value}"
+
+
+def write(
+    transactions: pd.DataFrame,
+    path: Path,
+    export_format: ExportFormat,
+    append: bool = False,
+):
+    if export_format in (ExportFormat.csv, ExportFormat.csv_gz):
+        transactions.to_csv(
+            path, mode="a" if append else "w", header=not append, compression="infer"
+        )
+    elif export_format == ExportFormat.ndjson:
+        lines = transactions.reset_index().to_json(
+            orient="records", lines=True, date_format="iso", force_ascii=False
+        )
+        with open(path, "a" if append else "w", encoding="utf-8") as file:
+            if lines:
+                file.write(lines if lines.endswith("\n") else f"{lines}\n")
+    elif export_format == ExportFormat.parquet:
+        transactions.reset_index().to_parquet(path, index=False)
+    elif export_format == ExportFormat.feather:
+        transactions.reset_index().to_feather(path)
+
+
+def export_transactions(
+    transactions: pd.DataFrame,
+    download_path: Path,
+    name: str,
+    export_format: ExportFormat = ExportFormat.csv,
+    incremental: bool = False,
+) -> Path:
+    """Writes the transactions of a product, blocking, run it in a thread.
+
+    In incremental mode only the transactions newer than the watermark of the file are appended and the watermark is
+    moved. Incremental files are written oldest first, so appending keeps them in order, and back-dated transactions
+    rewrite the whole file instead. Columnar formats can't be appended to, so they are written as a folder with a part
+    file per export.
+    """
+    path = export_path(download_path, name, export_format)
+    columnar = export_format in COLUMNAR_EXPORT_FORMATS
+    watermark_path = path.with_name(path.name + EXPORT_WATERMARK_SUFFIX)
+
+    if not incremental:
+        # a previous incremental export of the same format
+        if path.is_dir():
+            shutil.rmtree(path)
+        write(transactions, path, export_format)
+        watermark_path.unlink(missing_ok=True)
+        return path
+
+    # oldest first, the order appended transactions follow (they are stored newest first)
+    transactions = transactions.iloc[::-1].sort_index(kind="stable")
+    watermark = Watermark.load(watermark_path) if path.exists() else None
+    if watermark:
+        pending = watermark.newer(transactions)
+    else:
+        pending = transactions
+        if columnar:
+            # a previous full export of the same format
+            if path.is_file():
+                path.unlink()
+            path.mkdir(parents=True, exist_ok=True)
+
+    if not pending.empty:
+        if columnar:
+            part = path / f"part-{datetime.now():%Y%m%d%H%M%S%f}.{export_format.value}"
+            write(pending, part, export_format)
+        elif watermark and watermark.back_dated(pending):
+            write(transactions, path, export_format)
+        else:
+            write(pending, path, export_format, append=watermark is not None)
+        Watermark.of(transactions).save(watermark_path)
+    elif not path.exists() and not columnar:
+        write(pending, path, export_format)
+
+    return path
+
+
+def export_aggregates(
+    store: Store, download_path: Path, export_format: ExportFormat = ExportFormat.csv
+) -> List[Path]:
+    """Writes the monthly and the description totals of every product, they are small so always whole."""
+    paths = []
+    for name, rows, columns in (
+        ("monthly_totals", store.monthly_totals(), MONTHLY_TOTALS_COLUMNS),
+        ("description_totals", store.description_totals(), DESCRIPTION_TOTALS_COLUMNS),
+    ):
+        path = export_path(download_path, name, export_format)
+        if path.is_dir():
+            shutil.rmtree(path)
+        aggregates = pd.DataFrame.from_records(rows, columns=columns)
+        write(aggregates.set_index("product"), path, export_format)
+        paths.append(path)
+    return paths
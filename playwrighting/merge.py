@@ -0,0 +1,77 @@
+from typing import List, Optional
+
+import pandas as pd
+
+# besides the date, the columns that tell apart two transactions of the same product
+KEY_COLUMNS = ("Descripción", "Importe", "Saldo")
+# attrs key of the first day a history can differ from the stored one, set by the merge and by the store
+MERGED_SINCE = "merged_since"
+
+
+def key_value(value) -> str:
+    if value is None or value != value:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
+
+
+def transaction_keys(transactions: pd.DataFrame) -> List[str]:
+    """date|description|amount|balance|occurrence of every transaction.
+
+    The occurrence index numbers the transactions that are identical in everything else, so genuinely repeated
+    transactions (two equal payments the same day) keep different keys instead of being collapsed.
+    """
+    if transactions is None or transactions.empty:
+        return []
+
+    dates = pd.DatetimeIndex(transactions.index).strftime("%Y-%m-%d")
+    columns = [
+        transactions[column].tolist()
+        if column in transactions
+        else [None] * len(transactions)
+        for column in KEY_COLUMNS
+    ]
+
+    seen = {}
+    keys = []
+    for day, *values in zip(dates, *columns):
+        key = "|".join([day, *[key_value(value) for value in values]])
+        seen[key] = seen.get(key, -1) + 1
+        keys.append(f"{key}|{seen[key]}")
+    return keys
+
+
+def merged_since(transactions: Optional[pd.DataFrame]) -> Optional[str]:
+    """First day (YYYY-MM-DD) the history can differ from the stored one, None if it can differ anywhere."""
+    since = transactions.attrs.get(MERGED_SINCE) if transactions is not None else None
+    return since.strftime("%Y-%m-%d") if since is not None else None
+
+
+def merge_transactions(
+    history: Optional[pd.DataFrame], new: Optional[pd.DataFrame]
+) -> pd.DataFrame:
+    """Adds the new transactions to the history (both newest first) touching only the window they overlap.
+
+    The history older than the first new day is kept as it is. Inside the window the new transactions are kept plus
+    the stored ones whose key wasn't obtained again, so a partially read month doesn't lose transactions. The first day
+    of the window is kept as the MERGED_SINCE attribute, the store only compares and writes the days from it.
+    """
+    if new is None or new.empty:
+        return history if history is not None else pd.DataFrame()
+    if history is None or history.empty:
+        return new.sort_index(ascending=False, kind="stable")
+
+    window_start = new.index.min()
+    in_window = history.index >= window_start
+    recent, older = history[in_window], history[~in_window]
+
+    new_keys = set(transaction_keys(new))
+    missing = recent[[key not in new_keys for key in transaction_keys(recent)]]
+    window = pd.concat([new, missing]).sort_index(ascending=False, kind="stable")
+
+    merged = pd.concat([window, older])
+    # a history that isn't known to be the stored one (or older) is compared whole
+    if MERGED_SINCE in history.attrs:
+        merged.attrs[MERGED_SINCE] = min(window_start, history.attrs[MERGED_SINCE])
+    return merged
@@ -2,7 +2,7 @@ from typing import List
 
 from playwright.async_api import Page, TimeoutError as PlayWrightTimeout
 
-from playwrighting.config import config
+from playwrighting.config import get_config
 from playwrighting.constants import LOGIN_URL
 from playwrighting.page_selectors import (
     INPUT_YEAR,
@@ -21,6 +21,7 @@ from playwrighting.page_selectors import (
     WAIT_BEFORE_FILLING_ID_AND_BIRTHDAY,
     REMEMBER_BUTTON,
 )
+from playwrighting.profiling import span
 
 
 async def login(
@@ -29,25 +30,27 @@ async def login(
     close_banner: bool = True,
     remember: bool = False,
 ):
-    await page.goto(LOGIN_URL)
-    if close_banner:
-        try:
-            await remove_cookies_banner(page)
-            await page.wait_for_selector(WAIT_BEFORE_FILLING_ID_AND_BIRTHDAY)
-        except PlayWrightTimeout:
-            pass
-
-    if full_flow:
-        await fill_id_number(page, config.id_number)
-        await fill_birthday(
-            page, config.birthday_day, config.birthday_month, config.birthday_year
-        )
-        if remember:
-            await page.click(REMEMBER_BUTTON)
-        await page.click(NEXT_BUTTON)
-    await page.wait_for_selector(PIN_PAD)
-    await fill_pass_code(page)
-    await page.wait_for_selector(WAIT_AFTER_FILLING_PASS_CODE)
+    with span("login"):
+        await page.goto(LOGIN_URL)
+        if close_banner:
+            try:
+                await remove_cookies_banner(page)
+                await page.wait_for_selector(WAIT_BEFORE_FILLING_ID_AND_BIRTHDAY)
+            except PlayWrightTimeout:
+                pass
+
+        if full_flow:
+            config = get_config()
+            await fill_id_number(page, config.id_number)
+            await fill_birthday(
+                page, config.birthday_day, config.birthday_month, config.birthday_year
+            )
+            if remember:
+                await page.click(REMEMBER_BUTTON)
+            await page.click(NEXT_BUTTON)
+        await page.wait_for_selector(PIN_PAD)
+        await fill_pass_code(page)
+        await page.wait_for_selector(WAIT_AFTER_FILLING_PASS_CODE)
 
 
 async def remove_cookies_banner(page: Page):
@@ -92,5 +95,6 @@ async def click_on_number(page: Page, number: int):
 async def fill_pass_code(page: Page):
     positions = await detect_unfilled_positions(page)
 
+    pass_code = get_config().pass_code
     for position in positions:
-        await click_on_number(page, config.pass_code[position])
+        await click_on_number(page, pass_code[position])
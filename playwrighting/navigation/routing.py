@@ -0,0 +1,65 @@
+import re
+from typing import Iterable, Optional
+
+from playwright.async_api import BrowserContext, Request, Route
+
+# there isn't any response for aborted requests, so what we save is estimated by resource type
+ESTIMATED_RESOURCE_SIZES = {
+    "image": 30_000,
+    "media": 500_000,
+    "font": 40_000,
+    "stylesheet": 30_000,
+    "script": 80_000,
+}
+DEFAULT_ESTIMATED_RESOURCE_SIZE = 10_000
+
+
+class ResourceBlocker:
+    """Aborts the requests of the given resource types or whose url matches any of the patterns before they leave the
+    browser.
+
+    Fonts are not blocked by default because some of the buttons we click are icon fonts, without them they have no
+    size and Playwright doesn't consider them visible.
+    """
+
+    def __init__(
+        self, resource_types: Iterable[str], url_patterns: Optional[str] = None
+    ):
+        self.resource_types = {
+            resource_type.strip()
+            for resource_type in resource_types
+            if resource_type.strip()
+        }
+        self.url_patterns = re.compile(url_patterns) if url_patterns else None
+        self.blocked_requests = 0
+        self.saved_bytes = 0
+
+    @classmethod
+    def from_config(cls, config) -> "ResourceBlocker":
+        return cls(
+            config.blocked_resource_types.split(","), config.blocked_url_patterns
+        )
+
+    def must_be_blocked(self, request: Request) -> bool:
+        return request.resource_type in self.resource_types or bool(
+            self.url_patterns and self.url_patterns.search(request.url)
+        )
+
+    async def handle(self, route: Route, request: Request):
+        if self.must_be_blocked(request):
+            self.blocked_requests += 1
+            self.saved_bytes += ESTIMATED_RESOURCE_SIZES.get(
+                request.resource_type, DEFAULT_ESTIMATED_RESOURCE_SIZE
+            )
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def install(self, context: BrowserContext):
+        await context.route("**/*", self.handle)
+
+    def summary(self) -> str:
+        return (
+            f"Blocked {self.blocked_requests} requests, "
+            f"~{self.saved_bytes / 1_000_000:.1f} MB saved (estimated)"
+        )
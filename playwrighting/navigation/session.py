@@ -0,0 +1,196 @@
+import json
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from playwright.async_api import (
+    Browser,
+    BrowserContext,
+    Page,
+    Playwright,
+    TimeoutError as PlayWrightTimeout,
+)
+from rich import print
+
+from playwrighting.config import get_app_path, get_config
+from playwrighting.constants import (
+    BROWSER_PROFILE_FOLDER_NAME,
+    BrowserMode,
+    MAIN_URL,
+    SESSION_FILE_NAME,
+    SESSION_PROBE_TIMEOUT,
+)
+from playwrighting.navigation.login import login
+from playwrighting.navigation.routing import ResourceBlocker
+from playwrighting.page_selectors import (
+    WAIT_AFTER_FILLING_PASS_CODE,
+    WAIT_BEFORE_FILLING_ID_AND_BIRTHDAY,
+    PIN_PAD,
+)
+from playwrighting.profiling import span
+
+
+@dataclass(frozen=True)
+class Session:
+    storage_state: dict
+    # None when neither the cookies nor the configuration bound it, the probe tells whether it's still valid
+    expires_at: Optional[datetime]
+
+    def is_expired(self) -> bool:
+        return self.expires_at is not None and datetime.now() >= self.expires_at
+
+    @staticmethod
+    def from_storage_state(storage_state: dict) -> "Session":
+        max_age = get_config().session_max_age_minutes
+        expires_at = (
+            [datetime.now() + timedelta(minutes=float(max_age))] if max_age else []
+        )
+
+        # persistent cookies can expire before our own max age, session cookies have -1 as expiry
+        cookies_expiry = [
+            datetime.fromtimestamp(cookie["expires"])
+            for cookie in storage_state.get("cookies", [])
+            if cookie.get("expires", -1) > 0
+        ]
+
+        expiries = [*expires_at, *cookies_expiry]
+        return Session(storage_state, min(expiries) if expiries else None)
+
+    def save(self):
+        session_path = get_app_path() / SESSION_FILE_NAME
+        with open(session_path, "w") as session_file:
+            json.dump(
+                {
+                    "storage_state": self.storage_state,
+                    "expires_at": self.expires_at.isoformat()
+                    if self.expires_at
+                    else None,
+                },
+                session_file,
+            )
+        # it contains the authentication cookies
+        os.chmod(session_path, 0o600)
+
+    @staticmethod
+    def load() -> Optional["Session"]:
+        try:
+            with open(get_app_path() / SESSION_FILE_NAME) as session_file:
+                session = json.load(session_file)
+            return Session(
+                session["storage_state"],
+                datetime.fromisoformat(session["expires_at"])
+                if session["expires_at"]
+                else None,
+            )
+        except (FileNotFoundError, KeyError, ValueError):
+            pass
+
+    @staticmethod
+    def delete():
+        (get_app_path() / SESSION_FILE_NAME).unlink(missing_ok=True)
+
+
+def load_valid_session() -> Optional[Session]:
+    session = Session.load()
+
+    if session and not session.is_expired():
+        return session
+
+
+async def new_page(browser: Browser, blocker: Optional[ResourceBlocker] = None) -> Page:
+    session = load_valid_session()
+
+    if session:
+        context = await browser.new_context(storage_state=session.storage_state)
+    else:
+        context = await browser.new_context()
+    if blocker:
+        await blocker.install(context)
+    return await context.new_page()
+
+
+async def prepare_context(
+    context: BrowserContext, blocker: Optional[ResourceBlocker] = None
+) -> Page:
+    """New page in a persistent context, with the cookies of the saved session."""
+    session = load_valid_session()
+    if session and session.storage_state.get("cookies"):
+        await context.add_cookies(session.storage_state["cookies"])
+    if blocker:
+        await blocker.install(context)
+    return await context.new_page()
+
+
+@asynccontextmanager
+async def open_page(
+    playwright: Playwright, blocker: Optional[ResourceBlocker] = None
+) -> AsyncIterator[Page]:
+    """Page to scrape in the browser of the configured browser mode, closed (or disconnected from) on exit.
+
+    A persistent browser keeps its HTTP cache between runs, but Playwright doesn't use the cache for the requests of a
+    context with routes, so it only pays off with --no_blocking. A running browser saves its start, the page is opened
+    in a new context so the routes and the session cookies never reach the contexts of its user.
+    """
+    config = get_config()
+    browser_mode = BrowserMode(config.browser_mode)
+
+    with span("browser start", mode=browser_mode.value):
+        if browser_mode == BrowserMode.persistent:
+            profile_path = Path(
+                config.browser_profile_path
+                or get_app_path() / BROWSER_PROFILE_FOLDER_NAME
+            ).expanduser()
+            context = await playwright.chromium.launch_persistent_context(profile_path)
+            page = await prepare_context(context, blocker)
+            close = context.close
+        elif browser_mode == BrowserMode.cdp:
+            browser = await playwright.chromium.connect_over_cdp(config.cdp_endpoint)
+            page = await new_page(browser, blocker)
+            close = browser.close
+        else:
+            browser = await playwright.chromium.launch()
+            page = await new_page(browser, blocker)
+            close = browser.close
+
+    try:
+        yield page
+    finally:
+        if browser_mode == BrowserMode.cdp:
+            # the browser keeps running, only our context goes away
+            await page.context.close()
+        await close()
+
+
+async def is_logged_in(page: Page) -> bool:
+    # whatever appears first tells us if we are in the overall position or we have been redirected to the login
+    try:
+        with span("session probe"):
+            await page.goto(MAIN_URL)
+            element = await page.wait_for_selector(
+                f"{WAIT_AFTER_FILLING_PASS_CODE}, {WAIT_BEFORE_FILLING_ID_AND_BIRTHDAY}, {PIN_PAD}",
+                timeout=SESSION_PROBE_TIMEOUT,
+            )
+    except PlayWrightTimeout:
+        return False
+
+    return await element.evaluate(
+        "(element, selector) => element.matches(selector)",
+        WAIT_AFTER_FILLING_PASS_CODE,
+    )
+
+
+async def save_session(page: Page):
+    Session.from_storage_state(await page.context.storage_state()).save()
+
+
+async def resume_or_login(page: Page):
+    if load_valid_session() and await is_logged_in(page):
+        print("Reusing the previous session")
+    else:
+        Session.delete()
+        await login(page)
+
+    await save_session(page)
@@ -1,62 +1,131 @@
-from datetime import datetime, date, timedelta
+import dataclasses
+import logging
+from dataclasses import dataclass
+from datetime import datetime, date
+from typing import Optional
 
-import dateparser
-from playwright.async_api import TimeoutError as PlayWrightTimeout
+from playwright.async_api import Page, TimeoutError as PlayWrightTimeout
+
+from playwrighting.constants import PAGE_CHANGE_TIMEOUT
 
 from playwrighting.page_selectors import (
     DISABLED_PREVIOUS_MONTH_BUTTON,
     VER_MAS_BUTTON,
     VALID_OPERATION_TEXT,
     CARD_DATE_NAVIGATOR_BUTTON,
+    TRANSACTIONS_TABLE,
+    TRANSACTIONS_TABLE_ALTERNATIVE,
+    MY_PRODUCTS,
 )
-
-
-async def has_previous_month(page) -> bool:
-    try:
-        await page.wait_for_selector(DISABLED_PREVIOUS_MONTH_BUTTON, timeout=1_000)
-        return False
-    except PlayWrightTimeout:
-        return True
-
-
-async def has_ver_mas_button(page) -> bool:
-    try:
-        await page.wait_for_selector(VER_MAS_BUTTON, timeout=1_000)
-        return True
-    except PlayWrightTimeout:
-        return False
-
-
-async def previous_month_not_obtained(page, last_update: datetime) -> bool:
-    if not last_update:
-        return True
-    try:
-        current_month = await page.inner_text(CARD_DATE_NAVIGATOR_BUTTON, timeout=1_000)
-        previous_month = get_previous_month(current_month)
-        last_update_date = last_update.date()
-
-        return previous_month >= last_update_date
-    except PlayWrightTimeout:
-        return False
+from playwrighting.parsers import parse_month_label, previous_month
+
+
+async def open_product(page: Page, name: str):
+    await page.click(MY_PRODUCTS)
+    await page.click(f"text={name}")
+
+
+# text of the first and the last rows of the table, two months with as many rows still differ in them
+ROWS_EDGES_SCRIPT = """
+    const rowText = (row) => row ? row.innerText.replace(/\\s+/g, " ").trim() : null;
+    const firstRow = (rows) => rowText(document.querySelector(rows));
+    const lastRow = (rows) => {
+        const all = document.querySelectorAll(rows);
+        return rowText(all[all.length - 1]);
+    };
+"""
+
+# checks every condition of the movements page in one round-trip instead of waiting for each selector to time out
+PAGE_STATE_SCRIPT = f"""
+([disabledPreviousMonthButton, verMasButton, validOperationText, dateNavigatorButton, rows]) => {{
+    {ROWS_EDGES_SCRIPT}
+    const normalize = (text) => text.replace(/\\s+/g, " ").trim().toLowerCase();
+    const dateNavigator = document.querySelector(dateNavigatorButton);
+    return {{
+        has_previous_month: !document.querySelector(disabledPreviousMonthButton),
+        has_ver_mas_button: !!document.querySelector(verMasButton),
+        need_to_check_your_phone: normalize(document.body.innerText).includes(
+            normalize(validOperationText)
+        ),
+        current_month: dateNavigator ? dateNavigator.innerText : null,
+        rows: document.querySelectorAll(rows).length,
+        first_row: firstRow(rows),
+        last_row: lastRow(rows),
+    }};
+}}
+"""
+
+# true once the month, the rows or the Ver más button differ from the previous state
+PAGE_CHANGED_SCRIPT = f"""
+([verMasButton, dateNavigatorButton, rows, previous]) => {{
+    {ROWS_EDGES_SCRIPT}
+    const dateNavigator = document.querySelector(dateNavigatorButton);
+    return (dateNavigator ? dateNavigator.innerText : null) !== previous.current_month
+        || document.querySelectorAll(rows).length !== previous.rows
+        || firstRow(rows) !== previous.first_row
+        || lastRow(rows) !== previous.last_row
+        || !!document.querySelector(verMasButton) !== previous.has_ver_mas_button;
+}}
+"""
+TRANSACTIONS_ROWS = f"{TRANSACTIONS_TABLE} tr, {TRANSACTIONS_TABLE_ALTERNATIVE} tr"
+
+
+@dataclass(frozen=True)
+class PageState:
+    has_previous_month: bool
+    has_ver_mas_button: bool
+    need_to_check_your_phone: bool
+    current_month: Optional[str]
+    rows: int
+    first_row: Optional[str] = None
+    last_row: Optional[str] = None
+
+    def previous_month_not_obtained(self, last_update: Optional[datetime]) -> bool:
+        if not last_update:
+            return True
+        if not self.current_month:
+            return False
+
+        # the month of the last update is obtained again, it can have newer transactions
+        previous_month = get_previous_month(self.current_month)
+        return previous_month >= date(last_update.year, last_update.month, 1)
+
+
+async def get_page_state(page: Page, previous: Optional[PageState] = None) -> PageState:
+    """State of the movements page. With the previous state, after clicking previous month or Ver más, it waits until
+    the page has changed, so the table of the new month or the new rows are the ones read. If it doesn't change in
+    PAGE_CHANGE_TIMEOUT (e.g. a month with the same movements) the state is read as it is."""
+    await page.wait_for_selector(
+        f"{TRANSACTIONS_TABLE}, {TRANSACTIONS_TABLE_ALTERNATIVE}"
+    )
+    if previous:
+        try:
+            await page.wait_for_function(
+                PAGE_CHANGED_SCRIPT,
+                arg=[
+                    VER_MAS_BUTTON,
+                    CARD_DATE_NAVIGATOR_BUTTON,
+                    TRANSACTIONS_ROWS,
+                    dataclasses.asdict(previous),
+                ],
+                timeout=PAGE_CHANGE_TIMEOUT,
+            )
+        except PlayWrightTimeout:
+            logging.warning(
+                f"The movements page didn't change from {previous.current_month}, reading it as it is"
+            )
+    state = await page.evaluate(
+        PAGE_STATE_SCRIPT,
+        [
+            DISABLED_PREVIOUS_MONTH_BUTTON,
+            VER_MAS_BUTTON,
+            VALID_OPERATION_TEXT,
+            CARD_DATE_NAVIGATOR_BUTTON,
+            TRANSACTIONS_ROWS,
+        ],
+    )
+    return PageState(**state)
 
 
 def get_previous_month(current_month: str) -> date:
-    parsed_month = dateparser.parse(current_month)
-
-    # with savings account the format is different and dateparser fails parsing
-    if not parsed_month:
-        lower_month, rest = current_month.split("-")
-        upper_month, year = rest.split()
-
-        parsed_month = dateparser.parse(f"{lower_month} {year}")
-
-    current_month = parsed_month.date()
-    return current_month - timedelta(days=30)
-
-
-async def need_to_check_your_phone(page) -> bool:
-    try:
-        await page.wait_for_selector(f"text={VALID_OPERATION_TEXT}", timeout=1_000)
-        return True
-    except PlayWrightTimeout:
-        return False
+    return previous_month(parse_month_label(current_month))
@@ -0,0 +1,129 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Set
+
+from playwright.async_api import Page
+from rich import print
+
+from playwrighting.config import get_app_path
+from playwrighting.constants import (
+    PHONE_VALIDATION_FILE_NAME,
+    PHONE_VALIDATION_POLL_INTERVAL,
+    PHONE_VALIDATION_TIMEOUT,
+)
+from playwrighting.exceptions import PhoneNotValidated
+from playwrighting.navigation.transactions import PageState, get_page_state
+
+
+class Confirmations:
+    """Products waiting for their phone validation to be confirmed, in the order they asked. A line entered in the
+    terminal confirms the oldest one, so does an empty phone_validated file, while a file with the name of a product
+    confirms that one: a confirmation is never taken by every product waiting at once."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiting: List[str] = []
+        self._confirmed: Set[str] = set()
+
+    def wait(self, product: str):
+        with self._lock:
+            if product not in self._waiting:
+                self._waiting.append(product)
+
+    def confirm(self, product: Optional[str] = None) -> Optional[str]:
+        """Confirms the product, or the oldest one without a name, returns the one confirmed if it was waiting."""
+        with self._lock:
+            if product is None and self._waiting:
+                product = self._waiting[0]
+            if product not in self._waiting:
+                return None
+            self._waiting.remove(product)
+            self._confirmed.add(product)
+            return product
+
+    def is_confirmed(self, product: str) -> bool:
+        with self._lock:
+            return product in self._confirmed
+
+    def forget(self, product: str):
+        with self._lock:
+            if product in self._waiting:
+                self._waiting.remove(product)
+            self._confirmed.discard(product)
+
+
+# shared by every product waiting, and by the single thread reading the terminal
+_confirmations = Confirmations()
+_terminal_reader: Optional[threading.Thread] = None
+
+
+def _read_terminal():
+    for _ in sys.stdin:
+        product = _confirmations.confirm()
+        if product:
+            print(f"Phone validation of {product} confirmed")
+
+
+def listen_terminal() -> bool:
+    """Starts reading the terminal in a daemon thread, a blocked read doesn't keep the program alive when the
+    validation is detected in the page instead."""
+    global _terminal_reader
+    if not sys.stdin or not sys.stdin.isatty():
+        return False
+    if _terminal_reader is None:
+        _terminal_reader = threading.Thread(target=_read_terminal, daemon=True)
+        _terminal_reader.start()
+    return True
+
+
+def phone_validation_path() -> Path:
+    return get_app_path() / PHONE_VALIDATION_FILE_NAME
+
+
+def confirm_by_file():
+    """Confirms the product named in the phone_validated file, the oldest one waiting if it is empty."""
+    path = phone_validation_path()
+    try:
+        product = path.read_text().strip()
+    except FileNotFoundError:
+        return
+    path.unlink(missing_ok=True)
+    _confirmations.confirm(product or None)
+
+
+async def wait_for_phone_validation(
+    page: Page, product: str, timeout: float = PHONE_VALIDATION_TIMEOUT
+) -> PageState:
+    """Waits until the notice of the 90 days validation is gone from the page, polling it, or until the validation of
+    the product is confirmed by pressing enter or with the phone_validated file in the app folder (see
+    :class:`Confirmations`), whatever happens first.
+
+    Only this product waits, the other pages of the pool go on scraping meanwhile.
+    """
+    started = time.monotonic()
+    terminal = listen_terminal()
+    _confirmations.wait(product)
+    print(
+        f"{product}: check your phone and accept the notification"
+        + (", then press enter" if terminal else "")
+        + f" (or write {product!r} to {phone_validation_path()})"
+    )
+
+    try:
+        while True:
+            state = await get_page_state(page)
+            confirm_by_file()
+            if not state.need_to_check_your_phone or _confirmations.is_confirmed(
+                product
+            ):
+                return state
+            if time.monotonic() - started >= timeout:
+                raise PhoneNotValidated(
+                    f"The phone validation of {product} hasn't been accepted in {timeout} seconds"
+                )
+            await asyncio.sleep(PHONE_VALIDATION_POLL_INTERVAL)
+    finally:
+        _confirmations.forget(product)
@@ -0,0 +1,107 @@
+import csv
+import json
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+from contextlib import suppress
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from rich.console import Console
+from rich.table import Table
+
+from playwrighting.constants import SHOW_PAGE_SIZE, ShowOutput
+
+
+def pages(rows: Iterable[dict], size: int = SHOW_PAGE_SIZE) -> Iterator[List[dict]]:
+    rows = iter(rows)
+    while page := list(islice(rows, size)):
+        yield page
+
+
+def format_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
+
+
+def page_table(page: List[dict]) -> Table:
+    columns = list(dict.fromkeys(column for row in page for column in row))
+    table = Table(*columns)
+    for row in page:
+        table.add_row(*[format_value(row.get(column)) for column in columns])
+    return table
+
+
+def write_pages(console: Console, rows: Iterable[dict]):
+    empty = True
+    for page in pages(rows):
+        empty = False
+        console.print(page_table(page))
+    if empty:
+        console.print("Nothing to show")
+
+
+def pager_command() -> Optional[List[str]]:
+    command = shlex.split(os.environ.get("PAGER", "less -R"))
+    return command if command and shutil.which(command[0]) else None
+
+
+def write_pager(rows: Iterable[dict]):
+    """Renders the rows a page at a time into the pager. Writing blocks while the pager hasn't read the previous
+    pages, so the next ones are only read from the state when the pager gets to them."""
+    command = pager_command()
+    if not command or not sys.stdout.isatty():
+        write_pages(Console(), rows)
+        return
+
+    process = subprocess.Popen(
+        command, stdin=subprocess.PIPE, text=True, encoding="utf-8"
+    )
+    console = Console(file=process.stdin, force_terminal=True, width=Console().width)
+    try:
+        write_pages(console, rows)
+    except BrokenPipeError:
+        # the pager was closed before the last page
+        pass
+    finally:
+        with suppress(BrokenPipeError):
+            process.stdin.close()
+        process.wait()
+
+
+def write_json(rows: Iterable[dict]):
+    """One json object per line."""
+    for row in rows:
+        sys.stdout.write(json.dumps(row, ensure_ascii=False))
+        sys.stdout.write("\n")
+
+
+def write_csv(rows: Iterable[dict]):
+    writer = None
+    for row in rows:
+        if not writer:
+            writer = csv.DictWriter(
+                sys.stdout, fieldnames=list(row), extrasaction="ignore"
+            )
+            writer.writeheader()
+        writer.writerow(row)
+
+
+def write_rows(rows: Iterable[dict], output: ShowOutput = ShowOutput.pager):
+    if output == ShowOutput.json:
+        write_json(rows)
+    elif output == ShowOutput.csv:
+        write_csv(rows)
+    else:
+        write_pager(rows)
+
+
+def write_transactions(
+    rows: Iterable[Tuple[str, dict]], output: ShowOutput = ShowOutput.pager
+):
+    write_rows(({"Fecha": fecha, **record} for fecha, record in rows), output)
@@ -0,0 +1,142 @@
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import List, Optional
+
+import pandas as pd
+from selectolax.parser import HTMLParser, Node
+
+from playwrighting.constants import SPANISH_MONTHS
+from playwrighting.exceptions import TransactionsTableNotParsed, MonthNotParsed
+from playwrighting.utils import get_number_from_string_with_dot_and_comma
+
+DATE = re.compile(r"(\d{2}/\d{2}/\d{4})")
+AMOUNT = re.compile(r"^[+-]?\d[\d.]*(,\d+)?\s*€?$")
+MONTH_LABEL = re.compile(r"^([a-z]+)(?:\s*-\s*([a-z]+))?\s+(\d{4})$")
+
+
+@lru_cache(maxsize=1024)
+def parse_date(text: Optional[str]) -> Optional[datetime]:
+    # weekday, "Hoy" and "Ayer" prefixes are ignored
+    match = DATE.search(text or "")
+    if match:
+        day, month, year = match.group(1).split("/")
+        return datetime(int(year), int(month), int(day))
+
+
+@lru_cache(maxsize=256)
+def parse_month_label(label: str) -> date:
+    """First day of the month of a date navigator label. With a range of months ("Enero-Marzo 2021") it is the first
+    month of the range, a range that crosses the year ("Diciembre-Enero 2022") starts in the previous year."""
+    match = MONTH_LABEL.match(" ".join(label.lower().split()))
+    if not match or match.group(1) not in SPANISH_MONTHS:
+        raise MonthNotParsed(f"Unexpected month label {label!r}")
+
+    lower_month, upper_month, year = match.groups()
+    month, year = SPANISH_MONTHS[lower_month], int(year)
+    if upper_month and SPANISH_MONTHS.get(upper_month, month) < month:
+        year -= 1
+    return date(year, month, 1)
+
+
+def previous_month(month: date) -> date:
+    if month.month == 1:
+        return date(month.year - 1, 12, 1)
+    return date(month.year, month.month - 1, 1)
+
+
+def parse_amount(text: str) -> float:
+    return get_number_from_string_with_dot_and_comma(text.replace(" ", ""))
+
+
+def is_amount_column(values: List[Optional[str]]) -> bool:
+    values = [value for value in values if value]
+    return bool(values) and all(AMOUNT.match(value) for value in values)
+
+
+def parse_amounts(values: List[Optional[str]]) -> List[Optional[float]]:
+    return [parse_amount(value) if value else None for value in values]
+
+
+def parse_amount_columns(transactions: pd.DataFrame) -> pd.DataFrame:
+    """Parses as floats the text columns that only have amounts ("-112,51 €"), like parse_transactions_table does."""
+    for column in transactions.columns:
+        if column == "Fecha" or transactions[column].dtype != object:
+            continue
+        values = [
+            value if isinstance(value, str) else None for value in transactions[column]
+        ]
+        if is_amount_column(values):
+            transactions[column] = parse_amounts(values)
+    return transactions
+
+
+def normalize_text(value):
+    if not isinstance(value, str):
+        return value
+    return " ".join(value.split()) or None
+
+
+def normalize_legacy_transactions(
+    transactions: Optional[pd.DataFrame],
+) -> Optional[pd.DataFrame]:
+    """Transactions of a state.pkl, read with pd.read_html by older versions, as parse_transactions_table reads them:
+    whitespace-normalised texts, float amounts instead of "-118,32 €" and parsed dates, so their keys match the ones of
+    the transactions read from now on."""
+    if transactions is None or transactions.empty:
+        return transactions
+
+    transactions = transactions.copy()
+    if not isinstance(transactions.index, pd.DatetimeIndex):
+        transactions.index = pd.to_datetime(
+            [parse_date(normalize_text(str(value))) for value in transactions.index]
+        )
+    transactions.index.name = "Fecha"
+    for column in transactions.columns:
+        if transactions[column].dtype == object:
+            transactions[column] = [
+                normalize_text(value) for value in transactions[column]
+            ]
+    transactions = parse_amount_columns(transactions)
+    return transactions[transactions.index.notna()]
+
+
+def cell_text(cell: Node) -> Optional[str]:
+    # older selectolax versions keep the separator around the text even when stripping it
+    return normalize_text(cell.text(separator=" ", strip=True))
+
+
+def parse_transactions_table(content: str) -> pd.DataFrame:
+    """Parses the movements table walking its rows once, returning the dates already parsed and the amounts as floats.
+
+    Rows that don't have a cell per header ("Ver más", no transactions message...) are skipped.
+    """
+    tree = HTMLParser(content)
+    table = tree.css_first("table")
+    if table is None:
+        raise TransactionsTableNotParsed("There isn't any table")
+
+    headers = [cell_text(header) for header in table.css("thead th")]
+    if "Fecha" not in headers:
+        raise TransactionsTableNotParsed(f"Unexpected headers {headers}")
+
+    rows = [
+        [cell_text(cell) for cell in row.css("td")] for row in table.css("tbody tr")
+    ]
+    rows = [row for row in rows if len(row) == len(headers)]
+
+    columns = {}
+    for i, header in enumerate(headers):
+        # unnamed columns are icons or actions
+        if not header:
+            continue
+
+        values = [row[i] for row in rows]
+        if header == "Fecha":
+            columns[header] = pd.to_datetime([parse_date(value) for value in values])
+        elif is_amount_column(values):
+            columns[header] = parse_amounts(values)
+        else:
+            columns[header] = values
+
+    return pd.DataFrame(columns)
@@ -0,0 +1,92 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, List, TypeVar, Optional
+
+from playwright.async_api import BrowserContext, Page
+
+from playwrighting.constants import MAIN_URL
+from playwrighting.navigation.routing import ResourceBlocker
+from playwrighting.page_selectors import WAIT_AFTER_FILLING_PASS_CODE
+from playwrighting.profiling import span
+
+T = TypeVar("T")
+
+
+async def gather_or_cancel(*scrapes: Awaitable[T]) -> List[T]:
+    """Like asyncio.gather, but the first failure cancels the other scrapes and waits for them, so none of them goes on
+    using the pages of a pool that is being closed."""
+    tasks = [asyncio.ensure_future(scrape) for scrape in scrapes]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+class PagePool:
+    """Pages that share the authenticated session of an already logged in page.
+
+    The first page of the pool is the logged in one, the remaining ``jobs - 1`` pages live in new browser contexts
+    created from its ``storage_state`` so the login is done only once. A persistent context can't be replicated in
+    new contexts, its pool opens the pages in the same context.
+    """
+
+    def __init__(
+        self, page: Page, jobs: int = 1, blocker: Optional[ResourceBlocker] = None
+    ):
+        self.page = page
+        self.jobs = max(jobs, 1)
+        self.blocker = blocker
+        self._contexts: List[BrowserContext] = []
+        self._opened_pages: List[Page] = []
+        self._pages: "asyncio.Queue[Page]" = asyncio.Queue()
+
+    async def __aenter__(self) -> "PagePool":
+        self._pages.put_nowait(self.page)
+
+        if self.jobs > 1:
+            with span("page pool", jobs=self.jobs):
+                storage_state = await self.page.context.storage_state()
+                pages = await asyncio.gather(
+                    *[self._new_page(storage_state) for _ in range(self.jobs - 1)]
+                )
+            for page in pages:
+                self._pages.put_nowait(page)
+
+        return self
+
+    async def __aexit__(self, *exc_info):
+        for page in self._opened_pages:
+            await page.close()
+        for context in self._contexts:
+            await context.close()
+
+    async def _new_page(self, storage_state: dict) -> Page:
+        browser = self.page.context.browser
+        if browser is None:
+            # persistent context, its routes are already installed
+            page = await self.page.context.new_page()
+            self._opened_pages.append(page)
+        else:
+            context = await browser.new_context(storage_state=storage_state)
+            self._contexts.append(context)
+            if self.blocker:
+                await self.blocker.install(context)
+            page = await context.new_page()
+        await page.goto(MAIN_URL)
+        await page.wait_for_selector(WAIT_AFTER_FILLING_PASS_CODE)
+        return page
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Page]:
+        page = await self._pages.get()
+        try:
+            yield page
+        finally:
+            self._pages.put_nowait(page)
+
+    async def run(self, scrape: Callable[[Page], Awaitable[T]]) -> T:
+        async with self.acquire() as page:
+            return await scrape(page)
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+_profiler: ContextVar[Optional["Profiler"]] = ContextVar("profiler", default=None)
+_parent: ContextVar[Optional[int]] = ContextVar("parent_span", default=None)
+
+# returned by span() when profiling is disabled, so an instrumented block only costs a context variable lookup
+_DISABLED = nullcontext()
+
+
+@dataclass
+class Span:
+    name: str
+    start: float
+    lane: int
+    parent: Optional[int]
+    attributes: Dict[str, str] = field(default_factory=dict)
+    duration: Optional[float] = None
+
+
+class Profiler:
+    """Timing of the spans opened with :func:`span` while it is active (see :func:`profiling`).
+
+    Concurrent tasks (e.g. the products scraped by every page of the pool) are recorded in their own lane, which is
+    a thread in the Chrome trace.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans: List[Span] = []
+        self._lanes: Dict[object, int] = {}
+
+    def _lane(self) -> int:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        return self._lanes.setdefault(task, len(self._lanes))
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        span = Span(
+            name,
+            start=time.perf_counter() - self.origin,
+            lane=self._lane(),
+            parent=_parent.get(),
+            attributes={key: str(value) for key, value in attributes.items()},
+        )
+        self.spans.append(span)
+        token = _parent.set(len(self.spans) - 1)
+        try:
+            yield span
+        finally:
+            _parent.reset(token)
+            span.duration = time.perf_counter() - self.origin - span.start
+
+    def ranking(self) -> List[Dict]:
+        """Spans grouped by name, from the most to the least total time."""
+        durations = defaultdict(list)
+        for span in self.spans:
+            if span.duration is not None:
+                durations[span.name].append(span.duration)
+
+        return sorted(
+            [
+                {
+                    "name": name,
+                    "count": len(values),
+                    "total": sum(values),
+                    "mean": sum(values) / len(values),
+                    "max": max(values),
+                }
+                for name, values in durations.items()
+            ],
+            key=lambda row: row["total"],
+            reverse=True,
+        )
+
+    def summary(self):
+        from rich.table import Table
+
+        table = Table(title="Profile")
+        for column in ("span", "count", "total (s)", "mean (s)", "max (s)"):
+            table.add_column(column, justify="left" if column == "span" else "right")
+        for row in self.ranking():
+            table.add_row(
+                row["name"],
+                str(row["count"]),
+                f"{row['total']:.3f}",
+                f"{row['mean']:.3f}",
+                f"{row['max']:.3f}",
+            )
+        return table
+
+    def to_json(self) -> Dict:
+        return {
+            "spans": [asdict(span) for span in self.spans],
+            "ranking": self.ranking(),
+        }
+
+    def to_chrome_trace(self) -> Dict:
+        """Trace Event Format, it can be opened with chrome://tracing or https://ui.perfetto.dev"""
+        return {
+            "traceEvents": [
+                {
+                    "name": span.name,
+                    "ph": "X",
+                    "ts": span.start * 1_000_000,
+                    "dur": (span.duration or 0) * 1_000_000,
+                    "pid": 1,
+                    "tid": span.lane,
+                    "args": span.attributes,
+                }
+                for span in self.spans
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def export(self, path: Path, trace_format: str = "chrome"):
+        report = self.to_chrome_trace() if trace_format == "chrome" else self.to_json()
+        Path(path).write_text(json.dumps(report, ensure_ascii=False, indent=1))
+
+
+def span(name: str, **attributes):
+    """Times the block as ``name`` when profiling is active, does nothing otherwise."""
+    profiler = _profiler.get()
+    if profiler is None:
+        return _DISABLED
+    return profiler.span(name, **attributes)
+
+
+@contextmanager
+def profiling(enabled: bool = True) -> Iterator[Optional[Profiler]]:
+    """Activates a profiler for the code run inside, including the tasks it creates."""
+    if not enabled:
+        yield None
+        return
+
+    profiler = Profiler()
+    token = _profiler.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _profiler.reset(token)
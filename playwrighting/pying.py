@@ -1,117 +1,376 @@
 import logging
-from datetime import datetime
+from contextlib import contextmanager
 from enum import Enum
 from pathlib import Path
-from shutil import copy
 from string import ascii_letters
-from typing import Optional, Dict
+from typing import Optional, Dict, Iterator, List, Tuple, TYPE_CHECKING
 
 import asyncclick as click
-import pandas as pd
-from playwright.async_api import (
-    async_playwright,
-    Error,
-    TimeoutError as PlayWrightTimeout,
-)
 from rich import print
-from rich.console import Console
-from rich.prompt import Prompt
-from rich.traceback import install
 
-from playwrighting.accounts import Position
 from playwrighting.config import (
-    config,
-    app_path,
+    get_app_path,
+    get_config,
+    config_path,
     before_timeout_screenshot_path,
     before_error_screenshot_path,
 )
 from playwrighting.constants import (
     STATE_FILE_NAME,
+    LEGACY_STATE_FILE_NAME,
+    SNAPSHOTS_FOLDER_NAME,
+    FetchMode,
+    ExportFormat,
+    ShowOutput,
 )
 from playwrighting.exceptions import (
     StateFileAlreadyExists,
     NotAValidChoice,
     ParentDirectoryDoesNotExist,
     StateFileDoesNotExist,
+    ProfileDoesNotExist,
+    PhoneNotValidated,
 )
-from playwrighting.navigation.login import login
+from playwrighting.profiling import profiling
+
+# pandas, playwright and the scraping modules are imported by the commands that use them, so offline commands and
+# --help start fast
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from playwrighting.accounts import Position
+    from playwrighting.storage import TransactionsQuery
+    from playwrighting.summary import PositionSummary
 
 
 def exist_state_file() -> bool:
-    return Path(app_path / STATE_FILE_NAME).exists()
+    app_path = get_app_path()
+    return (app_path / STATE_FILE_NAME).exists() or (
+        app_path / LEGACY_STATE_FILE_NAME
+    ).exists()
+
+
+def get_daemon_address(daemon: Optional[str]) -> Optional[str]:
+    return daemon or (config_path.exists() and get_config().daemon_address) or None
+
+
+def load_position(
+    daemon: Optional[str], with_transactions: bool = True
+) -> Optional["Position"]:
+    """The position of the daemon when its address is given (or configured), the local state otherwise."""
+    from playwrighting.accounts import Position
+
+    address = get_daemon_address(daemon)
+    if address:
+        from playwrighting.client import DaemonClient
+
+        return Position.from_store(DaemonClient(address), with_transactions)
+    return Position.load(with_transactions)
+
+
+def load_summary(daemon: Optional[str]) -> Optional["PositionSummary"]:
+    """The position without transactions like load_position, read without building the Position so show doesn't import
+    pandas or the scraper."""
+    from playwrighting.summary import PositionSummary
 
+    address = get_daemon_address(daemon)
+    if address:
+        from playwrighting.client import DaemonClient
 
-@click.group(chain=True)
+        return PositionSummary.from_store(DaemonClient(address))
+
+    if (get_app_path() / LEGACY_STATE_FILE_NAME).exists():
+        from playwrighting.accounts import Position
+
+        Position.migrate_legacy_state()
+    if (get_app_path() / STATE_FILE_NAME).exists():
+        from playwrighting.storage import open_store
+
+        with open_store() as store:
+            return PositionSummary.from_store(store)
+
+
+@contextmanager
+def query_transactions(
+    daemon: Optional[str], product: str, query: "TransactionsQuery"
+) -> Iterator[Iterator[Tuple[str, dict]]]:
+    """The matching transactions of a single product, from the daemon or the local state like load_position. They are
+    read while they are consumed, inside the context."""
+    address = get_daemon_address(daemon)
+    if address:
+        from playwrighting.client import DaemonClient
+
+        yield DaemonClient(address).query_transactions(product, query)
+        return
+
+    from playwrighting.storage import open_store
+
+    with open_store() as store:
+        yield store.query_transactions(product, query)
+
+
+@contextmanager
+def profiled(profile: bool, profile_path: Optional[str], profile_format: str):
+    with profiling(profile or bool(profile_path)) as profiler:
+        try:
+            yield
+        finally:
+            if profile:
+                print(profiler.summary())
+            if profile_path:
+                profiler.export(Path(profile_path), profile_format)
+                print(
+                    f"The profile has been exported as {Path(profile_path).resolve()}"
+                )
+
+
+class Cli(click.Group):
+    """Chains its commands (pying update download) except the standalone ones, which run alone and take the rest of
+    the command line, so their options can follow their arguments (pying batch home work --concurrency 2)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, chain=True, **kwargs)
+        self.standalone_commands: Dict[str, click.Command] = {}
+
+    def add_standalone_command(self, cmd: click.Command):
+        self.standalone_commands[cmd.name] = cmd
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        return self.standalone_commands.get(cmd_name) or super().get_command(
+            ctx, cmd_name
+        )
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted([*super().list_commands(ctx), *self.standalone_commands])
+
+    async def resolve_command(self, ctx: click.Context, args: List[str]):
+        cmd_name, cmd, args = await super().resolve_command(ctx, args)
+        # the chained commands are resolved once the chain has started
+        if cmd_name in self.standalone_commands and ctx.invoked_subcommand == "*":
+            ctx.fail(f"{cmd_name} cannot be chained with other commands")
+        return cmd_name, cmd, args
+
+    async def invoke(self, ctx: click.Context):
+        if (
+            not ctx.protected_args
+            or ctx.protected_args[0] not in self.standalone_commands
+        ):
+            return await super().invoke(ctx)
+
+        args = [*ctx.protected_args, *ctx.args]
+        ctx.protected_args, ctx.args = [], []
+        async with ctx:
+            cmd_name, cmd, args = await self.resolve_command(ctx, args)
+            ctx.invoked_subcommand = cmd_name
+            await click.Command.invoke(self, ctx)
+            sub_ctx = await cmd.make_context(cmd_name, args, parent=ctx)
+            async with sub_ctx:
+                return await sub_ctx.command.invoke(sub_ctx)
+
+
+@click.group(cls=Cli)
 def cli():
-    pass
+    from rich.traceback import install
+
+    install()
 
 
 @click.command()
 @click.option("--force", is_flag=True, default=False)
-async def init(force):
+@click.option(
+    "--jobs", default=1, help="number of accounts and cards scraped concurrently"
+)
+@click.option(
+    "--fetch_mode",
+    type=click.Choice([mode.value for mode in FetchMode]),
+    default=FetchMode.dom,
+    help="read the movements from the rendered tables (dom) or from the json downloaded by the web (api)",
+)
+@click.option(
+    "--no_blocking",
+    is_flag=True,
+    default=False,
+    help="don't block the resource types and urls of the configuration",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    default=False,
+    help="print the time spent in every phase of the scrape",
+)
+@click.option(
+    "--profile_path", default=None, help="file where the profile will be exported"
+)
+@click.option(
+    "--profile_format",
+    type=click.Choice(["chrome", "json"]),
+    default="chrome",
+    help="chrome trace (chrome://tracing, ui.perfetto.dev) or plain json spans",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    default=False,
+    help="take the products and months checkpointed by an interrupted run instead of scraping them again",
+)
+async def init(
+    force,
+    jobs,
+    fetch_mode,
+    no_blocking,
+    profile,
+    profile_path,
+    profile_format,
+    resume,
+):
     if exist_state_file():
-        state_file_path = Path(app_path / STATE_FILE_NAME)
+        state_file_path = Path(get_app_path() / STATE_FILE_NAME)
         if not force:
             raise StateFileAlreadyExists(
                 f"State file already exists. Remove it, add --force flag or execute update command instead. "
                 f"Path is {state_file_path}"
             )
-        state_file_path.unlink()
-
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
-        page = await browser.new_page()
-
-        try:
-            await login(page)
-
-            position = await Position.create(page)
-            position = await position.update(page)
-            position.save()
-
-        except PlayWrightTimeout as e:
-            await page.screenshot(path=before_timeout_screenshot_path)
-            logging.exception(e)
-        except Error as e:
-            await page.screenshot(path=before_error_screenshot_path)
-            logging.exception(e)
-        finally:
-            await browser.close()
+        state_file_path.unlink(missing_ok=True)
+        Path(get_app_path() / LEGACY_STATE_FILE_NAME).unlink(missing_ok=True)
+
+    from playwright.async_api import (
+        async_playwright,
+        Error,
+        TimeoutError as PlayWrightTimeout,
+    )
+
+    from playwrighting.accounts import Position
+    from playwrighting.checkpoint import checkpointing
+    from playwrighting.navigation.routing import ResourceBlocker
+    from playwrighting.navigation.session import (
+        open_page,
+        resume_or_login,
+        save_session,
+    )
+
+    with profiled(profile, profile_path, profile_format):
+        async with async_playwright() as p:
+            blocker = None if no_blocking else ResourceBlocker.from_config(get_config())
+            async with open_page(p, blocker) as page:
+                try:
+                    await resume_or_login(page)
+
+                    position = await Position.create(page)
+                    with checkpointing(resume) as checkpoint:
+                        position = await position.update(
+                            page, jobs, fetch_mode=fetch_mode, blocker=blocker
+                        )
+                        position.save()
+                        checkpoint.clear()
+                    await save_session(page)
+
+                except PlayWrightTimeout as e:
+                    await page.screenshot(path=before_timeout_screenshot_path)
+                    logging.exception(e)
+                except (Error, PhoneNotValidated) as e:
+                    await page.screenshot(path=before_error_screenshot_path)
+                    logging.exception(e)
+                finally:
+                    if blocker:
+                        print(blocker.summary())
 
 
 @click.command()
 @click.option("--force", is_flag=True, default=False)
-async def update(force):
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
-        page = await browser.new_page()
-
-        try:
-            await login(page)
-
-            new_position = await Position.create(page)
-
-            if force:
-                new_position = await new_position.update(page)
-                new_position.save()
-
-            else:
-                old_position = Position.load()
-                new_position = (
-                    await new_position.update(page)
-                    if old_position != new_position
-                    else new_position.touch()
-                )
-                new_position.save()
-
-        except PlayWrightTimeout as e:
-            await page.screenshot(path=before_timeout_screenshot_path)
-            logging.exception(e)
-        except Error as e:
-            await page.screenshot(path=before_error_screenshot_path)
-            logging.exception(e)
-        finally:
-            await browser.close()
+@click.option(
+    "--jobs", default=1, help="number of accounts and cards scraped concurrently"
+)
+@click.option(
+    "--fetch_mode",
+    type=click.Choice([mode.value for mode in FetchMode]),
+    default=FetchMode.dom,
+    help="read the movements from the rendered tables (dom) or from the json downloaded by the web (api)",
+)
+@click.option(
+    "--no_blocking",
+    is_flag=True,
+    default=False,
+    help="don't block the resource types and urls of the configuration",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    default=False,
+    help="print the time spent in every phase of the scrape",
+)
+@click.option(
+    "--profile_path", default=None, help="file where the profile will be exported"
+)
+@click.option(
+    "--profile_format",
+    type=click.Choice(["chrome", "json"]),
+    default="chrome",
+    help="chrome trace (chrome://tracing, ui.perfetto.dev) or plain json spans",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    default=False,
+    help="take the products and months checkpointed by an interrupted run instead of scraping them again",
+)
+async def update(
+    force,
+    jobs,
+    fetch_mode,
+    no_blocking,
+    profile,
+    profile_path,
+    profile_format,
+    resume,
+):
+    from playwright.async_api import (
+        async_playwright,
+        Error,
+        TimeoutError as PlayWrightTimeout,
+    )
+
+    from playwrighting.accounts import Position
+    from playwrighting.checkpoint import checkpointing
+    from playwrighting.navigation.routing import ResourceBlocker
+    from playwrighting.navigation.session import (
+        open_page,
+        resume_or_login,
+        save_session,
+    )
+
+    with profiled(profile, profile_path, profile_format):
+        async with async_playwright() as p:
+            blocker = None if no_blocking else ResourceBlocker.from_config(get_config())
+            async with open_page(p, blocker) as page:
+                try:
+                    await resume_or_login(page)
+
+                    new_position = await Position.create(page)
+
+                    old_position = Position.load()
+                    with checkpointing(resume) as checkpoint:
+                        new_position = await new_position.update(
+                            page,
+                            jobs,
+                            previous=old_position,
+                            force=force,
+                            fetch_mode=fetch_mode,
+                            blocker=blocker,
+                        )
+                        new_position.save()
+                        checkpoint.clear()
+
+                    await save_session(page)
+
+                except PlayWrightTimeout as e:
+                    await page.screenshot(path=before_timeout_screenshot_path)
+                    logging.exception(e)
+                except (Error, PhoneNotValidated) as e:
+                    await page.screenshot(path=before_error_screenshot_path)
+                    logging.exception(e)
+                finally:
+                    if blocker:
+                        print(blocker.summary())
 
 
 @click.command()
@@ -119,16 +378,53 @@ async def update(force):
     "--download_path", default=None, help="path where files will be downloaded"
 )
 @click.option("--create_parents", is_flag=True, default=False)
-async def download(download_path: Optional[str], create_parents: bool):
-    new_position = Position.load()
+@click.option(
+    "--daemon", default=None, help="host:port of a pying serve to read the data from"
+)
+@click.option(
+    "--format",
+    "export_format",
+    type=click.Choice([export_format.value for export_format in ExportFormat]),
+    default=ExportFormat.csv,
+    help="parquet and feather need the columnar extra (pyarrow)",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    default=False,
+    help="append only the transactions newer than the previous download of each file",
+)
+@click.option(
+    "--aggregates",
+    is_flag=True,
+    default=False,
+    help="also write the monthly and description totals of the local state",
+)
+async def download(
+    download_path: Optional[str],
+    create_parents: bool,
+    daemon: Optional[str],
+    export_format: str,
+    incremental: bool,
+    aggregates: bool,
+):
+    new_position = load_position(daemon)
 
     if new_position:
-        download_path = Path(download_path or config.download_path)
+        download_path = Path(download_path or get_config().download_path)
         if create_parents:
             download_path.mkdir(parents=True, exist_ok=True)
 
         try:
-            await new_position.download(download_path)
+            await new_position.download(
+                download_path, ExportFormat(export_format), incremental
+            )
+            if aggregates:
+                from playwrighting.export import export_aggregates
+                from playwrighting.storage import open_store
+
+                with open_store() as store:
+                    export_aggregates(store, download_path, ExportFormat(export_format))
         except FileNotFoundError:
             raise ParentDirectoryDoesNotExist(
                 f"Parent directory/ies of your download_path {download_path} doesn't exist, create it or use "
@@ -140,18 +436,21 @@ class ShowOptions(str, Enum):
     position: str = "position"
     account: str = "accounts"
     transactions: str = "transactions"
+    monthly: str = "monthly"
+    descriptions: str = "descriptions"
 
 
 def get_account_or_card_selection_choices(
-    position: Position,
-) -> Dict[str, pd.DataFrame]:
+    position: "PositionSummary",
+) -> Dict[str, str]:
+    """Product name of every choice of the transactions menu, its transactions are loaded once it's chosen."""
     cards_choices = {
-        f"{i + 1}.{ascii_letters[j]}": account.transactions
+        f"{i + 1}.{ascii_letters[j]}": card.name
         for i, account in enumerate(position.accounts)
-        for j, _ in enumerate(account.cards)
+        for j, card in enumerate(account.cards)
     }
     accounts_choices = {
-        f"{i + 1}": account.transactions for i, account in enumerate(position.accounts)
+        f"{i + 1}": account.name for i, account in enumerate(position.accounts)
     }
 
     return cards_choices | accounts_choices
@@ -159,7 +458,58 @@ def get_account_or_card_selection_choices(
 
 @click.command()
 @click.option("--option", default=None)
-async def show(option):
+@click.option(
+    "--daemon", default=None, help="host:port of a pying serve to read the data from"
+)
+@click.option(
+    "--product",
+    default=None,
+    help="name of the account or card whose transactions are shown, asked if not given",
+)
+@click.option(
+    "--since",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    default=None,
+    help="first day of the transactions (YYYY-MM-DD)",
+)
+@click.option(
+    "--until",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    default=None,
+    help="last day of the transactions (YYYY-MM-DD)",
+)
+@click.option("--min_amount", type=float, default=None)
+@click.option("--max_amount", type=float, default=None)
+@click.option(
+    "--description", default=None, help="text the description contains, any case"
+)
+@click.option(
+    "--regex", default=None, help="regular expression the description matches"
+)
+@click.option("--limit", type=int, default=None)
+@click.option("--offset", type=int, default=0)
+@click.option(
+    "--output",
+    type=click.Choice([output.value for output in ShowOutput]),
+    default=ShowOutput.pager.value,
+    help="pager, or json lines or csv written to stdout",
+)
+async def show(
+    option,
+    daemon,
+    product,
+    since,
+    until,
+    min_amount,
+    max_amount,
+    description,
+    regex,
+    limit,
+    offset,
+    output,
+):
+    from rich.prompt import Prompt
+
     if not option:
         option = Prompt.ask(
             "What do you want to show?",
@@ -170,7 +520,8 @@ async def show(option):
         if option not in list(ShowOptions):
             raise NotAValidChoice("Selected option is not a valid choice")
 
-    position = Position.load()
+    # the summary of the products is enough, the transactions of the chosen one are queried later
+    position = load_summary(daemon)
 
     if position:
         if option == "position":
@@ -194,39 +545,302 @@ async def show(option):
             account_or_card_selection_choices = get_account_or_card_selection_choices(
                 position
             )
-            account_or_card_selection = Prompt.ask(
-                message,
-                choices=list(account_or_card_selection_choices.keys()),
-                default=list(account_or_card_selection_choices.keys())[0],
+            if not product:
+                account_or_card_selection = Prompt.ask(
+                    message,
+                    choices=list(account_or_card_selection_choices.keys()),
+                    default=list(account_or_card_selection_choices.keys())[0],
+                )
+                product = account_or_card_selection_choices[account_or_card_selection]
+            elif product not in account_or_card_selection_choices.values():
+                raise NotAValidChoice(f"{product} is not an account or card")
+
+            from playwrighting.output import write_transactions
+            from playwrighting.storage import TransactionsQuery
+
+            query = TransactionsQuery(
+                since=since and since.strftime("%Y-%m-%d"),
+                until=until and until.strftime("%Y-%m-%d"),
+                min_amount=min_amount,
+                max_amount=max_amount,
+                description=description,
+                regex=regex,
+                limit=limit,
+                offset=offset,
             )
+            with query_transactions(daemon, product, query) as rows:
+                write_transactions(rows, ShowOutput(output))
+        elif option in ("monthly", "descriptions"):
+            # the aggregates are kept by the local state
+            from playwrighting.output import write_rows
+            from playwrighting.storage import open_store
+
+            with open_store() as store:
+                if option == "monthly":
+                    rows = store.monthly_totals(
+                        product,
+                        since and since.strftime("%Y-%m-%d"),
+                        until and until.strftime("%Y-%m-%d"),
+                    )
+                else:
+                    rows = store.description_totals(product, limit)
+            write_rows(rows, ShowOutput(output))
+
+
+@click.group(invoke_without_command=True)
+@click.pass_context
+async def backup(ctx: click.Context):
+    """Snapshots of the state, backup alone creates one."""
+    if ctx.invoked_subcommand is None:
+        await ctx.invoke(create)
+
+
+@backup.command()
+@click.argument("name", required=False)
+async def create(name: Optional[str]):
+    """Snapshots the state, named after its date by default."""
+    from playwrighting.backup import SnapshotStore
+
+    if (get_app_path() / LEGACY_STATE_FILE_NAME).exists():
+        from playwrighting.accounts import Position
+
+        Position.migrate_legacy_state()
+
+    origin_state = get_app_path() / STATE_FILE_NAME
+    if not origin_state.exists():
+        raise StateFileDoesNotExist("Cannot backup because state file doesn't exist")
 
-            console = Console()
-            with console.pager():
-                console.print(
-                    account_or_card_selection_choices[account_or_card_selection]
-                )
+    snapshot = SnapshotStore(get_app_path() / SNAPSHOTS_FOLDER_NAME).create(
+        origin_state, name
+    )
+    print(
+        f"Snapshot {snapshot.id} has been created, {snapshot.written / 1024:.0f} KiB written"
+    )
+
+
+@backup.command(name="list")
+async def list_snapshots():
+    """Lists the snapshots."""
+    from rich.table import Table
+
+    from playwrighting.backup import SnapshotStore
+
+    table = Table(title="Snapshots")
+    for column in ("id", "created", "size (KiB)", "written (KiB)"):
+        table.add_column(column)
+    for snapshot in SnapshotStore(get_app_path() / SNAPSHOTS_FOLDER_NAME).list():
+        table.add_row(
+            snapshot.id,
+            f"{snapshot.created:%Y-%m-%d %H:%M:%S}",
+            f"{snapshot.size / 1024:.0f}",
+            f"{snapshot.written / 1024:.0f}",
+        )
+    print(table)
 
 
-@click.command()
-@click.option("--destiny_name", default=None, help="destiny backup file name")
-async def backup(destiny_name: str):
-    origin_state = app_path / STATE_FILE_NAME
-    now = datetime.now().strftime("%d%b%y-%H%M")
-    destiny_file_name = f"{destiny_name or now}.pkl"
-    destiny_state = app_path / destiny_file_name
+@backup.command()
+@click.argument("snapshot_id")
+async def restore(snapshot_id: str):
+    """Restores the snapshot, snapshotting the current state first so the restore can be undone."""
+    from playwrighting.backup import SnapshotStore
 
-    if not origin_state.exists():
-        raise StateFileDoesNotExist("Cannot backup because state file doesn't exist")
+    origin_state = get_app_path() / STATE_FILE_NAME
+    snapshots = SnapshotStore(get_app_path() / SNAPSHOTS_FOLDER_NAME)
+    snapshots.load(snapshot_id)
+    if origin_state.exists():
+        current = snapshots.create(origin_state)
+        print(f"The current state has been saved as snapshot {current.id}")
+    snapshot = snapshots.restore(snapshot_id, origin_state)
+    print(f"Snapshot {snapshot.id} has been restored")
 
-    copy(origin_state, destiny_state)
+
+@backup.command()
+@click.option("--keep_last", default=7, help="keeps the latest snapshots")
+@click.option(
+    "--keep_daily", default=30, help="keeps the latest snapshot of the last days"
+)
+@click.option(
+    "--keep_monthly", default=12, help="keeps the latest snapshot of the last months"
+)
+async def prune(keep_last: int, keep_daily: int, keep_monthly: int):
+    """Removes the snapshots out of the retention policy and the chunks no snapshot uses."""
+    from playwrighting.backup import SnapshotStore
+
+    removed = SnapshotStore(get_app_path() / SNAPSHOTS_FOLDER_NAME).prune(
+        keep_last, keep_daily, keep_monthly
+    )
+    print(f"{len(removed)} snapshots have been removed")
+
+
+@click.command()
+@click.argument("text")
+@click.option("--product", default=None, help="search only the given account or card")
+@click.option(
+    "--since",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    default=None,
+    help="first day of the transactions (YYYY-MM-DD)",
+)
+@click.option(
+    "--until",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    default=None,
+    help="last day of the transactions (YYYY-MM-DD)",
+)
+@click.option("--min_amount", type=float, default=None)
+@click.option("--max_amount", type=float, default=None)
+@click.option("--limit", type=int, default=20)
+@click.option("--offset", type=int, default=0)
+@click.option(
+    "--output",
+    type=click.Choice([output.value for output in ShowOutput]),
+    default=ShowOutput.pager.value,
+    help="pager, or json lines or csv written to stdout",
+)
+async def search(
+    text, product, since, until, min_amount, max_amount, limit, offset, output
+):
+    """Transactions of every account and card whose description has the words of TEXT, the best matches first."""
+    if not exist_state_file():
+        raise StateFileDoesNotExist("Cannot search because state file doesn't exist")
+
+    from playwrighting.output import write_rows
+    from playwrighting.storage import TransactionsQuery, open_store
+
+    query = TransactionsQuery(
+        since=since and since.strftime("%Y-%m-%d"),
+        until=until and until.strftime("%Y-%m-%d"),
+        min_amount=min_amount,
+        max_amount=max_amount,
+        limit=limit,
+        offset=offset,
+    )
+    with open_store() as store:
+        rows = store.search_transactions(text, product, query)
+        write_rows(
+            (
+                {"product": product, "Fecha": fecha, **record}
+                for product, fecha, record in rows
+            ),
+            ShowOutput(output),
+        )
 
 
-install()
 cli.add_command(init)
 cli.add_command(update)
 cli.add_command(download)
 cli.add_command(show)
-cli.add_command(backup)
+cli.add_standalone_command(search)
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1")
+@click.option("--port", default=8765)
+@click.option(
+    "--interval", default=300.0, help="seconds between checks of the overall balance"
+)
+@click.option(
+    "--jobs", default=1, help="number of accounts and cards scraped concurrently"
+)
+@click.option(
+    "--fetch_mode",
+    type=click.Choice([mode.value for mode in FetchMode]),
+    default=FetchMode.dom,
+    help="read the movements from the rendered tables (dom) or from the json downloaded by the web (api)",
+)
+@click.option(
+    "--no_blocking",
+    is_flag=True,
+    default=False,
+    help="don't block the resource types and urls of the configuration",
+)
+async def serve(host, port, interval, jobs, fetch_mode, no_blocking):
+    from playwright.async_api import async_playwright
+
+    from playwrighting.accounts import Position
+    from playwrighting.daemon import Daemon
+    from playwrighting.navigation.routing import ResourceBlocker
+    from playwrighting.navigation.session import open_page, resume_or_login
+
+    async with async_playwright() as p:
+        blocker = None if no_blocking else ResourceBlocker.from_config(get_config())
+        async with open_page(p, blocker) as page:
+            await resume_or_login(page)
+            daemon = Daemon(
+                page,
+                Position.load(),
+                interval=interval,
+                jobs=jobs,
+                fetch_mode=fetch_mode,
+                blocker=blocker,
+            )
+            await daemon.serve(host, port)
+
+
+@click.command()
+@click.argument("profiles", nargs=-1)
+@click.option(
+    "--concurrency", default=2, help="number of profiles updated at the same time"
+)
+@click.option(
+    "--timeout", default=None, type=float, help="seconds given to every profile"
+)
+@click.option("--force", is_flag=True, default=False)
+@click.option(
+    "--jobs", default=1, help="number of accounts and cards scraped concurrently"
+)
+@click.option(
+    "--fetch_mode",
+    type=click.Choice([mode.value for mode in FetchMode]),
+    default=FetchMode.dom,
+    help="read the movements from the rendered tables (dom) or from the json downloaded by the web (api)",
+)
+@click.option(
+    "--no_blocking",
+    is_flag=True,
+    default=False,
+    help="don't block the resource types and urls of the configuration",
+)
+async def batch(profiles, concurrency, timeout, force, jobs, fetch_mode, no_blocking):
+    from playwright.async_api import async_playwright
+
+    from playwrighting.batch import run_batch, results_table
+    from playwrighting.config import Profile, profiles_path
+
+    profiles = [Profile(name) for name in profiles] or Profile.all()
+    if not profiles:
+        raise ProfileDoesNotExist(
+            f"There isn't any profile, create a folder with a .env file for each one in {profiles_path}"
+        )
+    missing = [profile.name for profile in profiles if not profile.config_path.exists()]
+    if missing:
+        raise ProfileDoesNotExist(
+            f"Profiles without configuration in {profiles_path}: {', '.join(missing)}"
+        )
+
+    async with async_playwright() as p:
+        # every profile gets its own context of a browser launched for the batch, whatever their browser_mode
+        browser = await p.chromium.launch()
+        try:
+            results = await run_batch(
+                browser,
+                profiles,
+                concurrency,
+                timeout,
+                jobs=jobs,
+                force=force,
+                fetch_mode=fetch_mode,
+                no_blocking=no_blocking,
+            )
+        finally:
+            await browser.close()
+
+    print(results_table(results))
+
+
+cli.add_standalone_command(backup)
+cli.add_standalone_command(batch)
+cli.add_command(serve)
 
 if __name__ == "__main__":
     cli(_anyio_backend="asyncio")
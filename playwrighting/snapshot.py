@@ -0,0 +1,77 @@
+from typing import List, Optional
+from weakref import WeakKeyDictionary
+
+from playwright.async_api import Page
+from selectolax.parser import HTMLParser
+
+# counts the DOM changes of the document, a new document (e.g. after a navigation) starts with a version of its own
+DOM_OBSERVER_SCRIPT = """
+(() => {
+    if (window.__pyingObserver) return;
+    window.__pyingDocument = Math.random().toString(36).slice(2);
+    window.__pyingMutations = 0;
+    window.__pyingObserver = new MutationObserver(() => {
+        window.__pyingMutations += 1;
+    });
+    window.__pyingObserver.observe(document, {
+        subtree: true, childList: true, attributes: true, characterData: true
+    });
+})();
+"""
+DOM_VERSION = "window.__pyingObserver ? `${window.__pyingDocument}:${window.__pyingMutations}` : null"
+VERSION_SCRIPT = f"() => {DOM_VERSION}"
+CAPTURE_SCRIPT = f"() => [{DOM_VERSION}, document.documentElement.outerHTML]"
+
+_snapshots: "WeakKeyDictionary[Page, PageSnapshot]" = WeakKeyDictionary()
+
+
+class PageSnapshot:
+    """Content of a page serialized and parsed once, answering any number of selector queries.
+
+    Every query checks the DOM version of the page first (a single round-trip), the page is captured again when it
+    has changed since the capture (e.g. after a click or a navigation) or when it has no version.
+    """
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.captures = 0
+        self._tree: Optional[HTMLParser] = None
+        self._version: Optional[str] = None
+
+    @staticmethod
+    async def of(page: Page) -> "PageSnapshot":
+        snapshot = _snapshots.get(page)
+        if snapshot is None:
+            snapshot = PageSnapshot(page)
+            await snapshot._observe()
+            _snapshots[page] = snapshot
+        return snapshot
+
+    async def _observe(self):
+        await self.page.add_init_script(DOM_OBSERVER_SCRIPT)
+        await self.page.evaluate(DOM_OBSERVER_SCRIPT)
+
+    def invalidate(self):
+        self._tree = None
+
+    async def tree(self) -> HTMLParser:
+        if self._tree is not None:
+            version = await self.page.evaluate(VERSION_SCRIPT)
+            if version is None or version != self._version:
+                self.invalidate()
+        if self._tree is None:
+            self._version, content = await self.page.evaluate(CAPTURE_SCRIPT)
+            self._tree = HTMLParser(content)
+            self.captures += 1
+        return self._tree
+
+    async def text(self, selector: str) -> Optional[str]:
+        tree = await self.tree()
+
+        if tree.body:
+            return tree.body.css(selector)[0].text(separator="\n", strip=True)
+
+    async def texts(self, selector: str) -> Optional[List[str]]:
+        text = await self.text(selector)
+        if text is not None:
+            return text.split()
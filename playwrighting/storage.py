@@ -0,0 +1,538 @@
+import json
+import re
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+from playwrighting.config import get_app_path
+from playwrighting.constants import STATE_FILE_NAME, STATE_MMAP_SIZE
+
+# pandas is imported by the methods that read or write transactions, the position and the products are read without it
+if TYPE_CHECKING:
+    import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS position (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    balance REAL NOT NULL,
+    last_update TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS products (
+    name TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    account TEXT,
+    ordinal INTEGER NOT NULL,
+    balance REAL,
+    expense REAL,
+    is_activated INTEGER,
+    last_update TEXT
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    product TEXT NOT NULL,
+    key TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (product, key)
+);
+CREATE INDEX IF NOT EXISTS transactions_by_day ON transactions (product, fecha DESC);
+"""
+
+
+SEARCH_INDEX = "transactions_search"
+MONTHLY_TOTALS_COLUMNS = ("product", "month", "income", "expense", "count")
+DESCRIPTION_TOTALS_COLUMNS = ("product", "description", "total", "count")
+
+
+@dataclass(frozen=True)
+class ProductRecord:
+    name: str
+    kind: str
+    account: Optional[str]
+    balance: Optional[float] = None
+    expense: Optional[float] = None
+    is_activated: Optional[bool] = None
+    last_update: Optional[datetime] = None
+
+
+def to_iso(moment: Optional[datetime]) -> Optional[str]:
+    return moment.isoformat() if moment else None
+
+
+def from_iso(moment: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(moment) if moment else None
+
+
+def record_amount(record: dict) -> Optional[float]:
+    amount = record.get("Importe")
+    return float(amount) if isinstance(amount, (int, float)) else None
+
+
+def transactions_to_records(
+    transactions: "pd.DataFrame",
+) -> List[Tuple[str, str, Optional[float], Optional[str], str]]:
+    """(key, fecha, amount, description, data) of every transaction, keyed like the merge of the updates (see
+    transaction_keys)."""
+    from playwrighting.merge import transaction_keys
+
+    records = json.loads(
+        transactions.reset_index().to_json(orient="records", date_format="iso")
+    )
+    rows = []
+    for key, record in zip(transaction_keys(transactions), records):
+        fecha = record.pop("Fecha")[:10]
+        rows.append(
+            (
+                key,
+                fecha,
+                record_amount(record),
+                record.get("Descripción"),
+                json.dumps(record, ensure_ascii=False),
+            )
+        )
+    return rows
+
+
+@dataclass(frozen=True)
+class TransactionsQuery:
+    """Filters of the transactions of a product, dates are YYYY-MM-DD and both ends of the ranges are included."""
+
+    since: Optional[str] = None
+    until: Optional[str] = None
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    description: Optional[str] = None
+    regex: Optional[str] = None
+    limit: Optional[int] = None
+    offset: int = 0
+
+    def where(self) -> Tuple[str, list]:
+        conditions, parameters = [], []
+        for condition, value in (
+            ("fecha >= ?", self.since),
+            ("fecha <= ?", self.until),
+            ("amount >= ?", self.min_amount),
+            ("amount <= ?", self.max_amount),
+            ("instr(casefold(description), casefold(?)) > 0", self.description),
+            ("regexp(?, description)", self.regex),
+        ):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        return " AND ".join(conditions), parameters
+
+    def matches(self, fecha: str, record: dict) -> bool:
+        """Same filters as :meth:`where` for the transactions that aren't in a store."""
+        amount = record_amount(record)
+        description = record.get("Descripción") or ""
+        return (
+            (self.since is None or fecha >= self.since)
+            and (self.until is None or fecha <= self.until)
+            and (
+                self.min_amount is None
+                or (amount is not None and amount >= self.min_amount)
+            )
+            and (
+                self.max_amount is None
+                or (amount is not None and amount <= self.max_amount)
+            )
+            and (
+                self.description is None
+                or self.description.casefold() in description.casefold()
+            )
+            and (self.regex is None or re.search(self.regex, description) is not None)
+        )
+
+
+def regexp(pattern: str, value: Optional[str]) -> bool:
+    return value is not None and re.search(pattern, value) is not None
+
+
+def casefold(value: Optional[str]) -> Optional[str]:
+    """Case insensitive form of the text, unlike the lower of SQLite it isn't limited to ASCII ("Ñ", "É"...)."""
+    return value.casefold() if value is not None else None
+
+
+def normalize_description(description: Optional[str]) -> str:
+    """Description without digits nor punctuation, so the payments to the same merchant (with different dates, card
+    numbers or references) are added up together."""
+    if not description:
+        return ""
+    return " ".join(re.sub(r"[\d\W_]+", " ", description.lower()).split())
+
+
+def add_filter_columns(connection: sqlite3.Connection):
+    """Amount and description columns of the transactions, to filter them without reading their data."""
+    connection.executescript(
+        """
+        ALTER TABLE transactions ADD COLUMN amount REAL;
+        ALTER TABLE transactions ADD COLUMN description TEXT;
+        CREATE INDEX IF NOT EXISTS transactions_by_amount ON transactions (product, amount);
+        """
+    )
+    rows = connection.execute("SELECT rowid, data FROM transactions").fetchall()
+    connection.executemany(
+        "UPDATE transactions SET amount = ?, description = ? WHERE rowid = ?",
+        [
+            (record_amount(record), record.get("Descripción"), rowid)
+            for rowid, record in ((rowid, json.loads(data)) for rowid, data in rows)
+        ],
+    )
+
+
+def add_aggregates(connection: sqlite3.Connection):
+    """Totals by month and by normalized description of every product, kept up to date by triggers from the
+    transactions inserted and deleted, so they are never recomputed from the whole history."""
+    connection.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS monthly_totals (
+            product TEXT NOT NULL,
+            month TEXT NOT NULL,
+            income REAL NOT NULL,
+            expense REAL NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (product, month)
+        );
+        CREATE TABLE IF NOT EXISTS description_totals (
+            product TEXT NOT NULL,
+            description TEXT NOT NULL,
+            total REAL NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (product, description)
+        );
+
+        INSERT INTO monthly_totals
+        SELECT product, substr(fecha, 1, 7), sum(max(coalesce(amount, 0), 0)),
+            sum(min(coalesce(amount, 0), 0)), count(*)
+        FROM transactions GROUP BY 1, 2;
+        INSERT INTO description_totals
+        SELECT product, normalize_description(description), sum(coalesce(amount, 0)), count(*)
+        FROM transactions GROUP BY 1, 2;
+
+        CREATE TRIGGER IF NOT EXISTS transactions_inserted AFTER INSERT ON transactions
+        BEGIN
+            INSERT INTO monthly_totals VALUES (
+                new.product, substr(new.fecha, 1, 7), max(coalesce(new.amount, 0), 0),
+                min(coalesce(new.amount, 0), 0), 1
+            )
+            ON CONFLICT (product, month) DO UPDATE SET
+                income = income + excluded.income, expense = expense + excluded.expense, count = count + 1;
+            INSERT INTO description_totals VALUES (
+                new.product, normalize_description(new.description), coalesce(new.amount, 0), 1
+            )
+            ON CONFLICT (product, description) DO UPDATE SET
+                total = total + excluded.total, count = count + 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS transactions_deleted AFTER DELETE ON transactions
+        BEGIN
+            UPDATE monthly_totals SET
+                income = income - max(coalesce(old.amount, 0), 0),
+                expense = expense - min(coalesce(old.amount, 0), 0),
+                count = count - 1
+            WHERE product = old.product AND month = substr(old.fecha, 1, 7);
+            DELETE FROM monthly_totals
+            WHERE product = old.product AND month = substr(old.fecha, 1, 7) AND count = 0;
+            UPDATE description_totals SET total = total - coalesce(old.amount, 0), count = count - 1
+            WHERE product = old.product AND description = normalize_description(old.description);
+            DELETE FROM description_totals
+            WHERE product = old.product AND description = normalize_description(old.description) AND count = 0;
+        END;
+        """
+    )
+
+
+def add_search_index(connection: sqlite3.Connection):
+    """Full text index of the descriptions, kept up to date by triggers like the aggregates. Its rows are linked to the
+    transactions by rowid, a VACUUM could renumber them and the index would have to be rebuilt. Without the FTS5
+    extension in the sqlite3 module nothing is created and the search falls back to LIKE."""
+    try:
+        connection.execute(
+            f"CREATE VIRTUAL TABLE {SEARCH_INDEX} USING fts5("
+            "description, content='transactions', content_rowid='rowid')"
+        )
+    except sqlite3.OperationalError:
+        return
+
+    connection.executescript(
+        f"""
+        INSERT INTO {SEARCH_INDEX} ({SEARCH_INDEX}) VALUES ('rebuild');
+
+        CREATE TRIGGER IF NOT EXISTS transactions_indexed AFTER INSERT ON transactions
+        BEGIN
+            INSERT INTO {SEARCH_INDEX} (rowid, description) VALUES (new.rowid, new.description);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS transactions_unindexed AFTER DELETE ON transactions
+        BEGIN
+            INSERT INTO {SEARCH_INDEX} ({SEARCH_INDEX}, rowid, description)
+            VALUES ('delete', old.rowid, old.description);
+        END;
+        """
+    )
+
+
+# applied in order to the state files whose user_version is lower than their position in the list
+MIGRATIONS = [add_filter_columns, add_aggregates, add_search_index]
+
+
+class Store:
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+        self.connection.create_function("regexp", 2, regexp, deterministic=True)
+        self.connection.create_function("casefold", 1, casefold, deterministic=True)
+        # used by the triggers of the aggregates
+        self.connection.create_function(
+            "normalize_description", 1, normalize_description, deterministic=True
+        )
+        self.connection.executescript(SCHEMA)
+        self.migrate()
+
+    def migrate(self):
+        (current,) = self.connection.execute("PRAGMA user_version").fetchone()
+        for version, migration in enumerate(MIGRATIONS[current:], start=current + 1):
+            migration(self.connection)
+            self.connection.execute(f"PRAGMA user_version = {version}")
+
+    def save_position(self, balance: float, last_update: datetime):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO position (id, balance, last_update) VALUES (1, ?, ?)",
+            (balance, to_iso(last_update)),
+        )
+
+    def load_position(self) -> Optional[Tuple[float, datetime]]:
+        row = self.connection.execute(
+            "SELECT balance, last_update FROM position WHERE id = 1"
+        ).fetchone()
+        if row:
+            return row[0], from_iso(row[1])
+
+    def save_products(self, products: List[ProductRecord]):
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    product.name,
+                    product.kind,
+                    product.account,
+                    ordinal,
+                    product.balance,
+                    product.expense,
+                    product.is_activated,
+                    to_iso(product.last_update),
+                )
+                for ordinal, product in enumerate(products)
+            ],
+        )
+        # products that are no longer in the position, their transactions are kept
+        names = [product.name for product in products]
+        self.connection.execute(
+            f"DELETE FROM products WHERE name NOT IN ({', '.join('?' * len(names))})",
+            names,
+        )
+
+    def load_products(self) -> List[ProductRecord]:
+        rows = self.connection.execute(
+            "SELECT name, kind, account, balance, expense, is_activated, last_update "
+            "FROM products ORDER BY ordinal"
+        )
+        return [
+            ProductRecord(
+                name,
+                kind,
+                account,
+                balance,
+                expense,
+                None if is_activated is None else bool(is_activated),
+                from_iso(last_update),
+            )
+            for name, kind, account, balance, expense, is_activated, last_update in rows
+        ]
+
+    def append_transactions(
+        self,
+        product: str,
+        transactions: Optional["pd.DataFrame"],
+        since: Optional[str] = None,
+    ):
+        """Stores the history of the product rewriting only the days that differ from the stored ones.
+
+        Those are the days of the transactions whose key isn't stored yet and of the stored transactions that aren't in
+        the history anymore (a merge can add a transaction older than the last stored day). A day is replaced as a
+        whole so its transactions keep the order of the history. With since (YYYY-MM-DD, the window of the merge, see
+        merged_since) only the days from it are compared, the older rows are left untouched.
+        """
+        if transactions is None or transactions.empty:
+            return
+
+        import pandas as pd
+
+        from playwrighting.merge import transaction_keys
+
+        if since:
+            transactions = transactions[transactions.index >= pd.Timestamp(since)]
+        stored = dict(
+            self.connection.execute(
+                "SELECT key, fecha FROM transactions WHERE product = ? AND fecha >= ?",
+                (product, since or ""),
+            )
+        )
+        keys = transaction_keys(transactions)
+        days = pd.DatetimeIndex(transactions.index).strftime("%Y-%m-%d")
+        changed_days = {day for key, day in zip(keys, days) if key not in stored}
+        current = set(keys)
+        changed_days.update(day for key, day in stored.items() if key not in current)
+        if not changed_days:
+            return
+
+        self.connection.executemany(
+            "DELETE FROM transactions WHERE product = ? AND fecha = ?",
+            [(product, day) for day in changed_days],
+        )
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO transactions (product, key, fecha, amount, description, data) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (product, *record)
+                for record in transactions_to_records(
+                    transactions[days.isin(list(changed_days))]
+                )
+            ],
+        )
+
+    def load_transactions(self, product: str) -> "pd.DataFrame":
+        import pandas as pd
+
+        from playwrighting.merge import MERGED_SINCE
+
+        rows = self.connection.execute(
+            "SELECT fecha, data FROM transactions WHERE product = ? ORDER BY fecha DESC, rowid",
+            (product,),
+        ).fetchall()
+        if not rows:
+            return pd.DataFrame()
+
+        transactions = pd.DataFrame.from_records([json.loads(data) for _, data in rows])
+        transactions.index = pd.DatetimeIndex(
+            pd.to_datetime([fecha for fecha, _ in rows]), name="Fecha"
+        )
+        # as stored, a later merge sets the first day it changes
+        transactions.attrs[MERGED_SINCE] = transactions.index.max() + pd.Timedelta(
+            days=1
+        )
+        return transactions
+
+    def monthly_totals(
+        self,
+        product: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> List[dict]:
+        """Income, expense and number of transactions by product and month (YYYY-MM), newest first."""
+        conditions, parameters = ["1"], []
+        for condition, value in (
+            ("product = ?", product),
+            ("month >= ?", since and since[:7]),
+            ("month <= ?", until and until[:7]),
+        ):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        rows = self.connection.execute(
+            "SELECT product, month, round(income, 2), round(expense, 2), count FROM monthly_totals "
+            f"WHERE {' AND '.join(conditions)} ORDER BY month DESC, product",
+            parameters,
+        )
+        return [dict(zip(MONTHLY_TOTALS_COLUMNS, row)) for row in rows]
+
+    def description_totals(
+        self, product: Optional[str] = None, limit: Optional[int] = None
+    ) -> List[dict]:
+        """Total and number of transactions by product and normalized description, the largest totals first."""
+        rows = self.connection.execute(
+            "SELECT product, description, round(total, 2), count FROM description_totals "
+            "WHERE ? IS NULL OR product = ? ORDER BY abs(total) DESC LIMIT ?",
+            (product, product, -1 if limit is None else limit),
+        )
+        return [dict(zip(DESCRIPTION_TOTALS_COLUMNS, row)) for row in rows]
+
+    def has_search_index(self) -> bool:
+        return bool(
+            self.connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = ?", (SEARCH_INDEX,)
+            ).fetchone()
+        )
+
+    def search_transactions(
+        self, text: str, product: Optional[str], query: TransactionsQuery
+    ) -> Iterator[Tuple[str, str, dict]]:
+        """(product, fecha, data) of the transactions whose description has every word of the text (or words starting
+        with them), the best matches first. Without the full text index, the newest first."""
+        words = re.findall(r"\w+", text)
+        if not words:
+            return
+
+        where, parameters = query.where()
+        conditions = [where] if where else []
+        if product:
+            conditions.append("product = ?")
+            parameters.append(product)
+
+        if self.has_search_index():
+            match = " ".join(f'"{word}"*' for word in words)
+            sql = (
+                "SELECT product, fecha, data FROM transactions "
+                f"JOIN (SELECT rowid AS id, rank FROM {SEARCH_INDEX} WHERE {SEARCH_INDEX} MATCH ?) "
+                f"ON transactions.rowid = id WHERE {' AND '.join(['1', *conditions])} "
+                "ORDER BY rank, fecha DESC LIMIT ? OFFSET ?"
+            )
+            parameters = [match, *parameters]
+        else:
+            conditions.extend(
+                ["instr(casefold(description), casefold(?)) > 0"] * len(words)
+            )
+            parameters.extend(words)
+            sql = (
+                f"SELECT product, fecha, data FROM transactions WHERE {' AND '.join(conditions)} "
+                "ORDER BY fecha DESC, rowid LIMIT ? OFFSET ?"
+            )
+
+        cursor = self.connection.execute(
+            sql,
+            (*parameters, -1 if query.limit is None else query.limit, query.offset),
+        )
+        for product, fecha, data in cursor:
+            yield product, fecha, json.loads(data)
+
+    def query_transactions(
+        self, product: str, query: TransactionsQuery
+    ) -> Iterator[Tuple[str, dict]]:
+        """(fecha, data) of the matching transactions, newest first, read from the cursor as they are consumed."""
+        where, parameters = query.where()
+        cursor = self.connection.execute(
+            "SELECT fecha, data FROM transactions WHERE product = ?"
+            f"{f' AND {where}' if where else ''} ORDER BY fecha DESC, rowid "
+            "LIMIT ? OFFSET ?",
+            (
+                product,
+                *parameters,
+                -1 if query.limit is None else query.limit,
+                query.offset,
+            ),
+        )
+        for fecha, data in cursor:
+            yield fecha, json.loads(data)
+
+
+@contextmanager
+def open_store(path: Path = None) -> Iterator[Store]:
+    connection = sqlite3.connect(path or get_app_path() / STATE_FILE_NAME)
+    # the transactions of a product are read from the mapped pages instead of copied through the page cache
+    connection.execute(f"PRAGMA mmap_size = {STATE_MMAP_SIZE}")
+    try:
+        with connection:
+            yield Store(connection)
+    finally:
+        connection.close()
@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+from datetime import datetime
+from string import ascii_letters
+from typing import List, Optional, Tuple, Union, TYPE_CHECKING
+
+from playwrighting.constants import ACCOUNT_KIND
+from playwrighting.storage import ProductRecord, Store
+
+if TYPE_CHECKING:
+    from playwrighting.client import DaemonClient
+
+
+def account_position(name: str, balance: float, last_update: Optional[datetime]) -> str:
+    message = f"""Account {name}
+        Balance: {balance}
+        Last update on {last_update}
+        """
+    return message
+
+
+def account_transactions_menu(name: str, cards: List[str], position: int) -> str:
+    cards_lines = "\t".join(
+        [f"{position}.{ascii_letters[i]}) {card}" for i, card in enumerate(cards)]
+    )
+    message = f"""{name}
+        {f"Cards: {cards_lines}" if cards else ""}
+        """
+    return message
+
+
+def general_position(
+    balance: float, last_update: Optional[datetime], accounts: List[str]
+) -> str:
+    message = f"""
+        General Position
+        -----------------
+
+        Balance: {balance}
+        Last update on {last_update}
+
+        Accounts:
+        {"".join([f"{i + 1}) {account}" for i, account in enumerate(accounts)])}
+        """
+
+    return message
+
+
+@dataclass(frozen=True)
+class AccountSummary:
+    name: str
+    balance: float
+    last_update: Optional[datetime]
+    cards: Tuple[ProductRecord, ...]
+
+    def position(self) -> str:
+        return account_position(self.name, self.balance, self.last_update)
+
+    def transactions_menu(self, position: int) -> str:
+        return account_transactions_menu(
+            self.name, [card.name for card in self.cards], position
+        )
+
+
+@dataclass(frozen=True)
+class PositionSummary:
+    """The position as stored without any transaction, what show prints about it. Unlike Position it is read without
+    importing pandas or the scraper."""
+
+    balance: float
+    accounts: Tuple[AccountSummary, ...]
+    last_update: Optional[datetime]
+
+    def __str__(self):
+        return general_position(
+            self.balance,
+            self.last_update,
+            [account.position() for account in self.accounts],
+        )
+
+    @staticmethod
+    def from_store(store: Union[Store, "DaemonClient"]) -> Optional["PositionSummary"]:
+        position = store.load_position()
+        if not position:
+            return None
+        balance, last_update = position
+
+        products = store.load_products()
+        accounts = [
+            AccountSummary(
+                record.name,
+                record.balance,
+                record.last_update,
+                cards=tuple(card for card in products if card.account == record.name),
+            )
+            for record in products
+            if record.kind == ACCOUNT_KIND
+        ]
+        return PositionSummary(balance, tuple(accounts), last_update)
@@ -1,16 +1,27 @@
+import asyncio
+import logging
+import re
 from datetime import datetime
+from typing import List, Optional
 
 import pandas as pd
-from playwright.async_api import Page, TimeoutError as PlayWrightTimeout
-from rich import print
-from rich.prompt import Prompt
-
-from playwrighting.navigation.transactions import (
-    has_previous_month,
-    has_ver_mas_button,
-    need_to_check_your_phone,
-    previous_month_not_obtained,
+from playwright.async_api import Page, Response
+
+from playwrighting.checkpoint import current_checkpoint
+from playwrighting.constants import (
+    MOVEMENTS_API_URL_PATTERN,
+    MOVEMENTS_API_ELEMENTS,
+    MOVEMENTS_API_ID,
+    MOVEMENTS_API_COLUMNS,
+    FetchMode,
+)
+from playwrighting.exceptions import (
+    TransactionsTableNotParsed,
+    MonthNotParsed,
+    MovementsNotCaptured,
 )
+from playwrighting.navigation.transactions import get_page_state, open_product
+from playwrighting.navigation.validation import wait_for_phone_validation
 from playwrighting.page_selectors import (
     VER_MAS_BUTTON,
     PREVIOUS_MONTH_BUTTON,
@@ -19,6 +30,109 @@ from playwrighting.page_selectors import (
     THIS_MONTH_BUTTON,
     TRANSACTIONS_TABLE_ALTERNATIVE,
 )
+from playwrighting.parsers import (
+    parse_amount_columns,
+    parse_transactions_table,
+    parse_date,
+    parse_month_label,
+)
+from playwrighting.profiling import span
+
+
+class MovementsCapture:
+    """Collects the movements json responses that the web app downloads while we navigate through the months."""
+
+    def __init__(self, page: Page):
+        self.page = page
+        self._payloads: List[dict] = []
+        self._pending: List[asyncio.Task] = []
+
+    async def __aenter__(self) -> "MovementsCapture":
+        self.page.on("response", self._on_response)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.page.remove_listener("response", self._on_response)
+
+    def _on_response(self, response: Response):
+        if response.ok and re.search(MOVEMENTS_API_URL_PATTERN, response.url):
+            self._pending.append(asyncio.ensure_future(self._store(response)))
+
+    async def _store(self, response: Response):
+        try:
+            self._payloads.append(await response.json())
+        except ValueError:
+            # not json, it doesn't match the schema either
+            pass
+
+    async def transactions(self) -> pd.DataFrame:
+        """Movements of the captured responses, MovementsNotCaptured if none of them had the assumed schema."""
+        await self.page.wait_for_load_state("networkidle")
+        await asyncio.gather(*self._pending)
+        if not any(
+            isinstance(payload, dict) and MOVEMENTS_API_ELEMENTS in payload
+            for payload in self._payloads
+        ):
+            raise MovementsNotCaptured(
+                f"None of the {len(self._payloads)} responses matching {MOVEMENTS_API_URL_PATTERN} had "
+                f"{MOVEMENTS_API_ELEMENTS!r}"
+            )
+        with span("parse movements", responses=len(self._payloads)):
+            return movements_to_dataframe(self._payloads)
+
+
+class TransactionsAccumulator:
+    """Collects the table of every month page and concatenates them once, instead of growing a DataFrame with every
+    page."""
+
+    def __init__(self):
+        self.frames: List[pd.DataFrame] = []
+
+    def add(self, transactions: pd.DataFrame):
+        self.frames.append(transactions)
+
+    def transactions(self) -> pd.DataFrame:
+        if not self.frames:
+            return pd.DataFrame(columns=["Fecha"])
+        # pages are read from the newest month backwards
+        return pd.concat(reversed(self.frames))
+
+
+def movements_to_dataframe(payloads: List[dict]) -> pd.DataFrame:
+    elements = [
+        element
+        for payload in payloads
+        if isinstance(payload, dict)
+        for element in payload.get(MOVEMENTS_API_ELEMENTS, [])
+    ]
+    if not elements:
+        return pd.DataFrame(columns=["Fecha"])
+
+    movements = pd.json_normalize(elements)
+    # the same month can be downloaded more than once
+    if MOVEMENTS_API_ID in movements.columns:
+        movements = movements.drop_duplicates(MOVEMENTS_API_ID)
+
+    columns = [column for column in MOVEMENTS_API_COLUMNS if column in movements]
+    movements = movements[columns].rename(columns=MOVEMENTS_API_COLUMNS)
+    # optional fields (e.g. category) must not drop the movement when cleaning it
+    movements = movements.fillna(
+        {column: "" for column in movements if movements[column].dtype == object}
+    )
+    movements["Fecha"] = pd.to_datetime(
+        [parse_date(value) for value in movements["Fecha"]]
+    )
+    return movements
+
+
+def month_key(label: Optional[str]) -> Optional[str]:
+    """YYYY-MM of the month navigator label, None without navigator or if it can't be parsed."""
+    if not label:
+        return None
+    try:
+        return parse_month_label(label).strftime("%Y-%m")
+    except MonthNotParsed:
+        return None
 
 
 def clean(transactions: pd.DataFrame) -> pd.DataFrame:
@@ -50,45 +164,116 @@ def process_transactions_dataframe(
             "Hoy",
         ]
     )
-    transactions["Fecha"] = transactions["Fecha"].str.replace(days, "", regex=True)
+    transactions["Fecha"] = (
+        transactions["Fecha"].str.replace(days, "", regex=True).str.strip()
+    )
     transactions["Fecha"] = pd.to_datetime(
         transactions["Fecha"], format="%d/%m/%Y", errors="coerce"
     )
     return transactions
 
 
-async def get_new_transactions(
-    page: Page, last_update: datetime, is_credit_card: bool = False
-) -> pd.DataFrame:
+async def go_to_current_month(page: Page, is_credit_card: bool = False):
     # credit card page need additional steps
     if is_credit_card:
         await page.click(CARD_DATE_NAVIGATOR_BUTTON)
         await page.click(THIS_MONTH_BUTTON)
 
+
+async def get_newest_transactions(
+    page: Page, is_credit_card: bool = False
+) -> pd.DataFrame:
+    await go_to_current_month(page, is_credit_card)
     transactions = await get_transactions_from_page(page)
-    while await has_previous_month(page) and await previous_month_not_obtained(
-        page, last_update
-    ):
-        while await has_ver_mas_button(page):
-            if await need_to_check_your_phone(page):
-                await page.click(VER_MAS_BUTTON)
+    return style(clean(transactions))
+
 
-                print("Check your phone and accept the notification")
-                Prompt.ask(
-                    "Have you accepted the notification? Check your phone and accept the notification",
-                    choices=[
-                        "y",
-                        "Y",
-                        "yes",
-                        "Yes",
-                    ],
-                    default="y",
+async def get_product_transactions(
+    page: Page,
+    name: str,
+    last_update: Optional[datetime],
+    is_credit_card: bool = False,
+    fetch_mode: FetchMode = FetchMode.dom,
+    is_open: bool = False,
+) -> pd.DataFrame:
+    """Transactions of the product since the last update. With is_open the page already shows the product, it is only
+    opened again to capture its movements, whose listener must be there before the product is opened.
+
+    The api fetch mode falls back to reading the tables when the web app didn't download its movements as assumed
+    (see MOVEMENTS_API_URL_PATTERN), instead of returning no transactions."""
+    if fetch_mode == FetchMode.api:
+        try:
+            # the listener must be there before the product page downloads its first month
+            async with MovementsCapture(page) as capture:
+                await open_product(page, name)
+                return await get_new_transactions(
+                    page, last_update, is_credit_card, capture, product=name
                 )
-            else:
+        except MovementsNotCaptured as e:
+            logging.warning(f"{name}: {e}, reading the tables instead")
+            is_open = False
+
+    if not is_open:
+        await open_product(page, name)
+    return await get_new_transactions(page, last_update, is_credit_card, product=name)
+
+
+async def get_new_transactions(
+    page: Page,
+    last_update: Optional[datetime],
+    is_credit_card: bool = False,
+    capture: Optional[MovementsCapture] = None,
+    product: Optional[str] = None,
+) -> pd.DataFrame:
+    """Navigates back through the months until the last update, reading every month table or, with a capture, only
+    the movements downloaded by the web app.
+
+    With a checkpoint (see :func:`playwrighting.checkpoint.checkpointing`) every month table of the product is saved
+    once read. The web only goes back a month at a time, so a resumed run still goes through the months already
+    checkpointed, but takes their tables from the checkpoint instead of reading them again.
+    """
+    await go_to_current_month(page, is_credit_card)
+
+    checkpoint = current_checkpoint() if product and not capture else None
+    checkpointed_months = checkpoint.load_months(product) if checkpoint else {}
+
+    async def read_month(month: Optional[str], is_current: bool = False):
+        # the current month can have new transactions since it was checkpointed
+        if month in checkpointed_months and not is_current:
+            accumulator.add(checkpointed_months[month])
+            return
+        transactions = await get_transactions_from_page(page)
+        accumulator.add(transactions)
+        if checkpoint and month:
+            checkpoint.save_month(product, month, transactions)
+
+    accumulator = TransactionsAccumulator()
+    state = await get_page_state(page)
+    if not capture:
+        await read_month(month_key(state.current_month), is_current=True)
+    while state.has_previous_month and state.previous_month_not_obtained(last_update):
+        while state.has_ver_mas_button:
+            if state.need_to_check_your_phone:
                 await page.click(VER_MAS_BUTTON)
+                with span("phone validation"):
+                    await wait_for_phone_validation(page, product or page.url)
+                state = await get_page_state(page)
+            else:
+                with span("ver más", month=state.current_month):
+                    await page.click(VER_MAS_BUTTON)
+                    state = await get_page_state(page, previous=state)
+
+        # the month we are leaving, the span covers going to the previous one and reading it
+        with span("month page", after=state.current_month):
+            await page.click(PREVIOUS_MONTH_BUTTON)
+            state = await get_page_state(page, previous=state)
+            if not capture:
+                await read_month(month_key(state.current_month))
 
-        await page.click(PREVIOUS_MONTH_BUTTON)
-        transactions = pd.concat([await get_transactions_from_page(page), transactions])
+    if capture:
+        transactions = await capture.transactions()
+    else:
+        transactions = accumulator.transactions()
 
     transactions = clean(transactions)
     transactions = style(transactions)
@@ -96,11 +281,23 @@ async def get_new_transactions(
 
 
 async def get_transactions_from_page(page: Page) -> pd.DataFrame:
-    try:
-        content = await page.inner_html(TRANSACTIONS_TABLE)
-    except PlayWrightTimeout:
-        content = await page.inner_html(TRANSACTIONS_TABLE_ALTERNATIVE)
+    # whichever of both tables the page has, without waiting for the first one to time out
+    with span("read table"):
+        content = await page.inner_html(
+            f"{TRANSACTIONS_TABLE}, {TRANSACTIONS_TABLE_ALTERNATIVE}"
+        )
 
+    with span("parse table"):
+        try:
+            return parse_transactions_table(content)
+        except TransactionsTableNotParsed:
+            return read_transactions_table(content)
+
+
+def read_transactions_table(content: str) -> pd.DataFrame:
     transactions = pd.read_html(content, thousands=".", decimal=",")[0]
     transactions = process_transactions_dataframe(transactions)
-    return transactions
+    # rows without a date ("Ver más"...) are dropped when cleaning, they would keep the amounts from being parsed
+    transactions = transactions.dropna(subset=["Fecha"]).copy()
+    # the amounts with the currency sign aren't parsed by read_html
+    return parse_amount_columns(transactions)
@@ -1,7 +1,8 @@
 from typing import List
 
 from playwright.async_api import Page
-from selectolax.parser import HTMLParser
+
+from playwrighting.snapshot import PageSnapshot
 
 
 def get_number_from_string_with_dot_and_comma(amount: str) -> float:
@@ -9,11 +10,8 @@ def get_number_from_string_with_dot_and_comma(amount: str) -> float:
 
 
 async def get_texts_within_css_selector(page: Page, selector: str):
-    page_content = await page.content()
-    tree = HTMLParser(page_content)
-
-    if tree.body:
-        return tree.body.css(selector)[0].text(separator="\n", strip=True).split()
+    snapshot = await PageSnapshot.of(page)
+    return await snapshot.texts(selector)
 
 
 async def click_on_selectors_list(
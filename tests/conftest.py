@@ -0,0 +1,15 @@
+import pandas as pd
+
+
+def make_transactions(*rows) -> pd.DataFrame:
+    """Transactions like the ones read from the product page, rows are (fecha, description, amount, balance)."""
+    transactions = pd.DataFrame.from_records(
+        [
+            {"Descripción": description, "Importe": amount, "Saldo": balance}
+            for _, description, amount, balance in rows
+        ]
+    )
+    transactions.index = pd.DatetimeIndex(
+        pd.to_datetime([fecha for fecha, *_ in rows]), name="Fecha"
+    )
+    return transactions
@@ -0,0 +1,60 @@
+import pytest
+
+from playwrighting.backup import SnapshotStore
+from playwrighting.exceptions import SnapshotDoesNotExist
+from playwrighting.storage import open_store
+from tests.conftest import make_transactions
+
+PRODUCT = "Cuenta NO"
+
+
+@pytest.fixture
+def state_path(tmp_path):
+    path = tmp_path / "state.db"
+    with open_store(path) as store:
+        store.append_transactions(
+            PRODUCT,
+            make_transactions(
+                *[
+                    (f"2021-05-{day:02}", f"Compra {day}", -1.0 * day, 1000.0 - day)
+                    for day in range(1, 29)
+                ]
+            ),
+        )
+    return path
+
+
+def test_snapshot_restores_the_state_storing_only_the_changed_chunks(
+    tmp_path, state_path, monkeypatch
+):
+    # a chunk per SQLite page
+    monkeypatch.setattr("playwrighting.backup.SNAPSHOT_CHUNK_SIZE", 4096)
+    snapshots = SnapshotStore(tmp_path / "snapshots")
+    first = snapshots.create(state_path, "first")
+    with open_store(state_path) as store:
+        store.append_transactions(
+            PRODUCT,
+            make_transactions(("2021-05-29", "Nomina", 1000.0, 1971.0)),
+            since="2021-05-29",
+        )
+    second = snapshots.create(state_path, "second")
+
+    # the pages the new transaction didn't change are already stored
+    assert second.written < second.size
+    assert set(first.chunks) & set(second.chunks)
+
+    snapshots.restore("first", state_path)
+
+    with open_store(state_path) as store:
+        restored = store.load_transactions(PRODUCT)
+    assert len(restored) == 28
+    assert "Nomina" not in set(restored["Descripción"])
+
+
+@pytest.mark.parametrize("snapshot_id", ["../state", "manifests/../../state", ".."])
+def test_snapshot_ids_with_separators_are_rejected(tmp_path, state_path, snapshot_id):
+    snapshots = SnapshotStore(tmp_path / "snapshots")
+    snapshots.create(state_path, "first")
+
+    with pytest.raises(SnapshotDoesNotExist):
+        snapshots.restore(snapshot_id, state_path)
@@ -0,0 +1,46 @@
+import pandas as pd
+
+from playwrighting.checkpoint import Checkpoint, checkpointing, current_checkpoint
+from tests.conftest import make_transactions
+
+PRODUCT = "Cuenta NO"
+
+
+def month_table() -> pd.DataFrame:
+    """A month page as it is read, Fecha is still a column."""
+    return make_transactions(
+        ("2021-05-03", "Cafe", -1.5, 98.5),
+        ("2021-05-01", "Nomina", 1000.0, 100.0),
+    ).reset_index()
+
+
+def test_months_and_products_round_trip(tmp_path):
+    checkpoint = Checkpoint(tmp_path / "checkpoint.db")
+    checkpoint.save_month(PRODUCT, "2021-05", month_table())
+
+    pd.testing.assert_frame_equal(
+        checkpoint.load_months(PRODUCT)["2021-05"], month_table()
+    )
+
+    transactions = month_table().set_index("Fecha")
+    checkpoint.save_product(PRODUCT, transactions)
+
+    pd.testing.assert_frame_equal(
+        checkpoint.load_product(PRODUCT), transactions, check_freq=False
+    )
+    # the product is done, its months are not needed anymore
+    assert checkpoint.load_months(PRODUCT) == {}
+
+
+def test_only_a_resumed_run_keeps_the_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.setattr("playwrighting.checkpoint.get_app_path", lambda: tmp_path)
+    with checkpointing() as checkpoint:
+        assert current_checkpoint() is checkpoint
+        checkpoint.save_month(PRODUCT, "2021-05", month_table())
+    assert current_checkpoint() is None
+
+    with checkpointing(resume=True) as checkpoint:
+        assert list(checkpoint.load_months(PRODUCT)) == ["2021-05"]
+
+    with checkpointing() as checkpoint:
+        assert checkpoint.load_months(PRODUCT) == {}
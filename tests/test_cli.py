@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+from asyncclick.testing import CliRunner
+
+from playwrighting.exceptions import ProfileDoesNotExist
+from playwrighting.pying import cli
+from playwrighting.storage import open_store
+from tests.conftest import make_transactions
+
+
+def invoke(*args):
+    return asyncio.run(CliRunner().invoke(cli, list(args)))
+
+
+def test_batch_takes_options_after_the_profiles():
+    result = invoke("batch", "not-a-profile", "neither", "--concurrency", "2")
+
+    assert isinstance(result.exception, ProfileDoesNotExist)
+    assert "not-a-profile, neither" in str(result.exception)
+
+
+def test_batch_options_after_the_profiles_are_validated():
+    result = invoke("batch", "not-a-profile", "--concurrency", "two")
+
+    assert result.exit_code == 2
+    assert "--concurrency" in result.output
+
+
+def test_batch_cannot_be_chained():
+    result = invoke("show", "batch", "not-a-profile")
+
+    assert result.exit_code == 2
+    assert "batch cannot be chained" in result.output
+
+
+def test_search_takes_options_after_the_text(tmp_path, monkeypatch):
+    monkeypatch.setattr("playwrighting.pying.exist_state_file", lambda: True)
+    monkeypatch.setattr("playwrighting.storage.get_app_path", lambda: tmp_path)
+    with open_store() as store:
+        store.append_transactions(
+            "Cuenta NO",
+            make_transactions(
+                ("2021-05-04", "Amazon devolucion", 10.0, 108.5),
+                ("2021-05-03", "Compra Amazon", -20.0, 98.5),
+                ("2021-05-02", "Amazon Prime", -4.99, 118.5),
+                ("2021-05-01", "Nomina", 1000.0, 123.49),
+            ),
+        )
+
+    result = invoke("search", "amazon", "--limit", "2", "--output", "json")
+
+    assert result.exit_code == 0, result.output
+    rows = [json.loads(line) for line in result.output.splitlines()]
+    assert len(rows) == 2
+    assert all("Amazon" in row["Descripción"] for row in rows)
+
+
+def test_backup_subcommands(tmp_path, monkeypatch):
+    monkeypatch.setattr("playwrighting.pying.get_app_path", lambda: tmp_path)
+    with open_store(tmp_path / "state.db") as store:
+        store.append_transactions(
+            "Cuenta NO", make_transactions(("2021-05-01", "Nomina", 1000.0, 1000.0))
+        )
+
+    assert invoke("backup").exit_code == 0
+    assert invoke("backup", "create", "second").exit_code == 0
+    assert "second" in invoke("backup", "list").output
+
+    result = invoke("backup", "prune", "--keep_last", "1", "--keep_daily", "0")
+
+    assert result.exit_code == 0, result.output
+    assert "1 snapshots have been removed" in result.output
@@ -0,0 +1,39 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from playwrighting.client import DaemonClient
+from playwrighting.exceptions import DaemonNotAvailable
+
+
+class ProxyError(BaseHTTPRequestHandler):
+    """A proxy in front of the daemon answering with an html page."""
+
+    def do_GET(self):
+        body = b"<html><body>Bad Gateway</body></html>"
+        self.send_response(502)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def proxy_address():
+    server = HTTPServer(("127.0.0.1", 0), ProxyError)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_error_without_json_is_reported(proxy_address):
+    client = DaemonClient(proxy_address, token="token")
+
+    with pytest.raises(DaemonNotAvailable, match="502: Bad Gateway"):
+        client.load_position()
@@ -0,0 +1,96 @@
+import asyncio
+
+from playwrighting.daemon import Daemon, allowed_hosts
+from playwrighting.exceptions import PhoneNotValidated
+
+
+class Writer:
+    def __init__(self):
+        self.data = b""
+
+    def write(self, data: bytes):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def send(request: str, token: bool = True) -> bytes:
+    """Response of a daemon bound to 127.0.0.1:8765 to the request, with its token unless told otherwise."""
+
+    async def handle() -> bytes:
+        daemon = Daemon(page=None, position=None)
+        daemon.hosts = allowed_hosts("127.0.0.1", 8765)
+        headers = f"Authorization: Bearer {daemon.token}\r\n" if token else ""
+        reader = asyncio.StreamReader()
+        reader.feed_data(f"{request}\r\n{headers}\r\n".encode())
+        reader.feed_eof()
+        writer = Writer()
+        await daemon.handle(reader, writer)
+        return writer.data
+
+    return asyncio.run(handle())
+
+
+def test_refresh_without_phone_validation_is_an_error_response(monkeypatch):
+    async def refresh(self, force: bool = False):
+        raise PhoneNotValidated("The phone validation hasn't been accepted")
+
+    monkeypatch.setattr(Daemon, "refresh", refresh)
+
+    response = send("POST /refresh HTTP/1.1\r\nHost: localhost:8765")
+
+    assert response.startswith(b"HTTP/1.1 503 Service Unavailable")
+    assert b"phone validation" in response
+
+
+def test_request_from_another_host_is_forbidden():
+    response = send("GET /position HTTP/1.1\r\nHost: attacker.example:8765")
+
+    assert response.startswith(b"HTTP/1.1 403 Forbidden")
+
+
+def test_request_without_token_is_unauthorized():
+    response = send("GET /position HTTP/1.1\r\nHost: 127.0.0.1:8765", token=False)
+
+    assert response.startswith(b"HTTP/1.1 401 Unauthorized")
+
+
+def test_unexpected_error_is_an_internal_error_response(monkeypatch):
+    async def refresh(self, force: bool = False):
+        raise KeyError("balance")
+
+    monkeypatch.setattr(Daemon, "refresh", refresh)
+
+    response = send("POST /refresh HTTP/1.1\r\nHost: localhost:8765")
+
+    assert response.startswith(b"HTTP/1.1 500 Internal Server Error")
+    assert b"Internal error" in response
+
+
+def test_watch_keeps_checking_after_an_unexpected_error(monkeypatch):
+    checks = []
+
+    async def refresh(self, force: bool = False):
+        checks.append(force)
+        if len(checks) == 1:
+            raise KeyError("balance")
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr(Daemon, "refresh", refresh)
+
+    async def watch():
+        daemon = Daemon(page=None, position=None, interval=0)
+        try:
+            await daemon.watch()
+        except asyncio.CancelledError:
+            pass
+        return daemon
+
+    daemon = asyncio.run(watch())
+
+    assert len(checks) == 2
+    assert daemon.last_error == "'balance'"
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from playwrighting.constants import ExportFormat
+from playwrighting.export import export_transactions
+from tests.conftest import make_transactions
+
+HISTORY = (
+    ("2023-05-10", "Bizum", -10.5, 189.5),
+    ("2023-05-03", "Nómina", 100.0, 200.0),
+    ("2023-04-28", "Recibo", -50.0, 100.0),
+)
+
+
+def export(transactions: pd.DataFrame, tmp_path) -> pd.DataFrame:
+    path = export_transactions(
+        transactions, tmp_path, "Cuenta NARANJA", ExportFormat.csv, incremental=True
+    )
+    return pd.read_csv(path)
+
+
+def test_incremental_export_appends_the_new_transactions_oldest_first(tmp_path):
+    export(make_transactions(*HISTORY), tmp_path)
+
+    exported = export(
+        make_transactions(("2023-05-12", "Compra", -9.5, 180.0), *HISTORY), tmp_path
+    )
+
+    assert exported["Descripción"].tolist() == ["Recibo", "Nómina", "Bizum", "Compra"]
+
+
+def test_incremental_export_keeps_back_dated_transactions(tmp_path):
+    export(make_transactions(*HISTORY), tmp_path)
+
+    # obtained by a later update, older than the newest day already exported
+    back_dated = ("2023-05-05", "Transferencia", 20.0, 220.0)
+    exported = export(make_transactions(HISTORY[0], back_dated, *HISTORY[1:]), tmp_path)
+
+    assert exported["Descripción"].tolist() == [
+        "Recibo",
+        "Nómina",
+        "Transferencia",
+        "Bizum",
+    ]
@@ -0,0 +1,39 @@
+import pandas as pd
+
+from playwrighting.accounts import Fingerprint
+from tests.conftest import make_transactions
+
+HISTORY = make_transactions(
+    ("2021-05-03", "Cafe", -1.5, 98.5),
+    ("2021-04-30", "Nomina", 100.0, 100.0),
+)
+
+
+def test_empty_current_month_with_the_same_amount_has_not_changed():
+    current_month = Fingerprint.of(98.5, pd.DataFrame())
+
+    assert current_month.matches(Fingerprint.of(98.5, HISTORY))
+
+
+def test_empty_current_month_with_another_amount_has_changed():
+    current_month = Fingerprint.of(90.0, pd.DataFrame())
+
+    assert not current_month.matches(Fingerprint.of(98.5, HISTORY))
+
+
+def test_same_newest_transactions_have_not_changed():
+    current_month = Fingerprint.of(98.5, HISTORY[HISTORY.index.month == 5])
+
+    assert current_month.matches(Fingerprint.of(98.5, HISTORY))
+
+
+def test_new_transaction_with_the_same_amount_has_changed():
+    current_month = Fingerprint.of(
+        98.5,
+        make_transactions(
+            ("2021-05-04", "Devolucion", 1.5, 100.0),
+            ("2021-05-04", "Cafe", -1.5, 98.5),
+        ),
+    )
+
+    assert not current_month.matches(Fingerprint.of(98.5, HISTORY))
@@ -0,0 +1,24 @@
+import subprocess
+import sys
+from pathlib import Path
+
+HEAVY_MODULES = ("playwright", "pandas")
+
+
+def test_cli_imports_neither_playwright_nor_pandas():
+    """The commands import them when they need them, pying --help and show (also from a daemon) start without
+    them."""
+    code = (
+        "import sys; import playwrighting.pying, playwrighting.client; "
+        f"print(' '.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))"
+    )
+
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.split() == []
@@ -0,0 +1,54 @@
+import pickle
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from playwrighting.accounts import Account, Position
+from playwrighting.constants import LEGACY_STATE_FILE_NAME
+from playwrighting.merge import merge_transactions
+from playwrighting.parsers import parse_transactions_table
+from playwrighting.storage import open_store
+
+FIXTURE = (
+    Path(__file__).parent.parent / "benchmarks" / "fixtures" / "movements_month.html"
+)
+PRODUCT = "Cuenta NO"
+
+
+def read_like_the_baseline(content: str) -> pd.DataFrame:
+    """The table as versions before the sqlite state read it with pd.read_html, amounts kept as text."""
+    transactions = pd.read_html(content, thousands=".", decimal=",")[0]
+    transactions["Fecha"] = pd.to_datetime(
+        transactions["Fecha"].str.replace(
+            "Lunes|Martes|Miércoles|Jueves|Viernes|Sábado|Domingo|Ayer|Hoy",
+            "",
+            regex=True,
+        ),
+        format="%d/%m/%Y",
+        errors="coerce",
+    )
+    columns = [column for column in transactions.columns if "Unnamed" not in column]
+    return transactions[columns].dropna().set_index("Fecha").sort_index(ascending=False)
+
+
+def test_migrated_legacy_state_is_merged_without_duplicates(tmp_path, monkeypatch):
+    monkeypatch.setattr("playwrighting.accounts.get_app_path", lambda: tmp_path)
+    monkeypatch.setattr("playwrighting.storage.get_app_path", lambda: tmp_path)
+    content = FIXTURE.read_text()
+    legacy = read_like_the_baseline(content)
+    account = Account(PRODUCT, 5352.44, (), legacy, datetime(2021, 5, 31))
+    with open(tmp_path / LEGACY_STATE_FILE_NAME, "wb") as state_file:
+        pickle.dump(Position(5352.44, (account,), datetime(2021, 5, 31)), state_file)
+
+    Position.migrate_legacy_state()
+
+    with open_store() as store:
+        ((stored, with_amount),) = store.connection.execute(
+            "SELECT count(*), count(amount) FROM transactions"
+        )
+        migrated = store.load_transactions(PRODUCT)
+    assert stored == with_amount == len(legacy)
+
+    read_again = parse_transactions_table(content).dropna().set_index("Fecha")
+    assert len(merge_transactions(migrated, read_again)) == len(migrated)
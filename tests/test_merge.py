@@ -0,0 +1,63 @@
+from playwrighting.merge import merge_transactions, transaction_keys
+from tests.conftest import make_transactions
+
+
+def test_repeated_transactions_keep_different_keys():
+    transactions = make_transactions(
+        ("2021-05-03", "Cafe", -1.5, 98.5),
+        ("2021-05-03", "Cafe", -1.5, 98.5),
+    )
+
+    first, second = transaction_keys(transactions)
+
+    assert first != second
+
+
+def test_merge_without_history_sorts_newest_first():
+    new = make_transactions(
+        ("2021-05-01", "Nomina", 1000.0, 1100.0),
+        ("2021-05-03", "Cafe", -1.5, 1098.5),
+    )
+
+    merged = merge_transactions(None, new)
+
+    assert list(merged["Descripción"]) == ["Cafe", "Nomina"]
+
+
+def test_merge_keeps_history_older_than_the_window():
+    history = make_transactions(
+        ("2021-04-20", "Luz", -40.0, 100.0),
+        ("2021-04-10", "Agua", -20.0, 140.0),
+    )
+    new = make_transactions(("2021-05-03", "Cafe", -1.5, 98.5))
+
+    merged = merge_transactions(history, new)
+
+    assert list(merged["Descripción"]) == ["Cafe", "Luz", "Agua"]
+
+
+def test_merge_keeps_stored_transactions_not_read_again():
+    history = make_transactions(
+        ("2021-05-03", "Cafe", -1.5, 98.5),
+        ("2021-05-02", "Pan", -1.0, 100.0),
+    )
+    new = make_transactions(("2021-05-03", "Cafe", -1.5, 98.5))
+
+    merged = merge_transactions(history, new)
+
+    assert list(merged["Descripción"]) == ["Cafe", "Pan"]
+
+
+def test_merge_adds_back_dated_transactions():
+    history = make_transactions(
+        ("2021-05-03", "Cafe", -1.5, 98.5),
+        ("2021-05-01", "Nomina", 1000.0, 1100.0),
+    )
+    new = make_transactions(
+        ("2021-05-03", "Cafe", -1.5, 98.5),
+        ("2021-05-02", "Devolucion", 10.0, 108.5),
+    )
+
+    merged = merge_transactions(history, new)
+
+    assert list(merged["Descripción"]) == ["Cafe", "Devolucion", "Nomina"]
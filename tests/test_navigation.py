@@ -0,0 +1,43 @@
+import asyncio
+import dataclasses
+
+from playwright.async_api import TimeoutError as PlayWrightTimeout
+
+from playwrighting.constants import PAGE_CHANGE_TIMEOUT
+from playwrighting.navigation.transactions import PageState, get_page_state
+
+
+class UnchangedPage:
+    """Movements page whose table stays the same after clicking previous month or Ver más."""
+
+    def __init__(self, state: PageState):
+        self.state = state
+        self.timeouts = []
+
+    async def wait_for_selector(self, selector: str):
+        pass
+
+    async def wait_for_function(self, script: str, arg, timeout: float):
+        self.timeouts.append(timeout)
+        raise PlayWrightTimeout(f"Timeout {timeout}ms exceeded.")
+
+    async def evaluate(self, script: str, arg):
+        return dataclasses.asdict(self.state)
+
+
+def test_unchanged_table_is_read_after_a_short_wait():
+    previous = PageState(
+        has_previous_month=True,
+        has_ver_mas_button=False,
+        need_to_check_your_phone=False,
+        current_month="Mayo 2023",
+        rows=2,
+        first_row="02/05/2023 Bizum -10,50 €",
+        last_row="01/05/2023 Nómina 1.500,00 €",
+    )
+    page = UnchangedPage(previous)
+
+    state = asyncio.run(get_page_state(page, previous=previous))
+
+    assert state == previous
+    assert page.timeouts == [PAGE_CHANGE_TIMEOUT]
@@ -0,0 +1,70 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from playwrighting.exceptions import MonthNotParsed
+from playwrighting.parsers import parse_month_label, parse_transactions_table
+from playwrighting.transactions import read_transactions_table
+
+TABLE = """
+<table>
+  <thead>
+    <tr><th> Fecha </th><th>Descripción</th><th>Importe</th><th>Saldo</th><th></th></tr>
+  </thead>
+  <tbody>
+    <tr>
+      <td>Hoy 03/05/2021</td><td>Compra  Amazon</td><td>-112,51 €</td><td>1.887,49 €</td><td></td>
+    </tr>
+    <tr>
+      <td>Lunes 01/05/2021</td><td>Nomina</td><td>2.000,00 €</td><td>2.000,00 €</td><td></td>
+    </tr>
+    <tr><td colspan="5">Ver más</td></tr>
+  </tbody>
+</table>
+"""
+
+
+def test_headers_and_cells_are_normalised():
+    transactions = parse_transactions_table(TABLE)
+
+    assert list(transactions.columns) == ["Fecha", "Descripción", "Importe", "Saldo"]
+    assert list(transactions["Descripción"]) == ["Compra Amazon", "Nomina"]
+
+
+def test_amounts_are_parsed():
+    transactions = parse_transactions_table(TABLE)
+
+    assert list(transactions["Importe"]) == [-112.51, 2000.0]
+    assert list(transactions["Fecha"]) == [
+        pd.Timestamp("2021-05-03"),
+        pd.Timestamp("2021-05-01"),
+    ]
+
+
+def test_fallback_has_the_same_amounts():
+    fast = parse_transactions_table(TABLE)
+    fallback = read_transactions_table(TABLE)
+
+    for column in ("Importe", "Saldo"):
+        assert fallback[column].dtype == fast[column].dtype
+        assert list(fallback[column]) == list(fast[column])
+
+
+@pytest.mark.parametrize(
+    "label, month",
+    [
+        ("Mayo 2021", date(2021, 5, 1)),
+        ("  SEPTIEMBRE   2020 ", date(2020, 9, 1)),
+        ("Enero - Marzo 2021", date(2021, 1, 1)),
+        ("Diciembre-Enero 2022", date(2021, 12, 1)),
+    ],
+)
+def test_month_labels_are_parsed(label, month):
+    assert parse_month_label(label) == month
+
+
+@pytest.mark.parametrize("label", ["May 2021", "Mayo", ""])
+def test_unexpected_month_labels_are_not_parsed(label):
+    with pytest.raises(MonthNotParsed):
+        parse_month_label(label)
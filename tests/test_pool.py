@@ -0,0 +1,126 @@
+import asyncio
+from typing import List, Optional
+
+import pytest
+
+from playwrighting.pool import PagePool, gather_or_cancel
+
+
+def test_failure_cancels_the_other_scrapes():
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def failing():
+        await asyncio.sleep(0)
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        asyncio.run(gather_or_cancel(slow(), failing()))
+
+    assert cancelled == [True]
+
+
+def test_results_keep_their_order():
+    async def scrape(value, delay):
+        await asyncio.sleep(delay)
+        return value
+
+    assert asyncio.run(gather_or_cancel(scrape(1, 0.01), scrape(2, 0))) == [1, 2]
+
+
+class FakePage:
+    def __init__(self, context: "FakeContext"):
+        self.context = context
+        self.closed = False
+
+    async def goto(self, url: str):
+        pass
+
+    async def wait_for_selector(self, selector: str):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self, browser: Optional["FakeBrowser"], storage_state=None):
+        self.browser = browser
+        self.storage_state_used = storage_state
+        self.pages: List[FakePage] = []
+        self.closed = False
+
+    async def storage_state(self) -> dict:
+        return {"cookies": [{"name": "session"}]}
+
+    async def new_page(self) -> FakePage:
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts: List[FakeContext] = []
+
+    async def new_context(self, storage_state: dict) -> FakeContext:
+        context = FakeContext(self, storage_state)
+        self.contexts.append(context)
+        return context
+
+
+class Blocker:
+    def __init__(self):
+        self.contexts = []
+
+    async def install(self, context: FakeContext):
+        self.contexts.append(context)
+
+
+def test_every_page_has_a_context_of_its_own_with_the_session():
+    browser = FakeBrowser()
+    blocker = Blocker()
+
+    async def use_pool():
+        page = await FakeContext(browser).new_page()
+        pool = PagePool(page, jobs=3, blocker=blocker)
+        async with pool:
+            pages = [pool._pages.get_nowait() for _ in range(3)]
+        return page, pages
+
+    page, pages = asyncio.run(use_pool())
+
+    assert pages[0] is page
+    assert [other.context for other in pages[1:]] == browser.contexts
+    assert all(
+        context.storage_state_used == {"cookies": [{"name": "session"}]}
+        for context in browser.contexts
+    )
+    assert blocker.contexts == browser.contexts
+    assert all(context.closed for context in browser.contexts)
+    assert not page.context.closed
+
+
+def test_persistent_context_pages_share_it():
+    async def use_pool():
+        context = FakeContext(browser=None)
+        page = await context.new_page()
+        async with PagePool(page, jobs=2) as pool:
+            pages = [pool._pages.get_nowait() for _ in range(2)]
+        return context, pages
+
+    context, pages = asyncio.run(use_pool())
+
+    assert all(page.context is context for page in pages)
+    assert pages[1].closed
+    assert not pages[0].closed
+    assert not context.closed
@@ -0,0 +1,51 @@
+import asyncio
+from types import SimpleNamespace
+
+from playwrighting.navigation.routing import (
+    ESTIMATED_RESOURCE_SIZES,
+    ResourceBlocker,
+)
+
+
+class Route:
+    def __init__(self):
+        self.action = None
+
+    async def abort(self):
+        self.action = "abort"
+
+    async def continue_(self):
+        self.action = "continue"
+
+
+def route(blocker: ResourceBlocker, resource_type: str, url: str) -> str:
+    request = SimpleNamespace(resource_type=resource_type, url=url)
+    requested = Route()
+    asyncio.run(blocker.handle(requested, request))
+    return requested.action
+
+
+def test_requests_are_blocked_by_resource_type_and_url_pattern():
+    blocker = ResourceBlocker(["image", " media", ""], "google-analytics|hotjar")
+
+    assert route(blocker, "image", "https://ing.ingdirect.es/logo.png") == "abort"
+    assert route(blocker, "script", "https://www.google-analytics.com/ga.js") == "abort"
+    assert route(blocker, "document", "https://ing.ingdirect.es/pfm/") == "continue"
+    assert route(blocker, "font", "https://ing.ingdirect.es/icons.woff") == "continue"
+
+    assert blocker.blocked_requests == 2
+    assert (
+        blocker.saved_bytes
+        == ESTIMATED_RESOURCE_SIZES["image"] + ESTIMATED_RESOURCE_SIZES["script"]
+    )
+
+
+def test_blocker_from_the_configuration():
+    config = SimpleNamespace(
+        blocked_resource_types="image,media", blocked_url_patterns=""
+    )
+
+    blocker = ResourceBlocker.from_config(config)
+
+    assert blocker.resource_types == {"image", "media"}
+    assert route(blocker, "script", "https://www.hotjar.com/h.js") == "continue"
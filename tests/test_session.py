@@ -0,0 +1,62 @@
+import asyncio
+from types import SimpleNamespace
+
+from playwrighting.navigation import session
+from playwrighting.navigation.session import open_page
+
+
+class FakeContext:
+    def __init__(self, browser: "FakeBrowser"):
+        self.browser = browser
+        self.closed = False
+
+    async def new_page(self):
+        return SimpleNamespace(context=self)
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.user_context = FakeContext(self)
+        self.contexts = [self.user_context]
+        self.disconnected = False
+
+    async def new_context(self, **kwargs):
+        context = FakeContext(self)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.disconnected = True
+
+
+def test_cdp_scrapes_in_its_own_context(monkeypatch):
+    browser = FakeBrowser()
+
+    async def connect_over_cdp(endpoint):
+        return browser
+
+    monkeypatch.setattr(
+        session,
+        "get_config",
+        lambda: SimpleNamespace(
+            browser_mode="cdp", cdp_endpoint="http://localhost:9222"
+        ),
+    )
+    monkeypatch.setattr(session, "load_valid_session", lambda: None)
+    playwright = SimpleNamespace(
+        chromium=SimpleNamespace(connect_over_cdp=connect_over_cdp)
+    )
+
+    async def scrape():
+        async with open_page(playwright) as page:
+            assert page.context is not browser.user_context
+            return page
+
+    page = asyncio.run(scrape())
+
+    assert page.context.closed
+    assert not browser.user_context.closed
+    assert browser.disconnected
@@ -0,0 +1,47 @@
+import asyncio
+
+from playwrighting.snapshot import (
+    CAPTURE_SCRIPT,
+    DOM_OBSERVER_SCRIPT,
+    VERSION_SCRIPT,
+    PageSnapshot,
+)
+
+
+class Page:
+    """A page whose DOM version changes with its content, like the one counted by the observer."""
+
+    def __init__(self, balance: str):
+        self.mutations = 0
+        self.balance = balance
+
+    def change(self, balance: str):
+        self.mutations += 1
+        self.balance = balance
+
+    async def add_init_script(self, script: str):
+        pass
+
+    async def evaluate(self, script: str):
+        version = f"document:{self.mutations}"
+        if script == VERSION_SCRIPT:
+            return version
+        if script == CAPTURE_SCRIPT:
+            return [version, f"<html><body><p>{self.balance}</p></body></html>"]
+        assert script == DOM_OBSERVER_SCRIPT
+
+
+def test_page_is_captured_again_only_when_its_dom_changes():
+    async def query():
+        page = Page("1.000,00 €")
+        snapshot = await PageSnapshot.of(page)
+        texts = [await snapshot.texts("p"), await snapshot.texts("p")]
+        # e.g. after a click, before any notification from the page
+        page.change("2.000,00 €")
+        texts.append(await snapshot.texts("p"))
+        return texts, snapshot.captures
+
+    texts, captures = asyncio.run(query())
+
+    assert texts == [["1.000,00", "€"], ["1.000,00", "€"], ["2.000,00", "€"]]
+    assert captures == 2
@@ -0,0 +1,199 @@
+import pandas as pd
+import pytest
+
+from playwrighting.merge import merge_transactions, merged_since
+from playwrighting.storage import SEARCH_INDEX, TransactionsQuery, open_store
+from tests.conftest import make_transactions
+
+PRODUCT = "Cuenta NO"
+
+
+@pytest.fixture
+def store(tmp_path):
+    with open_store(tmp_path / "state.db") as store:
+        yield store
+
+
+def test_transactions_round_trip(store):
+    transactions = make_transactions(
+        ("2021-05-03", "Cafe", -1.5, 98.5),
+        ("2021-05-03", "Cafe", -1.5, 98.5),
+        ("2021-05-01", "Nomina", 1000.0, 1100.0),
+    )
+
+    store.append_transactions(PRODUCT, transactions)
+
+    pd.testing.assert_frame_equal(
+        store.load_transactions(PRODUCT), transactions, check_freq=False
+    )
+
+
+def test_back_dated_transactions_are_saved(store):
+    history = make_transactions(
+        ("2021-05-03", "Cafe", -1.5, 98.5),
+        ("2021-05-01", "Nomina", 1000.0, 1100.0),
+    )
+    store.append_transactions(PRODUCT, history)
+    new = make_transactions(
+        ("2021-05-04", "Pan", -1.0, 107.5),
+        ("2021-05-02", "Devolucion", 10.0, 108.5),
+    )
+
+    merged = merge_transactions(store.load_transactions(PRODUCT), new)
+    store.append_transactions(PRODUCT, merged)
+
+    loaded = store.load_transactions(PRODUCT)
+    assert list(loaded["Descripción"]) == ["Pan", "Cafe", "Devolucion", "Nomina"]
+    pd.testing.assert_frame_equal(loaded, merged, check_freq=False)
+
+
+def test_removed_transactions_are_deleted(store):
+    store.append_transactions(
+        PRODUCT,
+        make_transactions(
+            ("2021-05-03", "Cafe", -1.5, 98.5),
+            ("2021-05-01", "Nomina", 1000.0, 1100.0),
+        ),
+    )
+
+    store.append_transactions(
+        PRODUCT, make_transactions(("2021-05-01", "Nomina", 1000.0, 1100.0))
+    )
+
+    assert list(store.load_transactions(PRODUCT)["Descripción"]) == ["Nomina"]
+
+
+def test_unchanged_days_are_not_rewritten(store):
+    history = make_transactions(
+        ("2021-05-03", "Cafe", -1.5, 98.5),
+        ("2021-05-01", "Nomina", 1000.0, 1100.0),
+    )
+    store.append_transactions(PRODUCT, history)
+    rowids = store.connection.execute(
+        "SELECT rowid FROM transactions WHERE fecha = '2021-05-01'"
+    ).fetchall()
+
+    new = make_transactions(("2021-05-04", "Pan", -1.0, 97.5))
+    store.append_transactions(PRODUCT, merge_transactions(history, new))
+
+    assert (
+        store.connection.execute(
+            "SELECT rowid FROM transactions WHERE fecha = '2021-05-01'"
+        ).fetchall()
+        == rowids
+    )
+
+
+def test_description_filter_ignores_the_case_of_any_letter(store):
+    store.append_transactions(
+        PRODUCT,
+        make_transactions(
+            ("2021-05-03", "CAFÉ ÑANDÚ", -1.5, 98.5),
+            ("2021-05-01", "Nomina", 1000.0, 100.0),
+        ),
+    )
+    query = TransactionsQuery(description="café ñandú")
+
+    rows = list(store.query_transactions(PRODUCT, query))
+
+    assert [record["Descripción"] for _, record in rows] == ["CAFÉ ÑANDÚ"]
+    assert [query.matches(fecha, record) for fecha, record in rows] == [True]
+
+
+def test_search_without_index_ignores_the_case_of_any_letter(store):
+    store.append_transactions(
+        PRODUCT, make_transactions(("2021-05-03", "CAFÉ ÑANDÚ", -1.5, 98.5))
+    )
+    store.connection.execute(f"DROP TABLE {SEARCH_INDEX}")
+
+    rows = list(store.search_transactions("ñandú", None, TransactionsQuery()))
+
+    assert [record["Descripción"] for _, _, record in rows] == ["CAFÉ ÑANDÚ"]
+
+
+def test_only_the_merged_window_is_compared(store):
+    store.append_transactions(
+        PRODUCT,
+        make_transactions(
+            ("2021-05-03", "Cafe", -1.5, 98.5),
+            ("2021-04-01", "Nomina", 1000.0, 1100.0),
+        ),
+    )
+    history = store.load_transactions(PRODUCT)
+    new = make_transactions(("2021-05-04", "Pan", -1.0, 97.5))
+
+    merged = merge_transactions(history, new)
+    # a history missing its older rows leaves them stored when only the window is saved
+    store.append_transactions(PRODUCT, merged.iloc[:2], merged_since(merged))
+
+    assert merged_since(merged) == "2021-05-04"
+    assert list(store.load_transactions(PRODUCT)["Descripción"]) == [
+        "Pan",
+        "Cafe",
+        "Nomina",
+    ]
+
+
+def test_loaded_history_is_not_rewritten(store):
+    store.append_transactions(
+        PRODUCT, make_transactions(("2021-05-03", "Cafe", -1.5, 98.5))
+    )
+    history = store.load_transactions(PRODUCT)
+
+    assert merged_since(history) == "2021-05-04"
+    assert merged_since(merge_transactions(history, None)) == "2021-05-04"
+
+
+def test_aggregates_follow_inserts_and_deletes(store):
+    store.append_transactions(
+        PRODUCT,
+        make_transactions(
+            ("2021-06-02", "Compra AMAZON 1234", -20.0, 1078.5),
+            ("2021-05-03", "Compra Amazon 5678", -1.5, 1098.5),
+            ("2021-05-01", "Nomina", 1000.0, 1100.0),
+        ),
+    )
+
+    assert store.monthly_totals(PRODUCT) == [
+        {
+            "product": PRODUCT,
+            "month": "2021-06",
+            "income": 0.0,
+            "expense": -20.0,
+            "count": 1,
+        },
+        {
+            "product": PRODUCT,
+            "month": "2021-05",
+            "income": 1000.0,
+            "expense": -1.5,
+            "count": 2,
+        },
+    ]
+    assert store.description_totals(PRODUCT) == [
+        {"product": PRODUCT, "description": "nomina", "total": 1000.0, "count": 1},
+        {
+            "product": PRODUCT,
+            "description": "compra amazon",
+            "total": -21.5,
+            "count": 2,
+        },
+    ]
+
+    # June is gone and the purchase of May is removed
+    store.append_transactions(
+        PRODUCT, make_transactions(("2021-05-01", "Nomina", 1000.0, 1100.0))
+    )
+
+    assert store.monthly_totals(PRODUCT) == [
+        {
+            "product": PRODUCT,
+            "month": "2021-05",
+            "income": 1000.0,
+            "expense": 0.0,
+            "count": 1,
+        }
+    ]
+    assert store.description_totals(PRODUCT) == [
+        {"product": PRODUCT, "description": "nomina", "total": 1000.0, "count": 1}
+    ]
@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from playwrighting.accounts import Account, CreditCard, Position
+from playwrighting.storage import open_store
+from playwrighting.summary import PositionSummary
+
+
+def test_summary_prints_like_the_position(tmp_path):
+    card = CreditCard("Tarjeta", None, datetime(2021, 5, 3), expense=20.0)
+    account = Account("Cuenta NO", 100.0, (card,), None, datetime(2021, 5, 3))
+    position = Position(100.0, (account,), datetime(2021, 5, 3))
+    with open_store(tmp_path / "state.db") as store:
+        store.save_position(position.balance, position.last_update)
+        store.save_products(position.records())
+
+        summary = PositionSummary.from_store(store)
+
+    assert str(summary) == str(position)
+    assert [account.transactions_menu(1) for account in summary.accounts] == [
+        account.transactions_menu(1) for account in position.accounts
+    ]
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from playwrighting.exceptions import MovementsNotCaptured
+from playwrighting.transactions import MovementsCapture
+
+
+class Page:
+    async def wait_for_load_state(self, state: str):
+        pass
+
+
+def captured(*payloads):
+    async def transactions():
+        capture = MovementsCapture(Page())
+        capture._payloads.extend(payloads)
+        return await capture.transactions()
+
+    return asyncio.run(transactions())
+
+
+def test_movements_are_read_from_the_assumed_schema():
+    movement = {
+        "effectiveDate": "2023-05-02",
+        "description": "Bizum",
+        "amount": -10.5,
+        "balance": 100.0,
+    }
+
+    transactions = captured(
+        {"elements": [{"uuid": "1", **movement}]},
+        # the same month downloaded again
+        {"elements": [{"uuid": "1", **movement}]},
+    )
+
+    assert len(transactions) == 1
+    assert transactions["Importe"].iloc[0] == -10.5
+
+
+def test_responses_without_the_assumed_schema_are_not_captured():
+    with pytest.raises(MovementsNotCaptured):
+        captured({"movements": []}, [])
+
+
+def test_nothing_captured_is_not_an_empty_product():
+    with pytest.raises(MovementsNotCaptured):
+        captured()
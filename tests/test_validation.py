@@ -0,0 +1,57 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from playwrighting.exceptions import PhoneNotValidated
+from playwrighting.navigation import validation
+from playwrighting.navigation.validation import Confirmations
+
+
+def test_enter_confirms_the_oldest_product_waiting():
+    confirmations = Confirmations()
+    confirmations.wait("Cuenta NARANJA")
+    confirmations.wait("Cuenta NÓMINA")
+
+    assert confirmations.confirm() == "Cuenta NARANJA"
+    assert confirmations.is_confirmed("Cuenta NARANJA")
+    assert not confirmations.is_confirmed("Cuenta NÓMINA")
+    assert confirmations.confirm() == "Cuenta NÓMINA"
+    assert confirmations.confirm() is None
+
+
+def test_product_not_waiting_is_not_confirmed():
+    confirmations = Confirmations()
+    confirmations.wait("Cuenta NARANJA")
+
+    assert confirmations.confirm("Cuenta NÓMINA") is None
+    assert not confirmations.is_confirmed("Cuenta NÓMINA")
+
+
+def test_file_confirms_only_the_product_it_names(monkeypatch, tmp_path):
+    monkeypatch.setattr(validation, "get_app_path", lambda: tmp_path)
+    monkeypatch.setattr(validation, "_confirmations", Confirmations())
+    monkeypatch.setattr(validation, "PHONE_VALIDATION_POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(validation, "listen_terminal", lambda: False)
+
+    async def get_page_state(page):
+        return SimpleNamespace(need_to_check_your_phone=True)
+
+    monkeypatch.setattr(validation, "get_page_state", get_page_state)
+
+    async def wait():
+        waiting = [
+            asyncio.ensure_future(
+                validation.wait_for_phone_validation(None, product, timeout=0.5)
+            )
+            for product in ("Cuenta NARANJA", "Cuenta NÓMINA")
+        ]
+        await asyncio.sleep(0.05)
+        (tmp_path / "phone_validated").write_text("Cuenta NÓMINA\n")
+        return await asyncio.gather(*waiting, return_exceptions=True)
+
+    naranja, nomina = asyncio.run(wait())
+
+    assert isinstance(naranja, PhoneNotValidated)
+    assert nomina.need_to_check_your_phone
+    assert not (tmp_path / "phone_validated").exists()